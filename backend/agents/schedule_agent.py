@@ -1,3 +1,6 @@
+from utils.catalog import get_catalog
+from utils.schedule_allocator import allocate_schedule, interest_week_niches
+
 def run_schedule_agent(state):
     matched_topics = state["matched_topics"]
     profile = state["profile"]
@@ -61,57 +64,28 @@ def run_schedule_agent(state):
     # Generate daily activities for each week
     day_names = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
     
-    # Track used topics to prevent duplication
-    used_topics = set()
-    topic_rotation_index = 0
+    # Each week leads with one of the child's interest niches, in rotation
+    interests = [str(interest).lower() for interest in profile.get("interests", [])]
+    week_niches = interest_week_niches(matched_topics, get_catalog().snapshot().niche_graph.affinity(interests), weeks=4)
+    
+    # Assign topics to days in one pass: no repeats, theme progression, niche spread, attention-span durations
+    allocation = allocate_schedule(matched_topics, weeks=4, days_per_week=len(day_names), week_niches=week_niches,
+                                   attention_span=profile.get("attention_span"), child_age=profile.get("age"))
+    allocation_stats = allocation.get_stats()
+    if allocation_stats["review_repeats"]:
+        print(f"⚠️ Only {allocation_stats['topics_used']} distinct topics - {allocation_stats['review_repeats']} days are review repeats")
     
-    for week_num in range(1, 5):
-        week_key = f"week_{week_num}"
-        week_data = weekly_plan[week_key]
+    for week_index, slots in allocation.by_week():
+        week_num = week_index + 1
+        week_data = weekly_plan[f"week_{week_num}"]
         
-        for day_num, day_name in enumerate(day_names):
-            # Get a unique topic for this day (no duplication)
-            topic = None
-            attempts = 0
-            max_attempts = len(matched_topics) * 2  # Prevent infinite loops
-            
-            while topic is None and attempts < max_attempts:
-                # Try to get a topic that hasn't been used yet
-                if topic_rotation_index < len(matched_topics):
-                    potential_topic = matched_topics[topic_rotation_index]
-                    topic_id = f"{potential_topic.get('Topic', 'Unknown')}_{potential_topic.get('Niche', 'Unknown')}"
-                    
-                    if topic_id not in used_topics:
-                        topic = potential_topic
-                        used_topics.add(topic_id)
-                    else:
-                        # Move to next topic
-                        topic_rotation_index = (topic_rotation_index + 1) % len(matched_topics)
-                else:
-                    # If we've gone through all topics, reset and find unused ones
-                    topic_rotation_index = 0
-                    for i, potential_topic in enumerate(matched_topics):
-                        topic_id = f"{potential_topic.get('Topic', 'Unknown')}_{potential_topic.get('Niche', 'Unknown')}"
-                        if topic_id not in used_topics:
-                            topic = potential_topic
-                            used_topics.add(topic_id)
-                            topic_rotation_index = i + 1
-                            break
-                
-                attempts += 1
-            
-            # If we still don't have a topic, use the next available one
-            if topic is None:
-                topic_index = (week_num * 7 + day_num) % len(matched_topics)
-                topic = matched_topics[topic_index]
-                print(f"⚠️ Using fallback topic for {week_key} {day_name}: {topic.get('Topic', 'Unknown')}")
-            
+        for slot in slots:
             # Create day-specific activity based on week theme and actual topic
-            day_activity = create_day_activity(topic, profile, week_num, day_name, day_num)
-            week_data["days"][day_name] = day_activity
-            
-            # Move to next topic for next iteration
-            topic_rotation_index = (topic_rotation_index + 1) % len(matched_topics)
+            day_activity = create_day_activity(slot.topic, profile, week_num, slot.day_name, slot.day,
+                                               duration_minutes=slot.duration_minutes)
+            if slot.repeat:
+                day_activity["review_day"] = True
+            week_data["days"][slot.day_name] = day_activity
     
     # Create systematic approach summary
     systematic_approach = {
@@ -143,7 +117,8 @@ def run_schedule_agent(state):
         },
         "next_agent": "reviewer_agent",
         "next_action": "review_and_optimize_plan",
-        "topics_used": len(used_topics),
+        "topics_used": allocation_stats["topics_used"],
+        "schedule_allocation": allocation_stats,
         "duplication_prevented": True,
         "unique_activities_per_day": True
     }
@@ -155,8 +130,11 @@ def run_schedule_agent(state):
         "matched_topics": matched_topics
     }
 
-def create_day_activity(topic, profile, week_num, day_name, day_num):
-    """Create day-specific activity based on week theme and topic."""
+def create_day_activity(topic, profile, week_num, day_name, day_num, duration_minutes=None):
+    """Create day-specific activity based on week theme and topic.
+    
+    duration_minutes, when given (from the schedule allocator), replaces the age-based duration.
+    """
     
     # Extract topic information
     topic_name = topic.get("topic", topic.get("Topic", "Learning Activity"))
@@ -248,4 +226,7 @@ def create_day_activity(topic, profile, week_num, day_name, day_num):
         base_activity["activity"] = f"🔬 Independent investigation: {base_activity['activity']}"
         base_activity["duration"] = "45-60 minutes"
     
+    if duration_minutes:
+        base_activity["duration"] = f"{duration_minutes} minutes"
+    
     return base_activity
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+⏱️ Cold Start Benchmark
+Compares catalog load and app import time from JSON sources against the compiled snapshot
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Each probe runs in a fresh interpreter, like a new Cloud Run instance
+CATALOG_PROBE = """
+import time
+t = time.perf_counter()
+from utils.catalog import TopicCatalog
+catalog = TopicCatalog({data_dir!r}, snapshot_path={snapshot_path!r}, use_compiled={use_compiled})
+print(time.perf_counter() - t)
+"""
+
+APP_PROBE = """
+import time
+t = time.perf_counter()
+import main_agents
+print(time.perf_counter() - t)
+"""
+
+GENAI_PROBE = """
+import time
+t = time.perf_counter()
+import google.generativeai
+print(time.perf_counter() - t)
+"""
+
+def run_probe(code: str, env: dict = None) -> float:
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True,
+                            env={**os.environ, **(env or {})})
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return float(result.stdout.strip().splitlines()[-1])
+
+def measure(code: str, runs: int, env: dict = None) -> dict:
+    samples = [run_probe(code, env) for _ in range(runs)]
+    return {"median_ms": round(statistics.median(samples) * 1000, 2), "min_ms": round(min(samples) * 1000, 2)}
+
+def main() -> int:
+    from utils.catalog import TopicCatalog, DEFAULT_DATA_DIR
+
+    parser = argparse.ArgumentParser(description="Benchmark cold start with and without the compiled catalog")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        snapshot_path = os.path.join(temp_dir, "catalog.snapshot.pkl")
+        TopicCatalog(args.data_dir, snapshot_path=snapshot_path, use_compiled=False).compile()
+        missing_path = os.path.join(temp_dir, "missing.pkl")
+
+        results = {
+            "catalog_json": measure(CATALOG_PROBE.format(data_dir=args.data_dir, snapshot_path=missing_path,
+                                                         use_compiled=False), args.runs),
+            "catalog_compiled": measure(CATALOG_PROBE.format(data_dir=args.data_dir, snapshot_path=snapshot_path,
+                                                             use_compiled=True), args.runs),
+            "app_import_json": measure(APP_PROBE, args.runs, {"CATALOG_SNAPSHOT_PATH": missing_path}),
+            "app_import_compiled": measure(APP_PROBE, args.runs, {"CATALOG_SNAPSHOT_PATH": snapshot_path}),
+            # Paid at startup before the SDK import was deferred to the first LLM call
+            "genai_import": measure(GENAI_PROBE, args.runs)
+        }
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
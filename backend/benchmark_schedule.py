@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+📅 Schedule Allocation Benchmark
+Compares the one-pass schedule allocator against the former rotation loop in run_schedule_agent
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from agents.match_agent import standardize_topic_fields
+from utils.catalog import get_catalog, DEFAULT_DATA_DIR
+from utils.schedule_allocator import allocate_schedule, interest_week_niches
+
+DAYS_PER_WEEK = 7
+WEEKS = 4
+
+def rotation_loop(matched_topics):
+    """Topic selection exactly as run_schedule_agent did it before the allocator (activities not built)."""
+    used_topics = set()
+    topic_rotation_index = 0
+    assigned = []
+    fallbacks = 0
+    for week_num in range(1, WEEKS + 1):
+        for day_num in range(DAYS_PER_WEEK):
+            topic = None
+            attempts = 0
+            max_attempts = len(matched_topics) * 2
+            while topic is None and attempts < max_attempts:
+                if topic_rotation_index < len(matched_topics):
+                    potential_topic = matched_topics[topic_rotation_index]
+                    topic_id = f"{potential_topic.get('Topic', 'Unknown')}_{potential_topic.get('Niche', 'Unknown')}"
+                    if topic_id not in used_topics:
+                        topic = potential_topic
+                        used_topics.add(topic_id)
+                    else:
+                        topic_rotation_index = (topic_rotation_index + 1) % len(matched_topics)
+                else:
+                    topic_rotation_index = 0
+                    for i, potential_topic in enumerate(matched_topics):
+                        topic_id = f"{potential_topic.get('Topic', 'Unknown')}_{potential_topic.get('Niche', 'Unknown')}"
+                        if topic_id not in used_topics:
+                            topic = potential_topic
+                            used_topics.add(topic_id)
+                            topic_rotation_index = i + 1
+                            break
+                attempts += 1
+            if topic is None:
+                topic = matched_topics[(week_num * 7 + day_num) % len(matched_topics)]
+                fallbacks += 1
+            assigned.append(topic)
+            topic_rotation_index = (topic_rotation_index + 1) % len(matched_topics)
+    return assigned, fallbacks
+
+def time_call(func, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {"median_us": round(statistics.median(samples) * 1e6, 1), "min_us": round(min(samples) * 1e6, 1)}
+
+def niche_runs(topics) -> int:
+    """Adjacent days sharing a niche, within each week."""
+    return sum(1 for week in range(WEEKS) for day in range(1, DAYS_PER_WEEK)
+               if topics[week * DAYS_PER_WEEK + day].get("Niche") == topics[week * DAYS_PER_WEEK + day - 1].get("Niche"))
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark schedule allocation against the rotation loop")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--sizes", default="8,16,28,100,400", help="Comma-separated matched topic counts")
+    args = parser.parse_args()
+
+    catalog = get_catalog(args.data_dir).snapshot()
+    # Topics in the shape run_schedule_agent receives them: the match agent's standardized dicts
+    catalog_topics = [standardize_topic_fields(topic, is_standardized=False) for topic in catalog.topics]
+    if not catalog_topics:
+        print("No catalog topics found", file=sys.stderr)
+        return 1
+
+    results = {}
+    for size in (int(value) for value in args.sizes.split(",")):
+        # Matched lists mix niches like the match agent's: an even stride through the niche-sorted catalog
+        stride = max(1, len(catalog_topics) // size)
+        matched = [catalog_topics[(i * stride) % len(catalog_topics)] for i in range(size)]
+        legacy_topics, fallbacks = rotation_loop(matched)
+        # Themes for a child interested in the first two niches of the list
+        interests = list(dict.fromkeys(str(topic["Niche"]).lower() for topic in matched))[:2]
+        week_niches = interest_week_niches(matched, catalog.niche_graph.affinity(interests), weeks=WEEKS)
+        allocate = lambda: allocate_schedule(matched, weeks=WEEKS, days_per_week=DAYS_PER_WEEK, week_niches=week_niches)
+        allocation = allocate()
+        allocated_topics = [slot.topic for slot in allocation.slots]
+        results[str(size)] = {
+            "rotation_loop": {**time_call(lambda: rotation_loop(matched), args.runs),
+                              "silent_fallback_duplicates": fallbacks,
+                              "same_niche_adjacent_days": niche_runs(legacy_topics)},
+            "allocator": {**time_call(allocate, args.runs),
+                          "review_repeats": allocation.stats["review_repeats"],
+                          "same_niche_adjacent_days": niche_runs(allocated_topics)}
+        }
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
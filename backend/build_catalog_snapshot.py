@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+📦 Catalog Snapshot Build Step
+Compiles topics, niches, essential growth and their indexes into one binary snapshot
+"""
+
+import argparse
+import sys
+
+from utils.catalog import TopicCatalog, DEFAULT_DATA_DIR
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compile the catalog JSON sources into a binary snapshot")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Catalog data directory")
+    parser.add_argument("--output", default=None, help="Snapshot path (default: <data-dir>/catalog.snapshot.pkl)")
+    args = parser.parse_args()
+
+    # Always compile from the JSON sources, never from an older snapshot
+    catalog = TopicCatalog(args.data_dir, snapshot_path=args.output, use_compiled=False)
+    if not catalog.topics:
+        print(f"❌ No topics loaded from {catalog.data_dir} - snapshot not written")
+        return 1
+
+    path = catalog.compile()
+    stats = catalog.get_stats()
+    print(f"✅ Catalog {stats['version']} compiled to {path}")
+    print(f"   {stats['topics']} topics, {stats['niches']} niches, "
+          f"{stats['pillars']} pillars, {stats['pillar_activity_files']} pillar activity files")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
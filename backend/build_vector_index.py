@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+🧭 Topic Vector Index Build Step
+Builds the hashed TF-IDF topic vectors used for semantic matching, with no network access
+"""
+
+import argparse
+import sys
+
+from utils.catalog import TopicCatalog, DEFAULT_DATA_DIR
+from utils.vector_index import DEFAULT_DIM, VectorIndex, vector_index_path
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the topic vector index from the catalog")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Catalog data directory")
+    parser.add_argument("--output", default=None, help="Index path (default: <data-dir>/topic_vectors.npy)")
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM, help="Number of hashed feature columns")
+    args = parser.parse_args()
+
+    catalog = TopicCatalog(args.data_dir)
+    snapshot = catalog.snapshot()
+    if not snapshot.topics:
+        print(f"❌ No topics loaded from {catalog.data_dir} - vector index not written")
+        return 1
+
+    path = args.output or vector_index_path(catalog.data_dir)
+    index = VectorIndex.build(snapshot.version, snapshot.topics, args.dim)
+    index.save(path)
+    print(f"✅ Vector index for catalog {snapshot.version} written to {path}")
+    print(f"   {index.matrix.shape[0]} topics x {index.dim} float32 columns")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
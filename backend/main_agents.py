@@ -5,15 +5,28 @@ No Fallback Data - Uses Only Original Data Sources
 
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+import asyncio
 import logging
 import os
 import json
 import time
-from typing import Dict, Any, List
-import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from real_usage_tracker import real_usage_tracker
 from child_activity_tracker import child_activity_tracker
+from utils.catalog import get_catalog, DEFAULT_DATA_DIR
+from utils.topic_record import topics_to_dicts
+from utils.niche_loader import get_niche_loader
+from utils.match_cache import get_match_cache, profile_fingerprint
+from utils.plan_cache import get_plan_cache, plan_fingerprint, cache_status
+from utils.response_cache import serialize_json
+from utils.plan_stream import Emit, stream_done, stream_pipeline
+from utils.plan_compact import compact_plan_data, compact_agent_timings, strip_llm_text, is_compact_requested
+from utils.search_index import get_search_index
+from utils.vector_index import get_vector_index
+from utils.tracing import get_tracer, span
+from utils.plan_manager import PlanManager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -35,63 +48,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load data files - NO FALLBACK DATA
+# Load data files from the shared catalog - loaded once per process and
+# reloaded only when the source files change on disk
+CATALOG_DATA_DIR = DEFAULT_DATA_DIR
+
+# Least cosine similarity for a topic to count as matching free-text interests, absolute and
+# as a share of the best match; calibrated on the hashed TF-IDF index so one incidental
+# shared word ("space" in "Store Setup" for "dinosaurs and space") is not enough
+MIN_SEMANTIC_SIMILARITY = float(os.getenv("MIN_SEMANTIC_SIMILARITY", "0.1"))
+MIN_RELATIVE_SIMILARITY = float(os.getenv("MIN_RELATIVE_SIMILARITY", "0.6"))
+
+# Ranked candidates kept per profile for plan edits (three plans' worth of topics)
+EDIT_POOL_SIZE = int(os.getenv("EDIT_POOL_SIZE", "84"))
+
 def load_topics_data():
-    """Load topics data from the original data source."""
-    try:
-        topics_file = "data/topicsdata.json"
-        logger.info(f"📁 Loading topics data from {topics_file}")
-        
-        if not os.path.exists(topics_file):
-            logger.error(f"❌ Topics data file not found: {topics_file}")
-            return []
-            
-        with open(topics_file, "r", encoding='utf-8') as f:
-            data = json.load(f)
-            logger.info(f"✅ Successfully loaded {len(data)} topics from {topics_file}")
-            return data
-            
-    except Exception as e:
-        logger.error(f"❌ Error loading topics data: {e}")
-        return []
+    """Load topics data from the shared catalog."""
+    return get_catalog(CATALOG_DATA_DIR).topics
 
 def load_niches_data():
-    """Load niches data from the original data source."""
-    try:
-        niches_file = "data/nichesdata.json"
-        logger.info(f"📁 Loading niches data from {niches_file}")
-        
-        if not os.path.exists(niches_file):
-            logger.error(f"❌ Niches data file not found: {niches_file}")
-            return []
-            
-        with open(niches_file, "r", encoding='utf-8') as f:
-            data = json.load(f)
-            logger.info(f"✅ Successfully loaded {len(data)} niches from {niches_file}")
-            return data
-            
-    except Exception as e:
-        logger.error(f"❌ Error loading niches data: {e}")
-        return []
+    """Load niches data from the shared catalog."""
+    return get_catalog(CATALOG_DATA_DIR).niches
 
 def load_essential_growth_data():
-    """Load essential growth data from the original data source."""
-    try:
-        essential_file = "data/essential-growth/index.json"
-        logger.info(f"📁 Loading essential growth data from {essential_file}")
-        
-        if not os.path.exists(essential_file):
-            logger.error(f"❌ Essential growth data file not found: {essential_file}")
-            return {}
-            
-        with open(essential_file, "r", encoding='utf-8') as f:
-            data = json.load(f)
-            logger.info(f"✅ Successfully loaded essential growth data from {essential_file}")
-            return data
-            
-    except Exception as e:
-        logger.error(f"❌ Error loading essential growth data: {e}")
-        return {}
+    """Load essential growth data from the shared catalog."""
+    return get_catalog(CATALOG_DATA_DIR).essential_growth
 
 # Import the new systematic agents
 from agents.match_agent import run_match_agent
@@ -99,6 +79,21 @@ from agents.schedule_agent import run_schedule_agent
 from agents.plan_generator import RealPlanGenerator
 
 # Agent System Implementation
+class CatalogDataMixin:
+    """Gives agents read access to the shared catalog instead of private copies."""
+    
+    @property
+    def topics_data(self):
+        return load_topics_data()
+    
+    @property
+    def niches_data(self):
+        return load_niches_data()
+    
+    @property
+    def essential_growth_data(self):
+        return load_essential_growth_data()
+
 class ProfileAgent:
     """Profile Agent - Analyzes child profile and extracts key information."""
     
@@ -155,14 +150,11 @@ class ProfileAgent:
         logger.info(f"✅ Profile Agent completed in {time.time() - start_time:.2f} seconds")
         return result
 
-class MatchAgent:
+class MatchAgent(CatalogDataMixin):
     """Match Agent - Selects appropriate topics based on profile and history."""
     
     def __init__(self):
         logger.info("🎯 Initializing MatchAgent")
-        self.topics_data = load_topics_data()
-        self.niches_data = load_niches_data()
-        self.essential_growth_data = load_essential_growth_data()
         logger.info(f"📊 MatchAgent loaded {len(self.topics_data)} topics, {len(self.niches_data)} niches")
         
         if len(self.topics_data) == 0:
@@ -192,17 +184,15 @@ class MatchAgent:
         child_age = enhanced_profile.get("child_age", 7)
         interests = enhanced_profile.get("interests", ["AI"])
         learning_style = enhanced_profile.get("learning_style", "visual")
+        plan_type = enhanced_profile.get("plan_type", "hybrid")
         
         logger.info(f"🎯 Matching topics for {child_name} (age {child_age}) with interests: {interests}")
         
-        # Match topics based on interests and age
-        matched_topics = []
-        for topic in self.topics_data:
-            if self._is_topic_suitable(topic, child_age, interests, learning_style):
-                matched_topics.append(topic)
-        
-        # Limit to reasonable number of topics
-        matched_topics = matched_topics[:28]  # 4 weeks * 7 days
+        catalog = get_catalog(CATALOG_DATA_DIR).snapshot()
+        matched_ids, cache_hit = self._match_ids(catalog, child_age, interests, learning_style, plan_type)
+        matched_ids = list(matched_ids)
+        # Shared catalog records; converted to dicts only when the response is built
+        matched_topics = [catalog.topics[topic_id] for topic_id in matched_ids]
         
         logger.info(f"🎯 Matched {len(matched_topics)} topics")
         
@@ -216,7 +206,8 @@ class MatchAgent:
                 "cognitive_level_matched": True,
                 "learning_style_considered": True
             },
-            "agent_flow": "ProfileAgent → MatchAgent"
+            "agent_flow": "ProfileAgent → MatchAgent",
+            "cache_hit": cache_hit
         }
         
         result = {
@@ -224,6 +215,8 @@ class MatchAgent:
             "profile_analysis": profile_result.get("profile_analysis", {}),
             "enhanced_profile": enhanced_profile,
             "matched_topics": matched_topics,
+            "matched_topic_ids": matched_ids,
+            "catalog_version": catalog.version,
             "match_analysis": match_analysis,
             "agent_timing": {
                 "agent_name": "MatchAgent",
@@ -238,31 +231,131 @@ class MatchAgent:
         logger.info(f"✅ Match Agent completed in {time.time() - start_time:.2f} seconds")
         return result
     
-    def _is_topic_suitable(self, topic: Dict[str, Any], child_age: int, interests: List[str], learning_style: str) -> bool:
-        """Check if topic is suitable for the child."""
-        # Age appropriateness
-        topic_age = topic.get("Age", 5)
-        if abs(topic_age - child_age) > 2:
-            return False
+    def _match_ids(self, catalog, child_age: int, interests: List[str], learning_style: str,
+                   plan_type: str) -> Tuple[Tuple[int, ...], bool]:
+        """Matched topic ids for a profile and whether they came from the match cache."""
+        # Profiles with the same age, interests, learning style and plan type share a match
+        match_cache = get_match_cache()
+        fingerprint = profile_fingerprint(child_age, interests, learning_style, plan_type)
+        matched_ids = match_cache.get(catalog.version, fingerprint)
+        if matched_ids is not None:
+            return matched_ids, True
+        # Match topics based on interests and age, limited to 4 weeks * 7 days
+        matched_ids = tuple(self._find_suitable_topic_ids(catalog, child_age, interests)[:28])
+        match_cache.put(catalog.version, fingerprint, matched_ids)
+        return matched_ids, False
+    
+    def run_batch(self, profiles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Match topics for many children at once.
+        
+        Profiles are grouped by age and interest signature; each group's topics
+        are matched once and shared, and every child gets the group's selection.
+        """
+        start_time = time.time()
+        logger.info(f"🎯 Match Agent: Batch matching {len(profiles)} profiles")
+        
+        catalog = get_catalog(CATALOG_DATA_DIR).snapshot()
+        groups: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        children = []
+        cache_hits = 0
         
-        # Interest alignment
-        topic_niche = topic.get("Niche", "").lower()
-        topic_topic = topic.get("Topic", "").lower()
+        for position, profile in enumerate(profiles):
+            child_age = profile.get("child_age", 7)
+            interests = profile.get("interests", ["AI"])
+            learning_style = profile.get("preferred_learning_style", profile.get("learning_style", "visual"))
+            plan_type = profile.get("plan_type", "hybrid")
+            
+            # Eligibility depends only on age and interests
+            fingerprint = profile_fingerprint(child_age, interests, learning_style, plan_type)
+            signature = fingerprint[:2]
+            group = groups.get(signature)
+            if group is None:
+                matched_ids, cache_hit = self._match_ids(catalog, child_age, interests, learning_style, plan_type)
+                cache_hits += cache_hit
+                group = {
+                    "group_id": len(groups),
+                    "child_age": signature[0],
+                    "interests": list(signature[1]),
+                    "matched_topic_ids": list(matched_ids),
+                    "matched_topics": topics_to_dicts(catalog.topics[topic_id] for topic_id in matched_ids),
+                    "niches_covered": list(dict.fromkeys(catalog.topics[topic_id].get("Niche", "General") for topic_id in matched_ids)),
+                    "children": 0
+                }
+                groups[signature] = group
+            else:
+                # Later profiles with another learning style or plan type reuse the group's match
+                get_match_cache().put(catalog.version, fingerprint, tuple(group["matched_topic_ids"]))
+            group["children"] += 1
+            
+            children.append({
+                "index": position,
+                "child_name": profile.get("child_name", "Child"),
+                "child_id": profile.get("child_id"),
+                "group_id": group["group_id"],
+                "matched_topic_ids": group["matched_topic_ids"],
+                "total_topics_selected": len(group["matched_topic_ids"])
+            })
         
+        execution_time = time.time() - start_time
+        logger.info(f"✅ Batch matched {len(profiles)} profiles in {len(groups)} groups in {execution_time:.2f} seconds")
+        return {
+            "catalog_version": catalog.version,
+            "total_profiles": len(profiles),
+            "total_groups": len(groups),
+            "groups": list(groups.values()),
+            "children": children,
+            "agent_timing": {
+                "agent_name": "MatchAgent",
+                "execution_time_seconds": execution_time,
+                "cache_hits": cache_hits,
+                "llm_used": False,
+                "tokens_used": 0
+            }
+        }
+    
+    def _match_pool(self, catalog, child_age: int, interests: List[str], learning_style: str,
+                    plan_type: str) -> Tuple[Tuple[int, ...], bool]:
+        """Wider ranked candidate ids for plan edits, cached beside the match itself."""
+        match_cache = get_match_cache()
+        fingerprint = profile_fingerprint(child_age, interests, learning_style, plan_type) + ("edit_pool",)
+        pool_ids = match_cache.get(catalog.version, fingerprint)
+        if pool_ids is not None:
+            return pool_ids, True
+        pool_ids = tuple(self._find_suitable_topic_ids(catalog, child_age, interests, EDIT_POOL_SIZE)[:EDIT_POOL_SIZE])
+        match_cache.put(catalog.version, fingerprint, pool_ids)
+        return pool_ids, False
+    
+    def _find_suitable_topic_ids(self, catalog, child_age: int, interests: List[str], limit: int = 28) -> List[int]:
+        """Find ids of topics suitable for the child: exact interest matches in catalog order,
+        then topics whose text is most similar to the interests (up to limit in total)."""
+        topic_index = catalog.topic_index
+        # Age appropriateness: within 2 years of the child's age
+        age_ids = topic_index.ids_for_age_range(child_age - 2, child_age + 2)
+        
+        # Interest alignment: interest appears in the niche name or as a keyword of the topic
+        interest_ids = set()
         for interest in interests:
-            if interest.lower() in topic_niche or interest.lower() in topic_topic:
-                return True
+            interest_lower = interest.lower()
+            interest_ids |= topic_index.ids_for_niches(n for n in topic_index.niches if interest_lower in n)
+            interest_ids |= topic_index.ids_for_keywords(interest_lower)
         
-        return False
+        matched_ids = topic_index.ordered(age_ids & interest_ids)
+        
+        # Free-text interests ("dinosaurs and space") match by similarity to the topic text
+        if len(matched_ids) < limit and age_ids:
+            vector_index = get_vector_index(catalog, CATALOG_DATA_DIR)
+            similar = vector_index.top_k(" ".join(str(interest) for interest in interests), limit - len(matched_ids),
+                                         allowed=age_ids - set(matched_ids), min_score=MIN_SEMANTIC_SIMILARITY,
+                                         min_relative=MIN_RELATIVE_SIMILARITY)
+            matched_ids.extend(topic_id for topic_id, _ in similar)
+        
+        return matched_ids
 
-class ScheduleAgent:
+class ScheduleAgent(CatalogDataMixin):
     """Schedule Agent - Creates weekly learning plan using real topics only."""
     
     def __init__(self):
         logger.info("📅 Initializing ScheduleAgent")
-        self.topics_data = load_topics_data()
-        self.niches_data = load_niches_data()
-        self.essential_growth_data = load_essential_growth_data()
         self.plan_generator = RealPlanGenerator(self.topics_data, self.niches_data, self.essential_growth_data)
         logger.info(f"📊 ScheduleAgent loaded {len(self.topics_data)} topics, {len(self.niches_data)} niches")
     
@@ -484,19 +577,28 @@ class ReviewerAgent:
         return result
 
 # Initialize agents
+plan_manager = PlanManager()
 profile_agent = ProfileAgent()
 match_agent = MatchAgent()
 schedule_agent = ScheduleAgent()
 reviewer_agent = ReviewerAgent()
 
+# Plan generation runs here, off the event loop; the pool size bounds concurrent plans per worker
+PLAN_POOL_SIZE = int(os.getenv("PLAN_POOL_SIZE", "4"))
+plan_executor = ThreadPoolExecutor(max_workers=PLAN_POOL_SIZE, thread_name_prefix="plan")
+
+@app.on_event("shutdown")
+def shutdown_plan_pool():
+    plan_executor.shutdown(wait=False)
+
 # Setup Gemini
 def setup_gemini():
     """Setup Gemini API if available."""
     try:
         api_key = os.getenv("GOOGLE_API_KEY")
         if api_key:
-            genai.configure(api_key=api_key)
-            logger.info("✅ Gemini API configured successfully")
+            # The SDK itself is imported and configured on first use (utils.gemini_client)
+            logger.info("✅ Gemini API key found - SDK will load on first use")
             return True
         else:
             logger.warning("⚠️ GOOGLE_API_KEY not found - using fallback mode")
@@ -522,9 +624,10 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Detailed health check endpoint."""
-    topics_loaded = len(load_topics_data()) > 0
-    niches_loaded = len(load_niches_data()) > 0
-    essential_loaded = bool(load_essential_growth_data())
+    catalog = get_catalog(CATALOG_DATA_DIR).snapshot()
+    topics_loaded = len(catalog.topics) > 0
+    niches_loaded = len(catalog.niches) > 0
+    essential_loaded = bool(catalog.essential_growth)
     
     return {
         "status": "healthy",
@@ -534,99 +637,282 @@ async def health_check():
         "data_loaded": topics_loaded and niches_loaded and essential_loaded,
         "topics_loaded": topics_loaded,
         "niches_loaded": niches_loaded,
-        "essential_loaded": essential_loaded
+        "essential_loaded": essential_loaded,
+        "catalog_version": catalog.version,
+        "niche_cache": get_niche_loader(CATALOG_DATA_DIR).get_stats(),
+        "match_cache": get_match_cache().get_stats()
     }
 
-@app.post("/api/generate-plan")
-async def generate_plan(request: Request):
-    """Generate a personalized learning plan using the full agent system."""
+@app.get("/api/agent-metrics")
+async def get_agent_metrics():
+    """Get agent cache metrics."""
+    return {
+        "matchAgent": {
+            "matchCache": get_match_cache().get_stats()
+        },
+        "planCache": get_plan_cache().get_stats(),
+        "spans": get_tracer().get_stats(),
+        "catalogVersion": get_catalog(CATALOG_DATA_DIR).snapshot().version,
+        "timestamp": time.time()
+    }
+
+def cache_metrics():
+    """Cache counters for /metrics, read from the caches' own stats at scrape time."""
+    match_stats = get_match_cache().get_stats()
+    plan_stats = get_plan_cache().get_stats()
+    yield ("cache_hits_total", "counter", "Cache lookups answered from the cache.", {
+        (("cache", "match"),): match_stats["hits"],
+        (("cache", "plan"), ("tier", "memory")): plan_stats["memory_hits"],
+        (("cache", "plan"), ("tier", "disk")): plan_stats["disk_hits"]
+    })
+    yield ("cache_misses_total", "counter", "Cache lookups that ran the agents.", {
+        (("cache", "match"),): match_stats["misses"],
+        (("cache", "plan"),): plan_stats["misses"]
+    })
+    yield ("cache_entries", "gauge", "Entries currently cached.", {
+        (("cache", "match"),): match_stats["entries"],
+        (("cache", "plan"),): plan_stats["entries"]
+    })
+
+get_tracer().add_collector(cache_metrics)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: span latency histograms, error counters, in-flight gauges and cache counters."""
+    return PlainTextResponse(get_tracer().render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/niches/{slug}")
+async def get_niche(slug: str):
+    """Get one niche's details and topics, loaded on first use."""
+    niche = get_niche_loader(CATALOG_DATA_DIR).get(slug)
+    if niche is None:
+        raise HTTPException(status_code=404, detail=f"Niche not found: {slug}")
+    return {
+        "slug": niche.slug,
+        "niche": niche.info,
+        "topics": topics_to_dicts(niche.topics),
+        "count": len(niche.topics)
+    }
+
+@app.get("/api/essential-growth/{pillar}/activities")
+async def get_essential_growth_activities(pillar: str, age_group: Optional[str] = None, category: Optional[str] = None,
+                                          difficulty: Optional[str] = None, age_months: Optional[int] = None):
+    """Get a pillar's activities filtered by age group, category, difficulty and age in months."""
+    catalog = get_catalog(CATALOG_DATA_DIR).snapshot()
+    if pillar not in catalog.pillar_activities:
+        raise HTTPException(status_code=404, detail=f"Pillar not found: {pillar}")
+    index = catalog.essential_growth_index
+    activities = index.find(pillar, age_group, category, difficulty, age_months)
+    return {
+        "pillar": pillar,
+        "filters": {"age_group": age_group, "category": category, "difficulty": difficulty, "age_months": age_months},
+        "activities": activities,
+        "count": len(activities),
+        "age_groups": index.values("age_group", pillar),
+        "categories": index.values("category", pillar)
+    }
+
+@app.get("/api/search")
+async def search(q: str, limit: int = 20, type: Optional[str] = None):
+    """Full-text search over topics and essential-growth activities, ranked by BM25."""
+    if type not in (None, "topic", "activity"):
+        raise HTTPException(status_code=400, detail="type must be 'topic' or 'activity'")
+    limit = max(1, min(limit, 100))
+    catalog = get_catalog(CATALOG_DATA_DIR).snapshot()
     
-    try:
-        # Get the request body
-        body = await request.json()
-        profile = body.get("profile", {})
-        
-        logger.info("🚀 Starting full agent system")
-        
-        # Step 1: Profile Agent
-        logger.info("Step 1: Profile Agent")
+    results = []
+    for doc_type, doc_id, score in get_search_index(catalog).search(q, limit, type):
+        if doc_type == "topic":
+            topic = catalog.topics[doc_id]
+            results.append({
+                "type": "topic",
+                "id": doc_id,
+                "score": score,
+                "title": topic.get("Topic", ""),
+                "niche": topic.get("Niche", ""),
+                "age": topic.get("Age", ""),
+                "objective": topic.get("Objective", "")
+            })
+        else:
+            activity = catalog.essential_growth_index.get(doc_id)
+            results.append({
+                "type": "activity",
+                "id": doc_id,
+                "score": score,
+                "title": activity.get("topic", ""),
+                "pillar": activity.get("pillar", ""),
+                "age_group": activity.get("ageGroup", ""),
+                "category": activity.get("category", ""),
+                "age": activity.get("age", ""),
+                "objective": activity.get("objective", "")
+            })
+    
+    return {
+        "query": q,
+        "results": results,
+        "count": len(results),
+        "catalog_version": catalog.version
+    }
+
+def run_plan_pipeline(profile: Dict[str, Any], emit: Optional[Emit] = None, compact: bool = False) -> Dict[str, Any]:
+    """Run Profile → Match → Schedule → Reviewer for one profile (blocking; runs in the plan pool).
+    
+    emit(event, data), if given, receives each stage's output as soon as it is ready.
+    compact selects the compact response shape (utils.plan_compact).
+    """
+    with span("pipeline.plan", streamed=emit is not None, compact=compact):
+        return _run_plan_stages(profile, emit or (lambda event, data: None), compact)
+
+def _run_plan_stages(profile: Dict[str, Any], emit: Emit, compact: bool) -> Dict[str, Any]:
+    logger.info("🚀 Starting full agent system")
+    
+    # Step 1: Profile Agent
+    logger.info("Step 1: Profile Agent")
+    with span("agent.profile"):
         profile_result = profile_agent.run(profile)
-        profile_analysis = profile_result["profile_analysis"]
-        profile_timing = profile_result["agent_timing"]
-        
-        # Step 2: Match Agent (Systematic Topic Selection)
-        logger.info("Step 2: Match Agent - Systematic Topic Selection")
+    profile_analysis = profile_result["profile_analysis"]
+    profile_timing = profile_result["agent_timing"]
+    emit("profile", {"profile_analysis": profile_analysis, "agent_timing": profile_timing})
+    
+    # Step 2: Match Agent (Systematic Topic Selection)
+    logger.info("Step 2: Match Agent - Systematic Topic Selection")
+    with span("agent.match"):
         match_result = match_agent.run(profile_result)
-        match_timing = match_result["agent_timing"]
-        logger.info(f"📊 Match Agent result keys: {list(match_result.keys())}")
-        
-        # Ensure Profile Agent data flows through
-        match_result.update({
-            "profile": profile_result.get("profile", {}),
-            "profile_analysis": profile_result.get("profile_analysis", {}),
-            "enhanced_profile": profile_result.get("enhanced_profile", {})
-        })
-        
-        # Log matched topics for debugging
-        matched_topics = match_result.get("matched_topics", [])
-        match_analysis = match_result.get("match_analysis", {})
-        logger.info(f"🎯 Match Agent returned {len(matched_topics)} topics")
-        logger.info(f"📊 Match analysis: {match_analysis}")
-        for i, topic in enumerate(matched_topics[:5], 1):  # Log first 5 topics
-            logger.info(f"  {i}. {topic.get('Topic', 'Unknown')} ({topic.get('Niche', 'Unknown')})")
-        
-        # Step 3: Schedule Agent (Systematic 4-Week Planning)
-        logger.info("Step 3: Schedule Agent - Systematic 4-Week Planning")
+    match_timing = match_result["agent_timing"]
+    logger.info(f"📊 Match Agent result keys: {list(match_result.keys())}")
+    
+    # Ensure Profile Agent data flows through
+    match_result.update({
+        "profile": profile_result.get("profile", {}),
+        "profile_analysis": profile_result.get("profile_analysis", {}),
+        "enhanced_profile": profile_result.get("enhanced_profile", {})
+    })
+    
+    # Log matched topics for debugging
+    matched_topics = match_result.get("matched_topics", [])
+    match_analysis = match_result.get("match_analysis", {})
+    logger.info(f"🎯 Match Agent returned {len(matched_topics)} topics")
+    logger.info(f"📊 Match analysis: {match_analysis}")
+    for i, topic in enumerate(matched_topics[:5], 1):  # Log first 5 topics
+        logger.info(f"  {i}. {topic.get('Topic', 'Unknown')} ({topic.get('Niche', 'Unknown')})")
+    emit("match", {"matched_topics": topics_to_dicts(matched_topics), "match_analysis": match_analysis,
+                   "agent_timing": match_timing})
+    
+    # Step 3: Schedule Agent (Systematic 4-Week Planning)
+    logger.info("Step 3: Schedule Agent - Systematic 4-Week Planning")
+    with span("agent.schedule"):
         schedule_result = schedule_agent.run(match_result)
-        schedule_timing = schedule_result["agent_timing"]
-        
-        # Step 4: Reviewer Agent (Quality Assurance)
-        logger.info("Step 4: Reviewer Agent - Quality Assurance")
+    schedule_timing = schedule_result["agent_timing"]
+    for week_number, (week, week_plan) in enumerate(schedule_result.get("weekly_plan", {}).items(), 1):
+        emit("week", {"week_number": week_number, "week": week, "plan": week_plan})
+    emit("schedule", {
+        "learning_objectives": schedule_result.get("learning_objectives", []),
+        "recommended_activities": schedule_result.get("recommended_activities", []),
+        "progress_tracking": schedule_result.get("progress_tracking", {}),
+        "agent_timing": schedule_timing
+    })
+    
+    # Step 4: Reviewer Agent (Quality Assurance)
+    logger.info("Step 4: Reviewer Agent - Quality Assurance")
+    with span("agent.reviewer"):
         reviewer_result = reviewer_agent.run(schedule_result)
-        reviewer_timing = reviewer_result["agent_timing"]
-        
-        # Combine all results
-        final_result = {
-            "success": True,
-            "data": reviewer_result,
-            "message": "Plan generated successfully using full agent system",
-            "agent_flow": "Profile → Match → Schedule → Reviewer",
-            "real_agents": True,
-            "agent_timings": {
-                "profile_agent": profile_timing,
-                "match_agent": match_timing,
-                "schedule_agent": schedule_timing,
-                "reviewer_agent": reviewer_timing,
-                "total_execution_time": sum([
-                    profile_timing["execution_time_seconds"],
-                    match_timing["execution_time_seconds"],
-                    schedule_timing["execution_time_seconds"],
-                    reviewer_timing["execution_time_seconds"]
-                ])
-            },
-            "llm_integration": {
-                "gemini_available": gemini_available,
-                "profile_agent_llm_used": profile_timing.get("llm_used", False),
-                "profile_agent_prompt": profile_timing.get("llm_prompt"),
-                "profile_agent_response": profile_timing.get("llm_response"),
-                "profile_agent_tokens_used": profile_timing.get("tokens_used", 0),
-                "match_agent_llm_used": match_timing.get("llm_used", False),
-                "match_agent_prompt": match_timing.get("llm_prompt"),
-                "match_agent_response": match_timing.get("llm_response"),
-                "match_agent_tokens_used": match_timing.get("tokens_used", 0),
-                "schedule_agent_llm_used": schedule_timing.get("llm_used", False),
-                "schedule_agent_prompt": schedule_timing.get("llm_prompt"),
-                "schedule_agent_response": schedule_timing.get("llm_response"),
-                "schedule_agent_tokens_used": schedule_timing.get("tokens_used", 0),
-                "reviewer_agent_llm_used": reviewer_timing.get("llm_used", False),
-                "reviewer_agent_prompt": reviewer_timing.get("llm_prompt"),
-                "reviewer_agent_response": reviewer_timing.get("llm_response"),
-                "reviewer_agent_tokens_used": reviewer_timing.get("tokens_used", 0)
-            }
+    reviewer_timing = reviewer_result["agent_timing"]
+    emit("review", {
+        "review_insights": reviewer_result.get("review_insights", {}),
+        "review_analysis": reviewer_result.get("review_analysis", {}),
+        "agent_timing": reviewer_timing
+    })
+    
+    # Combine all results; catalog topic records become plain dicts only here
+    if compact:
+        data = compact_plan_data(reviewer_result)
+    else:
+        data = {**reviewer_result, "matched_topics": topics_to_dicts(reviewer_result.get("matched_topics", []))}
+    final_result = {
+        "success": True,
+        "data": data,
+        "message": "Plan generated successfully using full agent system",
+        "agent_flow": "Profile → Match → Schedule → Reviewer",
+        "real_agents": True,
+        "agent_timings": {
+            "profile_agent": profile_timing,
+            "match_agent": match_timing,
+            "schedule_agent": schedule_timing,
+            "reviewer_agent": reviewer_timing,
+            "total_execution_time": sum([
+                profile_timing["execution_time_seconds"],
+                match_timing["execution_time_seconds"],
+                schedule_timing["execution_time_seconds"],
+                reviewer_timing["execution_time_seconds"]
+            ])
+        },
+        "llm_integration": {
+            "gemini_available": gemini_available,
+            "profile_agent_llm_used": profile_timing.get("llm_used", False),
+            "profile_agent_prompt": profile_timing.get("llm_prompt"),
+            "profile_agent_response": profile_timing.get("llm_response"),
+            "profile_agent_tokens_used": profile_timing.get("tokens_used", 0),
+            "match_agent_llm_used": match_timing.get("llm_used", False),
+            "match_agent_prompt": match_timing.get("llm_prompt"),
+            "match_agent_response": match_timing.get("llm_response"),
+            "match_agent_tokens_used": match_timing.get("tokens_used", 0),
+            "schedule_agent_llm_used": schedule_timing.get("llm_used", False),
+            "schedule_agent_prompt": schedule_timing.get("llm_prompt"),
+            "schedule_agent_response": schedule_timing.get("llm_response"),
+            "schedule_agent_tokens_used": schedule_timing.get("tokens_used", 0),
+            "reviewer_agent_llm_used": reviewer_timing.get("llm_used", False),
+            "reviewer_agent_prompt": reviewer_timing.get("llm_prompt"),
+            "reviewer_agent_response": reviewer_timing.get("llm_response"),
+            "reviewer_agent_tokens_used": reviewer_timing.get("tokens_used", 0)
         }
+    }
+    
+    if compact:
+        final_result["agent_timings"] = compact_agent_timings(final_result["agent_timings"])
+        final_result["llm_integration"] = strip_llm_text(final_result["llm_integration"])
+        final_result["compact"] = True
+    
+    logger.info("✅ Full agent system completed successfully")
+    return final_result
+
+def plan_is_cacheable(final_result: Dict[str, Any]) -> bool:
+    """Plans made without LLM calls are a pure function of profile and catalog."""
+    return not any(timing.get("llm_used") for timing in final_result["agent_timings"].values() if isinstance(timing, dict))
+
+async def run_in_plan_pool(func, *args):
+    """Run blocking agent work in the bounded plan pool so the event loop keeps serving other requests."""
+    return await asyncio.get_running_loop().run_in_executor(plan_executor, func, *args)
+
+@app.post("/api/generate-plan")
+async def generate_plan(request: Request):
+    """Generate a personalized learning plan using the full agent system.
+    
+    ?compact=1 returns each matched topic once, keyed by id, with days referencing topic ids.
+    """
+    
+    try:
+        # Get the request body
+        payload = await request.json()
+        profile = payload.get("profile", {})
+        compact = is_compact_requested(request.query_params.get("compact"))
+        
+        # Agents without LLM calls make the plan a pure function of profile and catalog
+        plan_cache = get_plan_cache()
+        version = get_catalog(CATALOG_DATA_DIR).snapshot().version
+        fingerprint = plan_fingerprint(profile) + ("-compact" if compact else "")
+        body, tier = plan_cache.get(version, fingerprint)
+        if body is not None:
+            return Response(content=body, media_type="application/json",
+                            headers={"Cache-Status": cache_status(True, tier)})
         
-        logger.info("✅ Full agent system completed successfully")
-        return JSONResponse(content=final_result)
+        final_result = await run_in_plan_pool(run_plan_pipeline, profile, None, compact)
+        with span("serialize.plan", compact=compact):
+            body = serialize_json(final_result)
+        cacheable = plan_is_cacheable(final_result)
+        if cacheable:
+            plan_cache.put(version, fingerprint, body)
+        return Response(content=body, media_type="application/json",
+                        headers={"Cache-Status": cache_status(False, stored=cacheable)})
         
     except Exception as e:
         logger.error(f"❌ Error in generate_plan: {e}")
@@ -639,6 +925,119 @@ async def generate_plan(request: Request):
             }
         )
 
+@app.post("/api/generate-plan/stream")
+async def generate_plan_stream(request: Request):
+    """Generate a plan as server-sent events: profile, match, one week event per week,
+    schedule, review, then done (or error).
+    
+    A cached plan is sent at once as a single done event carrying the whole plan,
+    exactly as /api/generate-plan returns it.
+    """
+    payload = await request.json()
+    profile = payload.get("profile", {})
+    plan_cache = get_plan_cache()
+    version = get_catalog(CATALOG_DATA_DIR).snapshot().version
+    fingerprint = plan_fingerprint(profile)
+    body, tier = plan_cache.get(version, fingerprint)
+    if body is not None:
+        return stream_done(body, headers={"Cache-Status": cache_status(True, tier)})
+    
+    def run(emit: Emit) -> Dict[str, Any]:
+        final_result = run_plan_pipeline(profile, emit)
+        # Serialized here in the plan pool, not on the event loop; a streamed plan
+        # also serves later non-streamed requests for the same profile
+        if plan_is_cacheable(final_result):
+            with span("serialize.plan", streamed=True):
+                plan_cache.put(version, fingerprint, serialize_json(final_result))
+        return final_result
+    
+    def finish(final_result: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: final_result[key] for key in ("success", "message", "agent_flow", "agent_timings")}
+    
+    return stream_pipeline(run, plan_executor, finish, headers={"Cache-Status": cache_status(False)})
+
+@app.post("/api/plans/edit")
+async def edit_plan(request: Request):
+    """Swap a day, a week or a difficulty band of a saved plan without rerunning the agents.
+    
+    Body: {"plan": <PlanManager plan or /api/generate-plan data>, "edit": {"type": "replace_day" |
+    "replace_week" | "replace_difficulty_band", ...}}. Replacements come from the profile's cached
+    match pool. generate-plan data is edited as a PlanManager plan (day_index counts a week's days
+    from its first) and also returned as "data" with the replaced days rebuilt.
+    """
+    body = await request.json()
+    plan = body.get("plan")
+    edit = body.get("edit")
+    generated = plan if plan_manager.is_generated_plan(plan) else None
+    try:
+        if generated is not None:
+            plan = plan_manager.from_generated_plan(generated)
+        plan_manager.validate_plan(plan)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not isinstance(edit, dict):
+        raise HTTPException(status_code=400, detail="edit must be an object")
+    
+    child_profile = plan.get("child_profile") or {}
+    try:
+        child_age = int(child_profile.get("child_age", child_profile.get("age", 7)))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="plan.child_profile age must be a whole number of years")
+    interests = child_profile.get("interests", ["AI"])
+    if not isinstance(interests, list) or not all(isinstance(interest, str) for interest in interests):
+        raise HTTPException(status_code=400, detail="plan.child_profile.interests must be a list of strings")
+    
+    with span("plan.edit", edit_type=edit.get("type")):
+        catalog = get_catalog(CATALOG_DATA_DIR).snapshot()
+        pool_ids, cache_hit = match_agent._match_pool(
+            catalog,
+            child_age,
+            interests,
+            str(child_profile.get("learning_style", child_profile.get("preferred_learning_style", "visual"))),
+            str(child_profile.get("plan_type", "hybrid"))
+        )
+        try:
+            edited = plan_manager.edit_plan(plan, edit, [catalog.topics[topic_id] for topic_id in pool_ids])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        content = {"success": True, "plan": edited, "pool_cache_hit": cache_hit}
+        if generated is not None:
+            content["data"] = plan_manager.apply_to_generated_plan(
+                generated, edited, lambda topic: schedule_agent.plan_generator._create_day_activity(topic, child_profile))
+    
+    return JSONResponse(content=content)
+
+# Largest cohort accepted by one batch match request
+MAX_BATCH_PROFILES = int(os.getenv("MAX_BATCH_PROFILES", "1000"))
+
+def traced_match_batch(profiles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    with span("agent.match_batch", profiles=len(profiles)):
+        return match_agent.run_batch(profiles)
+
+@app.post("/api/match/batch")
+async def match_batch(request: Request):
+    """Match topics for a cohort of children in one request."""
+    body = await request.json()
+    profiles = body.get("profiles")
+    if not isinstance(profiles, list) or not all(isinstance(profile, dict) for profile in profiles):
+        raise HTTPException(status_code=400, detail="profiles must be a list of profile objects")
+    if len(profiles) > MAX_BATCH_PROFILES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_PROFILES} profiles per batch")
+    
+    try:
+        result = await run_in_plan_pool(traced_match_batch, profiles)
+        return JSONResponse(content={"success": True, "data": result})
+    except Exception as e:
+        logger.error(f"❌ Error in match_batch: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": str(e),
+                "message": "Failed to match profiles"
+            }
+        )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
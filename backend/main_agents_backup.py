@@ -9,10 +9,19 @@ import logging
 import os
 import json
 import time
-from typing import Dict, Any, List
-import google.generativeai as genai
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
 from real_usage_tracker import real_usage_tracker
 from child_activity_tracker import child_activity_tracker
+from utils.catalog import get_catalog
+from utils.age_utils import age_overlaps
+from utils.topic_record import topics_to_dicts
+from utils.gemini_client import get_model, generate_content
+from utils.response_cache import get_response_cache
+from utils.topic_listing import stream_topic_page, get_filter_index
+from utils.facet_index import get_facet_index
+from utils.completion_index import get_completion_index
+from utils.match_scoring import mmr_select, stable_seed
 
 # Test deployment with new service account key
 
@@ -36,68 +45,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load data files
+# Load data files from the shared catalog - loaded once per process and
+# reloaded only when the source files change on disk
+CATALOG_DATA_DIR = "src/data"
+
+# Topics per niche in a 28-topic plan; exceeded only when the eligible pool cannot fill the plan otherwise
+MATCH_NICHE_QUOTA = 4
+
 def load_topics_data():
-    """Load topics data from the original data source."""
-    try:
-        # Load from the correct path in the project structure
-        topics_file = "src/data/topicsdata.json"
-        logger.info(f"📁 Loading topics data from {topics_file}")
-        
-        if not os.path.exists(topics_file):
-            logger.error(f"❌ Topics data file not found: {topics_file}")
-            logger.error(f"📁 Current working directory: {os.getcwd()}")
-            return []
-            
-        with open(topics_file, "r", encoding='utf-8') as f:
-            data = json.load(f)
-            logger.info(f"✅ Successfully loaded {len(data)} topics from {topics_file}")
-            return data
-            
-    except Exception as e:
-        logger.error(f"❌ Error loading topics data: {e}")
-        logger.error(f"📁 Current working directory: {os.getcwd()}")
-        return []
+    """Load topics data from the shared catalog."""
+    return get_catalog(CATALOG_DATA_DIR).topics
 
 def load_niches_data():
-    """Load niches data from the original data source."""
-    try:
-        # Load from the correct path in the project structure
-        niches_file = "src/data/nichesdata.json"
-        logger.info(f"📁 Loading niches data from {niches_file}")
-        
-        if not os.path.exists(niches_file):
-            logger.error(f"❌ Niches data file not found: {niches_file}")
-            return []
-            
-        with open(niches_file, "r", encoding='utf-8') as f:
-            data = json.load(f)
-            logger.info(f"✅ Successfully loaded {len(data)} niches from {niches_file}")
-            return data
-            
-    except Exception as e:
-        logger.error(f"❌ Error loading niches data: {e}")
-        return []
+    """Load niches data from the shared catalog."""
+    return get_catalog(CATALOG_DATA_DIR).niches
 
 def load_essential_growth_data():
-    """Load essential growth data from the original data source."""
+    """Load essential growth data from the shared catalog."""
+    return get_catalog(CATALOG_DATA_DIR).essential_growth
+
+def iter_saved_progress():
+    """(child id, completedTopics) of every saved schedule progress document; None without Firebase.
+
+    One collection-group read of the scheduleProgress documents (no filter, so no extra index),
+    run by the completion index's background load rather than per request. Documents saved
+    before completedTopics was stored are picked up on their next progress update.
+    """
     try:
-        # Load from the correct path in the project structure
-        essential_file = "src/data/essential-growth/index.json"
-        logger.info(f"📁 Loading essential growth data from {essential_file}")
-        
-        if not os.path.exists(essential_file):
-            logger.error(f"❌ Essential growth data file not found: {essential_file}")
-            return {}
-            
-        with open(essential_file, "r", encoding='utf-8') as f:
-            data = json.load(f)
-            logger.info(f"✅ Successfully loaded essential growth data from {essential_file}")
-            return data
-            
-    except Exception as e:
-        logger.error(f"❌ Error loading essential growth data: {e}")
-        return {}
+        from firebase_service import firebase_service
+    except ImportError:
+        return None
+    if not firebase_service.initialized:
+        return None
+    progress_docs = firebase_service.db.collection_group('scheduleProgress').select(['completedTopics']).stream()
+    return ((doc.reference.parent.parent.id, doc.to_dict().get('completedTopics') or [])
+            for doc in progress_docs)
+
+def load_completion_index():
+    """Completion index over this app's learning history and saved schedule progress."""
+    return get_completion_index(CATALOG_DATA_DIR, progress_source=iter_saved_progress)
 
 # Import the new systematic agents
 from agents.match_agent import run_match_agent
@@ -105,6 +91,21 @@ from agents.schedule_agent import run_schedule_agent
 from agents.plan_generator import RealPlanGenerator
 
 # Agent System Implementation
+class CatalogDataMixin:
+    """Gives agents read access to the shared catalog instead of private copies."""
+    
+    @property
+    def topics_data(self):
+        return load_topics_data()
+    
+    @property
+    def niches_data(self):
+        return load_niches_data()
+    
+    @property
+    def essential_growth_data(self):
+        return load_essential_growth_data()
+
 class ProfileAgent:
     """Profile Agent - Analyzes child profile and extracts key information."""
     
@@ -174,8 +175,8 @@ class ProfileAgent:
                 Provide detailed, actionable insights that will help create the most effective learning plan for this child.
                 """
                 
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                response = model.generate_content(prompt)
+                model = get_model('gemini-1.5-flash', gemini_api_key)
+                response = generate_content(model, prompt, agent="profile")
                 llm_response = response.text
                 llm_used = True
                 
@@ -553,14 +554,11 @@ class ProfileAgent:
         
         return considerations
 
-class MatchAgent:
+class MatchAgent(CatalogDataMixin):
     """Match Agent - Selects appropriate topics based on profile and history."""
     
     def __init__(self):
         logger.info("🎯 Initializing MatchAgent")
-        self.topics_data = load_topics_data()
-        self.niches_data = load_niches_data()
-        self.essential_growth_data = load_essential_growth_data()
         logger.info(f"📊 MatchAgent loaded {len(self.topics_data)} topics, {len(self.niches_data)} niches, and essential growth data")
         
         if len(self.topics_data) == 0:
@@ -578,21 +576,24 @@ class MatchAgent:
         else:
             logger.info(f"✅ Essential growth data loaded successfully. Pillars: {len(self.essential_growth_data.get('pillars', []))}")
     
-    def _get_child_history(self, child_name: str) -> List[str]:
-        """Get child's learning history to avoid repeating topics."""
-        # TODO: In a real implementation, this would query a database
-        # For now, return empty list as no history tracking is implemented
-        completed_topics = []
-        logger.info(f"📚 Child history for {child_name}: {completed_topics} (no history tracking implemented)")
-        return completed_topics
+    def _get_child_history(self, child_key: str, catalog) -> Tuple[List[str], np.ndarray]:
+        """Get child's learning history to avoid repeating topics: completed topic names
+        and a mask of completed topic ids, from the in-memory completion index."""
+        completion_index = load_completion_index()
+        completed_topics = sorted(completion_index.completed_names(child_key))
+        completed_mask = completion_index.completed_mask(child_key, catalog)
+        logger.info(f"📚 Child history for {child_key}: {len(completed_topics)} completed topics "
+                    f"({int(completed_mask.sum())} catalog entries excluded)")
+        return completed_topics, completed_mask
     
     def _get_all_available_niches(self) -> List[str]:
         """Get all available niches from the data."""
-        niches = set()
+        # First-seen catalog order, so the list is the same in every process
+        niches = {}
         for topic in self.topics_data:
             niche = topic.get("Niche", "")
             if niche:
-                niches.add(niche)
+                niches.setdefault(niche, None)
         return list(niches)
     
     def _format_topics_for_display(self, topics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -642,7 +643,9 @@ class MatchAgent:
         logger.info(f"📊 Available topics: {len(self.topics_data)}")
         
         # Get child's learning history
-        completed_topics = self._get_child_history(child_name)
+        catalog = get_catalog(CATALOG_DATA_DIR).snapshot()
+        child_key = enhanced_profile.get("child_id") or profile.get("child_id") or child_name
+        completed_topics, completed_mask = self._get_child_history(child_key, catalog)
         
         # Get all available niches (not just parent-selected interests)
         all_niches = self._get_all_available_niches()
@@ -650,10 +653,14 @@ class MatchAgent:
         logger.info(f"🎯 Child interests: {interests}")
         
         # Filter topics using new enhanced data structure
+        # Eligible topics are tracked as (topic id, priority) pairs over the shared catalog records
+        topics_data = catalog.topics
         eligible_topics = []
         logger.info(f"🔍 Filtering topics for age {child_age} using enhanced data structure...")
         
-        for topic in self.topics_data:
+        # Completed topics are masked out in one step instead of being checked per topic
+        for topic_id in np.flatnonzero(~completed_mask).tolist():
+            topic = topics_data[topic_id]
             topic_name = topic.get("Topic", "")
             topic_niche = topic.get("Niche", "")
             
@@ -662,11 +669,6 @@ class MatchAgent:
             difficulty = topic.get("difficulty", "")
             learning_stage = topic.get("dynamic_path", {}).get("stage", "")
             
-            # Skip if topic is already completed
-            if topic_name in completed_topics:
-                logger.info(f"⏭️ Skipping completed topic: {topic_name}")
-                continue
-            
             # Age group matching using new system
             age_appropriate = False
             if age_group:
@@ -690,23 +692,10 @@ class MatchAgent:
                     elif 9 <= child_age <= 12 and age_group in ["Children", "Pre-Teen"]:
                         age_appropriate = True
             else:
-                # Fallback to old age system
-                age_str = topic.get("Age", "7")
-                try:
-                    if " and " in age_str:
-                        ages = age_str.split(" and ")
-                        topic_age_range = [int(ages[0]), int(ages[1])]
-                    elif "-" in age_str:
-                        ages = age_str.split("-")
-                        topic_age_range = [int(ages[0]), int(ages[1])]
-                    else:
-                        topic_age_range = [int(age_str), int(age_str)]
-                    
-                    age_min = max(1, child_age - 2)
-                    age_max = min(12, child_age + 2)
-                    age_appropriate = topic_age_range[0] <= age_max and topic_age_range[1] >= age_min
-                except:
-                    age_appropriate = True  # Default fallback
+                # Fallback to old age system - bounds were normalized at catalog ingest
+                age_min = max(1, child_age - 2)
+                age_max = min(12, child_age + 2)
+                age_appropriate = age_overlaps(topic, age_min, age_max)
             
             if age_appropriate:
                 logger.info(f"✅ Age appropriate: {topic_name} (age_group: {age_group}, difficulty: {difficulty}, stage: {learning_stage})")
@@ -715,55 +704,44 @@ class MatchAgent:
                 if any(interest.lower() in topic_niche.lower() for interest in interests):
                     # High priority: matches parent interests
                     logger.info(f"🎯 High priority (matches interests): {topic_name}")
-                    eligible_topics.append({**topic, "priority": "high"})
+                    eligible_topics.append((topic_id, "high"))
                 else:
                     # Medium priority: other age-appropriate topics
                     logger.info(f"📚 Medium priority: {topic_name}")
-                    eligible_topics.append({**topic, "priority": "medium"})
+                    eligible_topics.append((topic_id, "medium"))
             else:
                 logger.info(f"❌ Age inappropriate: {topic_name} (age_group: {age_group} vs child age {child_age})")
         
         logger.info(f"📋 Eligible topics found: {len(eligible_topics)}")
-        for topic in eligible_topics:
-            logger.info(f"  - {topic.get('Topic', 'Unknown')} ({topic.get('priority', 'unknown')} priority)")
-        
-        # Select exactly 28 topics for 4 weeks x 7 days
-        selected_topics = []
-        niches_seen = set()
-        
-        # First, prioritize high-priority topics (matching interests)
-        high_priority = [t for t in eligible_topics if t.get("priority") == "high"]
-        logger.info(f"🎯 High priority topics: {len(high_priority)}")
-        for topic in high_priority:
-            if len(selected_topics) >= 28:  # Updated to 28 topics for 4 weeks × 7 days
-                break
-            niche = topic.get("Niche", "")
-            niche_count = sum(1 for t in selected_topics if t.get("Niche", "") == niche)
-            if niche_count < 4 or len(selected_topics) < 20:  # Allow up to 4 topics per niche initially
-                selected_topics.append(topic)
-                if niche not in niches_seen:
-                    niches_seen.add(niche)
-                logger.info(f"✅ Selected high priority: {topic.get('Topic', 'Unknown')}")
-        
-        # Then add medium-priority topics to fill remaining slots
-        medium_priority = [t for t in eligible_topics if t.get("priority") == "medium"]
-        logger.info(f"📚 Medium priority topics: {len(medium_priority)}")
-        for topic in medium_priority:
-            if len(selected_topics) >= 28:  # Updated to 28 topics
-                break
-            if topic not in selected_topics:
-                selected_topics.append(topic)
-                logger.info(f"✅ Selected medium priority: {topic.get('Topic', 'Unknown')}")
+        for topic_id, priority in eligible_topics:
+            logger.info(f"  - {topics_data[topic_id].get('Topic', 'Unknown')} ({priority} priority)")
+        
+        # Select exactly 28 topics for 4 weeks x 7 days by maximal marginal relevance:
+        # interest matches first, with per-niche quotas and seeded tie-breaking
+        topic_index = catalog.topic_index
+        relevance = np.zeros(len(topics_data))
+        candidates = np.zeros(len(topics_data), dtype=bool)
+        for topic_id, priority in eligible_topics:
+            relevance[topic_id] = 1.0 if priority == "high" else 0.5
+            candidates[topic_id] = True
+        seed = enhanced_profile.get("seed")
+        if seed is None:
+            seed = stable_seed(child_age, tuple(sorted(str(interest).lower() for interest in interests)))
+        selected_ids = mmr_select(topic_index, relevance, 28, seed=int(seed),
+                                  quota=MATCH_NICHE_QUOTA, candidates=candidates)
+        niches_seen = list(dict.fromkeys(topics_data[topic_id].get("Niche", "") for topic_id in selected_ids))
+        logger.info(f"🎯 Selected {len(selected_ids)} topics by MMR, niches: {niches_seen}")
         
         # If still not enough, duplicate best topics to reach 28
-        if len(selected_topics) < 28 and eligible_topics:
-            while len(selected_topics) < 28:
+        if len(selected_ids) < 28 and eligible_topics:
+            while len(selected_ids) < 28:
                 # Cycle through available topics
-                topic_index = (len(selected_topics) - len(eligible_topics)) % len(eligible_topics)
-                selected_topics.append(eligible_topics[topic_index])
+                position = (len(selected_ids) - len(eligible_topics)) % len(eligible_topics)
+                selected_ids.append(eligible_topics[position][0])
         
-        # Ensure exactly 28 topics
-        selected_topics = selected_topics[:28]
+        # Ensure exactly 28 topics; only these are turned into response dicts
+        selected_ids = selected_ids[:28]
+        selected_topics = [topics_data[topic_id] for topic_id in selected_ids]
         
         # Format topics for display
         formatted_topics = self._format_topics_for_display(selected_topics)
@@ -782,6 +760,7 @@ class MatchAgent:
             
             # New data from this agent (Match Agent)
             "matched_topics": formatted_topics,
+            "matched_topic_ids": selected_ids,
             "completed_topics": completed_topics,
             "available_niches": all_niches,
             "match_analysis": {
@@ -810,14 +789,11 @@ class MatchAgent:
         logger.info(f"📊 Result keys: {list(result.keys())}")
         return result
 
-class ScheduleAgent:
+class ScheduleAgent(CatalogDataMixin):
     """Schedule Agent - Creates weekly learning plan using real topics only."""
     
     def __init__(self):
         logger.info("📅 Initializing ScheduleAgent")
-        self.topics_data = load_topics_data()
-        self.niches_data = load_niches_data()
-        self.essential_growth_data = load_essential_growth_data()
         self.plan_generator = RealPlanGenerator(self.topics_data, self.niches_data, self.essential_growth_data)
         logger.info(f"📊 ScheduleAgent loaded {len(self.topics_data)} topics, {len(self.niches_data)} niches")
     
@@ -1396,8 +1372,8 @@ class ScheduleAgent:
                 Return ONLY the activity description, no additional text.
                 """
                 
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                response = model.generate_content(prompt)
+                model = get_model('gemini-1.5-flash', gemini_api_key)
+                response = generate_content(model, prompt, agent="schedule")
                 activity_text = response.text.strip()
                 
                 # Return LLM tracking data
@@ -1474,8 +1450,8 @@ class ScheduleAgent:
                 Return ONLY the activity description, no additional text.
                 """
                 
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                response = model.generate_content(prompt)
+                model = get_model('gemini-1.5-flash', gemini_api_key)
+                response = generate_content(model, prompt, agent="schedule")
                 activity_text = response.text.strip()
                 
                 # Return LLM tracking data
@@ -1682,8 +1658,8 @@ class ReviewerAgent:
                 Focus on practical, actionable insights that will help improve the child's learning experience.
                 """
                 
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                response = model.generate_content(prompt)
+                model = get_model('gemini-1.5-flash', gemini_api_key)
+                response = generate_content(model, prompt, agent="reviewer")
                 llm_response = response.text.strip()
                 
                 # Try to parse JSON response
@@ -2016,11 +1992,13 @@ class ReviewerAgent:
 # Initialize Gemini AI
 def setup_gemini():
     """Setup Gemini AI with API key."""
+    global gemini_api_key
     try:
         from config.settings import settings
         api_key = settings.GOOGLE_API_KEY
         if api_key and api_key != "your-google-api-key-here":
-            genai.configure(api_key=api_key)
+            # The SDK itself is imported and configured by get_model() on first use
+            gemini_api_key = api_key
             return True
         else:
             logger.warning("⚠️ GOOGLE_API_KEY not found - using fallback mode")
@@ -2036,8 +2014,14 @@ schedule_agent = ScheduleAgent()
 reviewer_agent = ReviewerAgent()
 
 # Setup Gemini
+gemini_api_key = None
 gemini_available = setup_gemini()
 
+@app.on_event("startup")
+async def load_saved_progress():
+    """Fill the completion index from saved schedule progress in the background."""
+    load_completion_index().start_progress_load()
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
@@ -2058,7 +2042,8 @@ async def health_check():
         "app_name": "Unschooling Backend - Agent System",
         "debug": True,
         "agents_available": True,
-        "data_loaded": len(load_topics_data()) > 0
+        "data_loaded": len(load_topics_data()) > 0,
+        "catalog_version": get_catalog(CATALOG_DATA_DIR).version
     }
 
 @app.post("/api/generate-plan")
@@ -2236,18 +2221,8 @@ async def generate_plan(request: Request):
             }
         )
 
-@app.get("/api/topics")
-async def get_topics():
-    """Get available topics."""
-    topics = load_topics_data()
-    return {"topics": topics}
-
-@app.get("/api/topics/enhanced")
-async def get_enhanced_topics():
-    """Get enhanced topics with age groups, difficulty levels, and learning stages."""
-    topics = load_topics_data()
-    
-    # Filter and format enhanced data
+def build_enhanced_topics(topics) -> Dict[str, Any]:
+    """Format topics with age groups, difficulty levels and learning stages, plus facet values."""
     enhanced_topics = []
     for topic in topics:
         enhanced_topic = {
@@ -2281,44 +2256,76 @@ async def get_enhanced_topics():
         "niches": list(set(t.get("niche") for t in enhanced_topics if t.get("niche")))
     }
 
-@app.get("/api/topics/by-age-group/{age_group}")
-async def get_topics_by_age_group(age_group: str):
-    """Get topics filtered by age group."""
-    topics = load_topics_data()
-    filtered_topics = [t for t in topics if t.get("age_group") == age_group]
+# Catalog listings are serialized and compressed once per catalog version and revalidated by ETag
+@app.get("/api/topics")
+async def get_topics(request: Request, fields: Optional[str] = None, limit: Optional[int] = None,
+                     cursor: Optional[str] = None):
+    """Get available topics; ?fields=, ?limit= and ?cursor= return a streamed page instead of the full list."""
+    catalog = get_catalog(CATALOG_DATA_DIR).snapshot()
+    if fields or limit is not None or cursor:
+        return stream_topic_page(catalog.version, catalog.topics, range(len(catalog.topics)), fields, limit, cursor)
+    return get_response_cache().respond(request, ("topics",), catalog.version,
+                                        lambda: {"topics": topics_to_dicts(catalog.topics)})
+
+@app.get("/api/topics/enhanced")
+async def get_enhanced_topics(request: Request):
+    """Get enhanced topics with age groups, difficulty levels, and learning stages."""
+    catalog = get_catalog(CATALOG_DATA_DIR).snapshot()
+    return get_response_cache().respond(request, ("topics", "enhanced"), catalog.version,
+                                        lambda: build_enhanced_topics(catalog.topics))
+
+@app.get("/api/topics/facets")
+async def get_topic_facets(age_group: Optional[str] = None, difficulty: Optional[str] = None,
+                           learning_stage: Optional[str] = None, niche: Optional[str] = None,
+                           age: Optional[str] = None):
+    """Get filter values with topic counts; each parameter takes comma-separated selected values."""
+    catalog = get_catalog(CATALOG_DATA_DIR).snapshot()
+    selection = {
+        "age_group": age_group, "difficulty": difficulty, "learning_stage": learning_stage, "niche": niche, "age": age
+    }
+    selection = {name: [v.strip() for v in values.split(",") if v.strip()] for name, values in selection.items() if values}
+    if "age" in selection:
+        try:
+            selection["age"] = [int(value) for value in selection["age"]]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="age must be comma-separated whole years")
     return {
-        "age_group": age_group,
-        "topics": filtered_topics,
-        "count": len(filtered_topics)
+        **get_facet_index(catalog.version, catalog.topics).counts(selection),
+        "selection": selection,
+        "catalog_version": catalog.version
     }
 
+def _filtered_topic_page(name: str, value: str, key, fields: Optional[str], limit: Optional[int],
+                         cursor: Optional[str]):
+    """Stream a page of the topics whose key(topic) equals value, in catalog order."""
+    catalog = get_catalog(CATALOG_DATA_DIR).snapshot()
+    ids = get_filter_index().ids(catalog.version, catalog.topics, name, value, key)
+    return stream_topic_page(catalog.version, catalog.topics, ids, fields, limit, cursor, extra={name: value})
+
+@app.get("/api/topics/by-age-group/{age_group}")
+async def get_topics_by_age_group(age_group: str, fields: Optional[str] = None, limit: Optional[int] = None,
+                                  cursor: Optional[str] = None):
+    """Get topics filtered by age group."""
+    return _filtered_topic_page("age_group", age_group, lambda t: t.get("age_group"), fields, limit, cursor)
+
 @app.get("/api/topics/by-difficulty/{difficulty}")
-async def get_topics_by_difficulty(difficulty: str):
+async def get_topics_by_difficulty(difficulty: str, fields: Optional[str] = None, limit: Optional[int] = None,
+                                   cursor: Optional[str] = None):
     """Get topics filtered by difficulty level."""
-    topics = load_topics_data()
-    filtered_topics = [t for t in topics if t.get("difficulty") == difficulty]
-    return {
-        "difficulty": difficulty,
-        "topics": filtered_topics,
-        "count": len(filtered_topics)
-    }
+    return _filtered_topic_page("difficulty", difficulty, lambda t: t.get("difficulty"), fields, limit, cursor)
 
 @app.get("/api/topics/by-stage/{stage}")
-async def get_topics_by_stage(stage: str):
+async def get_topics_by_stage(stage: str, fields: Optional[str] = None, limit: Optional[int] = None,
+                              cursor: Optional[str] = None):
     """Get topics filtered by learning stage."""
-    topics = load_topics_data()
-    filtered_topics = [t for t in topics if t.get("dynamic_path", {}).get("stage") == stage]
-    return {
-        "stage": stage,
-        "topics": filtered_topics,
-        "count": len(filtered_topics)
-    }
+    return _filtered_topic_page("stage", stage, lambda t: t.get("dynamic_path", {}).get("stage"), fields, limit, cursor)
 
 @app.get("/api/niches")
-async def get_niches():
+async def get_niches(request: Request):
     """Get available niches."""
-    niches = load_niches_data()
-    return {"niches": niches}
+    catalog = get_catalog(CATALOG_DATA_DIR).snapshot()
+    return get_response_cache().respond(request, ("niches",), catalog.version,
+                                        lambda: {"niches": list(catalog.niches)})
 
 @app.get("/api/agent-metrics")
 async def get_agent_metrics():
@@ -2535,13 +2542,36 @@ async def update_schedule_progress(schedule_id: str, progress_data: Dict[str, An
             progress_data['child_id']
         ).collection('scheduleProgress').document(schedule_id)
         
-        progress_ref.set({
+        progress = {
+            'child_id': progress_data['child_id'],
             'completedActivities': progress_data['completedActivities'],
             'currentWeek': progress_data['currentWeek'],
             'totalActivities': progress_data['totalActivities'],
             'completedCount': progress_data['completedCount'],
             'lastUpdated': firebase_service.db.SERVER_TIMESTAMP
-        }, merge=True)
+        }
+        if progress_data.get('completedTopics'):
+            progress['completedTopics'] = progress_data['completedTopics']
+        progress_ref.set(progress, merge=True)
+        
+        # Keep the in-memory completion index current; other processes load saved progress on first lookup.
+        # The progress is already saved, so a failure here is logged rather than failing the request
+        try:
+            completion_index = load_completion_index()
+            if progress_data.get('completedTopics'):
+                completion_index.record(progress_data['child_id'], progress_data['completedTopics'])
+            else:
+                schedule_doc = firebase_service.db.collection('users').document(
+                    progress_data['user_id']
+                ).collection('children').document(
+                    progress_data['child_id']
+                ).collection('schedules').document(schedule_id).get()
+                if schedule_doc.exists:
+                    completion_index.record_schedule_progress(
+                        progress_data['child_id'], schedule_doc.to_dict(), progress_data['completedActivities']
+                    )
+        except Exception as e:
+            logger.warning(f"⚠️ Progress saved but completion index not updated for {progress_data['child_id']}: {e}")
         
         return {
             "success": True,
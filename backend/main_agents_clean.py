@@ -11,9 +11,10 @@ import os
 import json
 import time
 from typing import Dict, Any, List
-import google.generativeai as genai
 from real_usage_tracker import real_usage_tracker
 from child_activity_tracker import child_activity_tracker
+from utils.catalog import get_catalog
+from utils.topic_record import topics_to_dicts
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -35,63 +36,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load data files - NO FALLBACK DATA
+# Load data files from the shared catalog - loaded once per process and
+# reloaded only when the source files change on disk
+CATALOG_DATA_DIR = "src/data"
+
 def load_topics_data():
-    """Load topics data from the original data source."""
-    try:
-        topics_file = "src/data/topicsdata.json"
-        logger.info(f"📁 Loading topics data from {topics_file}")
-        
-        if not os.path.exists(topics_file):
-            logger.error(f"❌ Topics data file not found: {topics_file}")
-            return []
-            
-        with open(topics_file, "r", encoding='utf-8') as f:
-            data = json.load(f)
-            logger.info(f"✅ Successfully loaded {len(data)} topics from {topics_file}")
-            return data
-            
-    except Exception as e:
-        logger.error(f"❌ Error loading topics data: {e}")
-        return []
+    """Load topics data from the shared catalog."""
+    return get_catalog(CATALOG_DATA_DIR).topics
 
 def load_niches_data():
-    """Load niches data from the original data source."""
-    try:
-        niches_file = "src/data/nichesdata.json"
-        logger.info(f"📁 Loading niches data from {niches_file}")
-        
-        if not os.path.exists(niches_file):
-            logger.error(f"❌ Niches data file not found: {niches_file}")
-            return []
-            
-        with open(niches_file, "r", encoding='utf-8') as f:
-            data = json.load(f)
-            logger.info(f"✅ Successfully loaded {len(data)} niches from {niches_file}")
-            return data
-            
-    except Exception as e:
-        logger.error(f"❌ Error loading niches data: {e}")
-        return []
+    """Load niches data from the shared catalog."""
+    return get_catalog(CATALOG_DATA_DIR).niches
 
 def load_essential_growth_data():
-    """Load essential growth data from the original data source."""
-    try:
-        essential_file = "src/data/essential-growth/index.json"
-        logger.info(f"📁 Loading essential growth data from {essential_file}")
-        
-        if not os.path.exists(essential_file):
-            logger.error(f"❌ Essential growth data file not found: {essential_file}")
-            return {}
-            
-        with open(essential_file, "r", encoding='utf-8') as f:
-            data = json.load(f)
-            logger.info(f"✅ Successfully loaded essential growth data from {essential_file}")
-            return data
-            
-    except Exception as e:
-        logger.error(f"❌ Error loading essential growth data: {e}")
-        return {}
+    """Load essential growth data from the shared catalog."""
+    return get_catalog(CATALOG_DATA_DIR).essential_growth
 
 # Import the new systematic agents
 from agents.match_agent import run_match_agent
@@ -99,6 +58,21 @@ from agents.schedule_agent import run_schedule_agent
 from agents.plan_generator import RealPlanGenerator
 
 # Agent System Implementation
+class CatalogDataMixin:
+    """Gives agents read access to the shared catalog instead of private copies."""
+    
+    @property
+    def topics_data(self):
+        return load_topics_data()
+    
+    @property
+    def niches_data(self):
+        return load_niches_data()
+    
+    @property
+    def essential_growth_data(self):
+        return load_essential_growth_data()
+
 class ProfileAgent:
     """Profile Agent - Analyzes child profile and extracts key information."""
     
@@ -155,14 +129,11 @@ class ProfileAgent:
         logger.info(f"✅ Profile Agent completed in {time.time() - start_time:.2f} seconds")
         return result
 
-class MatchAgent:
+class MatchAgent(CatalogDataMixin):
     """Match Agent - Selects appropriate topics based on profile and history."""
     
     def __init__(self):
         logger.info("🎯 Initializing MatchAgent")
-        self.topics_data = load_topics_data()
-        self.niches_data = load_niches_data()
-        self.essential_growth_data = load_essential_growth_data()
         logger.info(f"📊 MatchAgent loaded {len(self.topics_data)} topics, {len(self.niches_data)} niches")
         
         if len(self.topics_data) == 0:
@@ -255,14 +226,11 @@ class MatchAgent:
         
         return False
 
-class ScheduleAgent:
+class ScheduleAgent(CatalogDataMixin):
     """Schedule Agent - Creates weekly learning plan using real topics only."""
     
     def __init__(self):
         logger.info("📅 Initializing ScheduleAgent")
-        self.topics_data = load_topics_data()
-        self.niches_data = load_niches_data()
-        self.essential_growth_data = load_essential_growth_data()
         self.plan_generator = RealPlanGenerator(self.topics_data, self.niches_data, self.essential_growth_data)
         logger.info(f"📊 ScheduleAgent loaded {len(self.topics_data)} topics, {len(self.niches_data)} niches")
     
@@ -495,8 +463,8 @@ def setup_gemini():
     try:
         api_key = os.getenv("GOOGLE_API_KEY")
         if api_key:
-            genai.configure(api_key=api_key)
-            logger.info("✅ Gemini API configured successfully")
+            # The SDK itself is imported and configured on first use (utils.gemini_client)
+            logger.info("✅ Gemini API key found - SDK will load on first use")
             return True
         else:
             logger.warning("⚠️ GOOGLE_API_KEY not found - using fallback mode")
@@ -522,9 +490,10 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Detailed health check endpoint."""
-    topics_loaded = len(load_topics_data()) > 0
-    niches_loaded = len(load_niches_data()) > 0
-    essential_loaded = bool(load_essential_growth_data())
+    catalog = get_catalog(CATALOG_DATA_DIR).snapshot()
+    topics_loaded = len(catalog.topics) > 0
+    niches_loaded = len(catalog.niches) > 0
+    essential_loaded = bool(catalog.essential_growth)
     
     return {
         "status": "healthy",
@@ -534,7 +503,8 @@ async def health_check():
         "data_loaded": topics_loaded and niches_loaded and essential_loaded,
         "topics_loaded": topics_loaded,
         "niches_loaded": niches_loaded,
-        "essential_loaded": essential_loaded
+        "essential_loaded": essential_loaded,
+        "catalog_version": catalog.version
     }
 
 @app.post("/api/generate-plan")
@@ -585,10 +555,10 @@ async def generate_plan(request: Request):
         reviewer_result = reviewer_agent.run(schedule_result)
         reviewer_timing = reviewer_result["agent_timing"]
         
-        # Combine all results
+        # Combine all results; catalog topic records become plain dicts only here
         final_result = {
             "success": True,
-            "data": reviewer_result,
+            "data": {**reviewer_result, "matched_topics": topics_to_dicts(reviewer_result.get("matched_topics", []))},
             "message": "Plan generated successfully using full agent system",
             "agent_flow": "Profile → Match → Schedule → Reviewer",
             "real_agents": True,
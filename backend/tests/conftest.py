@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Tests import backend modules the way the apps do (utils.catalog, agents.schedule_agent)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_TOPICS = [
+    {"Niche": "Finance", "#": 1, "Topic": "Saving Coins", "Objective": "Learn why people save money",
+     "Explanation": "A piggy bank keeps coins safe", "Hashtags": "#money #saving", "Estimated Time": "20 mins",
+     "Age": 5, "Activity 1": "Count coins into a jar", "Activity 2": "Draw a piggy bank"},
+    {"Niche": "Finance", "#": 2, "Topic": "Needs and Wants", "Objective": "Sort needs from wants",
+     "Explanation": "Food is a need, toys are wants", "Hashtags": "#money #choices", "Estimated Time": "25 mins",
+     "Age": "6-8", "Activity 1": "Sort picture cards", "Activity 2": "Plan a pretend budget"},
+    {"Niche": "AI", "#": 3, "Topic": "What Is a Robot", "Objective": "Meet robots and machines",
+     "Explanation": "Robots follow instructions", "Hashtags": "#robots #ai", "Estimated Time": "30 mins",
+     "Age": "7 and 8", "Activity 1": "Give a friend robot instructions", "Activity 2": "Build a cardboard robot"},
+    {"Niche": "Communication", "#": 4, "Topic": "Telling Stories", "Objective": "Tell a story with a beginning and an end",
+     "Explanation": "Stories help people share ideas about money and robots", "Hashtags": "#stories",
+     "Estimated Time": "20 mins", "Age": "9-11", "Activity 1": "Act out a story", "Activity 2": "Draw a comic"},
+]
+
+def write_catalog(data_dir, topics):
+    """Write the files TopicCatalog requires into data_dir."""
+    os.makedirs(os.path.join(data_dir, "essential-growth"), exist_ok=True)
+    with open(os.path.join(data_dir, "topicsdata.json"), "w", encoding="utf-8") as f:
+        json.dump(topics, f)
+    with open(os.path.join(data_dir, "nichesdata.json"), "w", encoding="utf-8") as f:
+        json.dump([{"SNo": 1, "Niche": "Finance"}], f)
+    with open(os.path.join(data_dir, "essential-growth", "index.json"), "w", encoding="utf-8") as f:
+        json.dump({"pillars": []}, f)
+
+@pytest.fixture
+def catalog_dir(tmp_path):
+    """A data directory holding the sample catalog."""
+    write_catalog(str(tmp_path), SAMPLE_TOPICS)
+    return str(tmp_path)
@@ -0,0 +1,37 @@
+import pytest
+
+from utils.age_utils import age_overlaps, normalize_topic_age, parse_age_bounds, parse_age_months
+
+@pytest.mark.parametrize("label, expected", [
+    (5, (60, 71)),
+    ("6-8 yrs", (72, 107)),
+    ("6 to 8 years", (72, 107)),
+    ("3-12 months", (3, 12)),
+    ("18 mos", (18, 18)),
+    ("Toddler (1-3)", (12, 47)),
+    ("1.5 years", (18, 18)),
+    ("all ages", (None, None)),
+])
+def test_parse_age_months(label, expected):
+    assert parse_age_months(label) == expected
+
+@pytest.mark.parametrize("age, expected", [
+    (3, (3, 3)),
+    ("5-7", (5, 7)),
+    ("3 and 4", (3, 4)),
+    ("6, 7", (6, 7)),
+    ("", (None, None)),
+])
+def test_parse_age_bounds(age, expected):
+    assert parse_age_bounds(age) == expected
+
+def test_age_overlaps_is_inclusive_at_both_ends():
+    topic = normalize_topic_age({"Age": "6-8"})
+    assert age_overlaps(topic, 8, 10)
+    assert age_overlaps(topic, 3, 6)
+    assert age_overlaps(topic, 7, 7)
+    assert not age_overlaps(topic, 9, 12)
+    assert not age_overlaps(topic, 3, 5)
+
+def test_age_overlaps_rejects_topics_without_an_age():
+    assert not age_overlaps(normalize_topic_age({"Age": "any"}), 0, 99)
@@ -0,0 +1,40 @@
+import os
+
+from conftest import SAMPLE_TOPICS, write_catalog
+from utils.catalog import TopicCatalog
+
+def test_reload_publishes_a_new_version_only_when_content_changes(catalog_dir):
+    catalog = TopicCatalog(catalog_dir, check_interval=0, use_compiled=False)
+    first = catalog.snapshot()
+    assert len(first.topics) == len(SAMPLE_TOPICS)
+
+    # Touched but unchanged: same snapshot
+    path = os.path.join(catalog_dir, "topicsdata.json")
+    os.utime(path, ns=(0, 0))
+    assert catalog.snapshot() is first
+
+    write_catalog(catalog_dir, SAMPLE_TOPICS[:2])
+    second = catalog.snapshot()
+    assert second is not first
+    assert second.version != first.version
+    assert len(second.topics) == 2
+    # The old snapshot is left intact for readers still holding it
+    assert len(first.topics) == len(SAMPLE_TOPICS)
+
+def test_topic_records_round_trip_to_the_source_dicts(catalog_dir):
+    snapshot = TopicCatalog(catalog_dir, use_compiled=False).snapshot()
+    assert [topic.to_dict() for topic in snapshot.topics] == SAMPLE_TOPICS
+    assert (snapshot.topics[1]["age_min"], snapshot.topics[1]["age_max"]) == (6, 8)
+
+def test_compiled_snapshot_is_used_until_a_source_changes(catalog_dir):
+    source = TopicCatalog(catalog_dir, use_compiled=False)
+    source.compile()
+
+    compiled = TopicCatalog(catalog_dir)
+    assert compiled.loaded_from == "compiled"
+    assert compiled.snapshot().version == source.snapshot().version
+
+    write_catalog(catalog_dir, SAMPLE_TOPICS[:3])
+    stale = TopicCatalog(catalog_dir)
+    assert stale.loaded_from == "json"
+    assert len(stale.snapshot().topics) == 3
@@ -0,0 +1,38 @@
+from utils.facet_index import FacetIndex, get_facet_index
+
+TOPICS = [
+    {"Niche": "Finance", "difficulty": "beginner", "age_min": 5, "age_max": 6},
+    {"Niche": "Finance", "difficulty": "advanced", "age_min": 8, "age_max": 9},
+    {"Niche": "AI", "difficulty": "beginner", "age_min": 6, "age_max": 7},
+    {"Niche": "AI", "difficulty": "beginner", "age_min": None, "age_max": None},
+]
+
+def counts_by_value(result, facet):
+    return {entry["value"]: entry["count"] for entry in result["facets"][facet]}
+
+def test_counts_without_a_selection_cover_every_topic():
+    result = FacetIndex(TOPICS).counts()
+    assert result["total"] == 4
+    assert counts_by_value(result, "niche") == {"AI": 2, "Finance": 2}
+    assert counts_by_value(result, "difficulty") == {"advanced": 1, "beginner": 3}
+    assert counts_by_value(result, "age") == {5: 1, 6: 2, 7: 1, 8: 1, 9: 1}
+
+def test_a_facet_is_counted_under_the_other_facets_selection_only():
+    result = FacetIndex(TOPICS).counts({"niche": ["Finance"], "difficulty": ["beginner"]})
+    assert result["total"] == 1
+    # Niche counts ignore the niche selection, so the alternative still shows its count
+    assert counts_by_value(result, "niche") == {"AI": 2, "Finance": 1}
+    assert counts_by_value(result, "difficulty") == {"advanced": 1, "beginner": 1}
+    selected = {entry["value"] for entry in result["facets"]["niche"] if entry["selected"]}
+    assert selected == {"Finance"}
+
+def test_values_within_a_facet_are_ored():
+    result = FacetIndex(TOPICS).counts({"age": [5, 9]})
+    assert result["total"] == 2
+
+def test_index_is_rebuilt_for_a_new_catalog_version():
+    first = get_facet_index("v1", TOPICS)
+    assert get_facet_index("v1", TOPICS) is first
+    second = get_facet_index("v2", TOPICS[:2])
+    assert second is not first
+    assert second.counts()["total"] == 2
@@ -0,0 +1,34 @@
+from utils import match_cache as match_cache_module
+from utils.match_cache import MatchCache, profile_fingerprint
+
+def test_profile_fingerprint_normalizes_interests():
+    assert profile_fingerprint("8", ["AI", "Coding"], "Visual") == profile_fingerprint(8, ["coding ", "ai", "AI"], "visual")
+    assert profile_fingerprint(8, ["ai"]) != profile_fingerprint(9, ["ai"])
+
+def test_match_cache_is_emptied_for_a_new_catalog_version():
+    cache = MatchCache(max_entries=10, ttl_seconds=60)
+    cache.put("v1", ("key",), "result")
+    assert cache.get("v1", ("key",)) == "result"
+    assert cache.get("v2", ("key",)) is None
+    assert cache.get("v1", ("key",)) is None
+    assert cache.get_stats()["invalidations"] == 1
+
+def test_match_cache_evicts_least_recently_used():
+    cache = MatchCache(max_entries=2, ttl_seconds=60)
+    cache.put("v1", ("a",), 1)
+    cache.put("v1", ("b",), 2)
+    cache.get("v1", ("a",))
+    cache.put("v1", ("c",), 3)
+    assert cache.get("v1", ("b",)) is None
+    assert cache.get("v1", ("a",)) == 1
+
+def test_match_cache_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(match_cache_module.time, "monotonic", lambda: now[0])
+    cache = MatchCache(max_entries=10, ttl_seconds=5)
+    cache.put("v1", ("a",), 1)
+    now[0] += 4
+    assert cache.get("v1", ("a",)) == 1
+    now[0] += 2
+    assert cache.get("v1", ("a",)) is None
+    assert cache.get_stats()["expired"] == 1
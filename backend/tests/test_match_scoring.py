@@ -0,0 +1,49 @@
+from collections import Counter
+
+import numpy as np
+
+from utils.match_scoring import mmr_select
+from utils.topic_index import TopicIndex
+
+def make_index(niche_sizes):
+    topics = [{"Topic": f"{niche} {n}", "Niche": niche, "Age": "5-8"}
+              for niche, size in niche_sizes.items() for n in range(size)]
+    return topics, TopicIndex(topics)
+
+def niche_counts(topics, ids):
+    return Counter(topics[topic_id]["Niche"] for topic_id in ids)
+
+def test_quota_caps_each_niche_when_the_pool_allows():
+    topics, index = make_index({"Finance": 20, "AI": 10, "Communication": 10})
+    # Finance is the most relevant, so without a cap it would take every slot
+    scores = np.array([1.0 if topic["Niche"] == "Finance" else 0.2 for topic in topics])
+    ids = mmr_select(index, scores, 12, quota=4)
+    assert len(ids) == len(set(ids)) == 12
+    assert niche_counts(topics, ids) == {"Finance": 4, "AI": 4, "Communication": 4}
+
+def test_quota_is_relaxed_only_once_every_niche_is_full():
+    topics, index = make_index({"Finance": 20, "AI": 2})
+    scores = np.ones(len(topics))
+    ids = mmr_select(index, scores, 10, quota=4)
+    counts = niche_counts(topics, ids)
+    assert counts["AI"] == 2
+    assert counts["Finance"] == 8
+    # The first picks respect the cap; Finance only goes past 4 after AI ran out
+    assert niche_counts(topics, ids[:6]) == {"Finance": 4, "AI": 2}
+
+def test_per_niche_quotas_override_the_default():
+    topics, index = make_index({"Finance": 10, "AI": 10})
+    ids = mmr_select(index, np.ones(len(topics)), 8, quota=6, quotas={"finance": 2})
+    assert niche_counts(topics, ids) == {"Finance": 2, "AI": 6}
+
+def test_candidates_mask_limits_the_pick():
+    topics, index = make_index({"Finance": 5, "AI": 5})
+    candidates = np.array([topic["Niche"] == "AI" for topic in topics])
+    ids = mmr_select(index, np.ones(len(topics)), 8, candidates=candidates)
+    assert sorted(ids) == [5, 6, 7, 8, 9]
+
+def test_seed_makes_tie_breaks_reproducible():
+    topics, index = make_index({"Finance": 15, "AI": 15})
+    scores = np.ones(len(topics))
+    assert mmr_select(index, scores, 10, seed=7) == mmr_select(index, scores, 10, seed=7)
+    assert mmr_select(index, scores, 10, seed=7) != mmr_select(index, scores, 10, seed=8)
@@ -0,0 +1,33 @@
+import os
+
+from utils.plan_cache import PlanCache, plan_fingerprint
+
+def test_plan_fingerprint_ignores_key_order():
+    assert plan_fingerprint({"age": 8, "interests": ["ai"]}) == plan_fingerprint({"interests": ["ai"], "age": 8})
+    assert plan_fingerprint({"age": 8}) != plan_fingerprint({"age": 9})
+
+def test_plan_cache_misses_after_a_catalog_change():
+    cache = PlanCache(max_entries=4, cache_dir="")
+    cache.put("v1", "fp", b"{}")
+    assert cache.get("v1", "fp") == (b"{}", "memory")
+    assert cache.get("v2", "fp") == (None, None)
+    assert cache.get("v1", "fp") == (None, None)
+
+def test_plan_cache_disk_tier_survives_a_restart(tmp_path):
+    PlanCache(cache_dir=str(tmp_path)).put("v1", "fp", b'{"plan":1}')
+    assert PlanCache(cache_dir=str(tmp_path)).get("v1", "fp") == (b'{"plan":1}', "disk")
+
+def test_plan_cache_prunes_only_stale_plan_files(tmp_path):
+    cache_dir = str(tmp_path)
+    PlanCache(cache_dir=cache_dir).put("v1", "fp", b"{}")
+    with open(os.path.join(cache_dir, "notes.json"), "w") as f:
+        f.write("{}")
+
+    # A new catalog version drops the old plan file and leaves unrelated files alone
+    cache = PlanCache(cache_dir=cache_dir)
+    assert cache.get("v2", "fp") == (None, None)
+    assert sorted(os.listdir(cache_dir)) == ["notes.json"]
+
+def test_plan_cache_schema_bump_misses_old_entries(tmp_path):
+    PlanCache(cache_dir=str(tmp_path), schema_version="1").put("v1", "fp", b"{}")
+    assert PlanCache(cache_dir=str(tmp_path), schema_version="2").get("v1", "fp") == (None, None)
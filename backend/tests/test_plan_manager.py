@@ -0,0 +1,105 @@
+import copy
+
+import pytest
+
+from utils.plan_manager import PlanManager
+
+def topic(name, niche, age):
+    return {"Topic": name, "Niche": niche, "Age": age}
+
+WEEKS = {
+    "week_1": {"topics": [topic("Coins", "Finance", 5), topic("Robots", "AI", 6), topic("Stories", "Communication", 6)]},
+    "week_2": {"topics": [topic("Budgets", "Finance", 7), topic("Sensors", "AI", 8), topic("Debates", "Communication", 9)]},
+}
+
+POOL = [topic("Coins", "Finance", 5), topic("Banks", "Finance", 6), topic("Chatbots", "AI", 7),
+        topic("Interest", "Finance", 9), topic("Speeches", "Communication", 8), topic("Neural Nets", "AI", 10),
+        topic("Allowance", "Finance", 6)]
+
+@pytest.fixture
+def manager():
+    return PlanManager()
+
+@pytest.fixture
+def plan(manager):
+    return manager.create_ai_plan("child", {"weekly_plans": copy.deepcopy(WEEKS)}, {"child_age": 6})
+
+def test_replace_day_swaps_one_topic_from_the_same_niche(manager, plan):
+    edited = manager.edit_plan(plan, {"type": "replace_day", "week_key": "week_1", "day_index": 0}, POOL)
+    assert edited["version"] == plan["version"] + 1
+    topics = edited["weekly_plans"]["week_1"]["topics"]
+    # "Coins" is already in the plan, so the next Finance topic replaces it
+    assert [t["Topic"] for t in topics] == ["Banks", "Robots", "Stories"]
+    assert "topic_Banks" in edited["progress"]["topic_progress"]
+    assert "topic_Coins" not in edited["progress"]["topic_progress"]
+    # The source plan is left as it was and unedited weeks are shared
+    assert [t["Topic"] for t in plan["weekly_plans"]["week_1"]["topics"]] == ["Coins", "Robots", "Stories"]
+    assert edited["weekly_plans"]["week_2"] is plan["weekly_plans"]["week_2"]
+
+def test_incremental_quality_matches_a_full_rebuild(manager, plan):
+    edited = manager.edit_plan(plan, {"type": "replace_week", "week_key": "week_2"}, POOL)
+    assert edited["quality_index"] == manager._build_quality_index(edited)
+    edited = manager.edit_plan(edited, {"type": "replace_difficulty_band", "age_min": 5, "age_max": 5,
+                                        "target_age_min": 6, "target_age_max": 7}, POOL)
+    assert edited["quality_index"] == manager._build_quality_index(edited)
+    assert edited["quality_metrics"]["weekly_quality"]["week_1"]["topics"] == 3
+
+def test_exhausted_pool_is_an_error(manager, plan):
+    with pytest.raises(ValueError, match="No replacement"):
+        manager.edit_plan(plan, {"type": "replace_week", "week_key": "week_1"}, POOL[:1])
+
+@pytest.mark.parametrize("edit, message", [
+    ({"type": "shuffle"}, "Unknown edit type"),
+    ({"type": "replace_day", "week_key": "week_9", "day_index": 0}, "Unknown week"),
+    ({"type": "replace_day", "week_key": "week_1", "day_index": 3}, "day_index"),
+    ({"type": "replace_difficulty_band", "age_min": "young"}, "numeric"),
+])
+def test_invalid_edits_are_rejected(manager, plan, edit, message):
+    with pytest.raises(ValueError, match=message):
+        manager.edit_plan(plan, edit, POOL)
+
+@pytest.mark.parametrize("mutate, message", [
+    (lambda plan: plan.pop("version"), "plan.version"),
+    (lambda plan: plan.update(weekly_plans=[]), "plan.weekly_plans must be an object"),
+    (lambda plan: plan["weekly_plans"].update(week_1="monday"), "plan.weekly_plans.week_1 must be an object"),
+    (lambda plan: plan["weekly_plans"]["week_1"].update(topics={}), "topics must be a list"),
+    (lambda plan: plan["weekly_plans"]["week_1"]["topics"].append("Coins"), r"topics\[3\] must be an object"),
+    (lambda plan: plan.update(child_profile="six"), "plan.child_profile"),
+])
+def test_validate_plan_rejects_malformed_plans(manager, plan, mutate, message):
+    mutate(plan)
+    with pytest.raises(ValueError, match=message):
+        manager.validate_plan(plan)
+
+def test_malformed_progress_and_quality_index_are_rebuilt(manager, plan):
+    plan["progress"] = None
+    plan["quality_index"] = {"weeks": "broken"}
+    edited = manager.edit_plan(plan, {"type": "replace_day", "week_key": "week_2", "day_index": 1}, POOL)
+    assert edited["quality_index"] == manager._build_quality_index(edited)
+    assert "topic_Chatbots" in edited["progress"]["topic_progress"]
+
+def test_generated_plan_days_are_edited_in_day_order(manager):
+    data = {
+        "weekly_plan": {
+            "discovery_week": {"monday": {"topic": "Coins", "niche": "Finance", "activity": "Count coins"},
+                               "tuesday": {"topic": "Robots", "niche": "AI", "activity": "Play robot"}},
+        },
+        "matched_topics": [topic("Coins", "Finance", 5), topic("Robots", "AI", 6)],
+        "profile_analysis": {"child_name": "Sam", "child_age": 6},
+        "review_analysis": {"total_weeks_planned": 1},
+    }
+    assert manager.is_generated_plan(data)
+    plan = manager.from_generated_plan(data)
+    assert plan["weekly_plans"]["discovery_week"]["days"] == ["monday", "tuesday"]
+    assert plan["weekly_plans"]["discovery_week"]["topics"][0]["Age"] == 5
+
+    edited = manager.edit_plan(plan, {"type": "replace_day", "week_key": "discovery_week", "day_index": 1}, POOL)
+    updated = manager.apply_to_generated_plan(data, edited, lambda new_topic: {"topic": new_topic["Topic"]})
+    assert updated["weekly_plan"]["discovery_week"]["tuesday"] == {"topic": "Chatbots"}
+    assert updated["weekly_plan"]["discovery_week"]["monday"] is data["weekly_plan"]["discovery_week"]["monday"]
+    assert updated["review_analysis"] is data["review_analysis"]
+    assert data["weekly_plan"]["discovery_week"]["tuesday"]["topic"] == "Robots"
+
+def test_malformed_generated_plan_is_rejected(manager):
+    with pytest.raises(ValueError, match="plan.weekly_plan.discovery_week.monday"):
+        manager.from_generated_plan({"weekly_plan": {"discovery_week": {"monday": "Coins"}}})
@@ -0,0 +1,88 @@
+from collections import Counter
+
+import pytest
+
+from utils.schedule_allocator import allocate_schedule, session_minutes, week_minutes
+
+NICHES = ("Finance", "AI", "Communication")
+
+def make_topics(count):
+    return [{"Topic": f"Topic {n}", "Niche": NICHES[n % len(NICHES)], "Age": f"{5 + n % 6}-{7 + n % 6}"}
+            for n in range(count)]
+
+@pytest.mark.parametrize("count", [0, 1, 3, 7, 8, 10, 14, 20, 27, 28, 40])
+def test_no_review_before_or_in_the_week_of_introduction(count):
+    allocation = allocate_schedule(make_topics(count))
+    introduced = {}
+    for slot in allocation.slots:
+        name = slot.topic["Topic"]
+        if slot.repeat:
+            assert name in introduced
+            # Only a plan with fewer topics than days reviews inside its first week
+            if count >= allocation.days_per_week:
+                assert introduced[name] < slot.week
+        else:
+            assert name not in introduced
+            introduced[name] = slot.week
+    assert len(introduced) == min(count, 28)
+
+@pytest.mark.parametrize("count", [8, 10, 14, 20])
+def test_reviews_are_a_full_cycle_apart(count):
+    allocation = allocate_schedule(make_topics(count))
+    for _, slots in allocation.by_week():
+        reviews = Counter(slot.topic["Topic"] for slot in slots if slot.repeat)
+        assert not reviews or max(reviews.values()) == 1
+
+@pytest.mark.parametrize("count, quotas", [
+    (28, [7, 7, 7, 7]),
+    (20, [7, 5, 4, 4]),
+    (10, [7, 1, 1, 1]),
+    (5, [5, 0, 0, 0]),
+])
+def test_new_topics_per_week_follow_the_quotas(count, quotas):
+    allocation = allocate_schedule(make_topics(count))
+    assert [sum(not slot.repeat for slot in slots) for _, slots in allocation.by_week()] == quotas
+    assert allocation.stats["filled_slots"] == 28
+    assert allocation.stats["review_repeats"] == 28 - count
+
+def test_themed_weeks_stay_within_their_quota():
+    topics = [{"Topic": f"Finance {n}", "Niche": "Finance", "Age": "6-8"} for n in range(12)]
+    topics += [{"Topic": f"AI {n}", "Niche": "AI", "Age": "6-8"} for n in range(8)]
+    allocation = allocate_schedule(topics, week_niches=[{"Finance"}, {"Finance"}, {"AI"}, {"AI"}], max_niche_per_week=7)
+    new_per_week = [sum(not slot.repeat for slot in slots) for _, slots in allocation.by_week()]
+    assert new_per_week == [7, 5, 4, 4]
+    week_three = [slot.topic["Niche"] for slot in list(allocation.by_week())[2][1] if not slot.repeat]
+    assert set(week_three) == {"AI"}
+
+def test_niche_cap_is_only_exceeded_when_nothing_else_is_left():
+    allocation = allocate_schedule(make_topics(28), max_niche_per_week=3)
+    weeks = list(allocation.by_week())
+    over_cap = 0
+    for week, slots in weeks:
+        counts = Counter(slot.topic["Niche"] for slot in slots)
+        over_cap += sum(max(0, count - 3) for count in counts.values())
+        if week < len(weeks) - 1:
+            assert max(counts.values()) <= 3
+    # Topics skipped for the cap move to the next week; only the last week has to take them
+    assert over_cap == allocation.stats["niche_cap_relaxed"]
+
+def test_niche_cap_holds_when_niches_are_balanced():
+    topics = [{"Topic": f"{niche} {n}", "Niche": niche, "Age": "6-8"} for n in range(7) for niche in NICHES + ("Art",)]
+    allocation = allocate_schedule(topics, max_niche_per_week=2)
+    for _, slots in allocation.by_week():
+        assert max(Counter(slot.topic["Niche"] for slot in slots).values()) <= 2
+    assert allocation.stats["niche_cap_relaxed"] == 0
+
+def test_weeks_progress_from_easier_to_harder_topics():
+    allocation = allocate_schedule(make_topics(28))
+    averages = []
+    for _, slots in allocation.by_week():
+        ages = [int(slot.topic["Age"].split("-")[0]) for slot in slots]
+        averages.append(sum(ages) / len(ages))
+    assert averages == sorted(averages)
+
+def test_session_minutes_grow_over_the_weeks():
+    assert session_minutes("short") == 15
+    assert session_minutes({"recommended_session_length": 25}) == 25
+    assert session_minutes(None, child_age=4) == 20
+    assert [week_minutes(20, week) for week in range(4)] == [20, 25, 25, 30]
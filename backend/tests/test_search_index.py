@@ -0,0 +1,30 @@
+from conftest import SAMPLE_TOPICS
+from utils.search_index import SearchIndex, analyze
+
+def test_analyzer_drops_stopwords_and_folds_plurals():
+    assert analyze("The Robots and the Coins") == analyze("robot coin")
+
+def test_title_match_outranks_a_body_match():
+    index = SearchIndex(SAMPLE_TOPICS)
+    results = index.search("robot")
+    ids = [doc_id for _, doc_id, _ in results]
+    # "What Is a Robot" has the term in its title; "Telling Stories" only in its explanation
+    assert ids[:2] == [2, 3]
+    assert results[0][2] > results[1][2]
+
+def test_more_matching_terms_rank_higher():
+    index = SearchIndex(SAMPLE_TOPICS)
+    ids = [doc_id for _, doc_id, _ in index.search("money saving")]
+    assert ids[0] == 0
+
+def test_rare_terms_weigh_more_than_common_ones():
+    index = SearchIndex(SAMPLE_TOPICS)
+    common = dict((doc_id, score) for _, doc_id, score in index.search("money"))
+    rare = dict((doc_id, score) for _, doc_id, score in index.search("piggy"))
+    assert rare[0] > common[0]
+
+def test_limit_and_unknown_terms():
+    index = SearchIndex(SAMPLE_TOPICS)
+    assert len(index.search("money", limit=1)) == 1
+    assert index.search("zebra") == []
+    assert all(doc_type == "topic" for doc_type, _, _ in index.search("money", doc_type="topic"))
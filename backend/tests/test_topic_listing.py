@@ -0,0 +1,30 @@
+import pytest
+from fastapi import HTTPException
+
+from utils.topic_listing import decode_cursor, encode_cursor, parse_limit, MAX_PAGE_LIMIT
+
+def test_cursor_round_trips_within_a_catalog_version():
+    assert decode_cursor(encode_cursor("abc123", 57), "abc123") == 57
+
+def test_missing_cursor_starts_at_the_first_topic():
+    assert decode_cursor(None, "abc123") == 0
+    assert decode_cursor("", "abc123") == 0
+
+def test_cursor_from_another_catalog_version_is_a_conflict():
+    cursor = encode_cursor("old456", 57)
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, "new789")
+    assert error.value.status_code == 409
+
+def test_malformed_cursor_is_a_bad_request():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("not-a-cursor!", "abc123")
+    assert error.value.status_code == 400
+
+def test_limit_must_be_within_the_page_bounds():
+    assert parse_limit(None) is None
+    assert parse_limit(MAX_PAGE_LIMIT) == MAX_PAGE_LIMIT
+    for limit in (0, MAX_PAGE_LIMIT + 1):
+        with pytest.raises(HTTPException) as error:
+            parse_limit(limit)
+        assert error.value.status_code == 400
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Age Utilities
+Normalizes topic age fields into integer bounds once, at ingest
+"""
+
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+def parse_age_values(age_value: Any) -> List[int]:
+    """Expand an Age field (3, "5-7", "3 and 4", "6, 7") into the list of ages it covers."""
+    # Handle both string and numeric ages
+    if isinstance(age_value, int):
+        return [age_value]
+
+    age_str = str(age_value).lower().replace("and", ",").replace("to", "-")
+    result = []
+    parts = [part.strip() for part in re.split(r"[,\-]", age_str) if part.strip().isdigit()]
+    if "-" in age_str:
+        try:
+            bounds = [int(p.strip()) for p in age_str.split("-")]
+            if len(bounds) == 2:
+                result.extend(range(bounds[0], bounds[1] + 1))
+        except ValueError:
+            pass
+    else:
+        result.extend(int(p) for p in parts)
+    return list(set(result))
+
+def parse_age_bounds(age_value: Any) -> Tuple[Optional[int], Optional[int]]:
+    """Convert an Age field into (age_min, age_max); (None, None) when it has no usable age."""
+    ages = parse_age_values(age_value)
+    if not ages:
+        return None, None
+    return min(ages), max(ages)
+
+def topic_age_bounds(topic: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """Get a topic's integer age bounds, parsing the raw field only if it was not normalized."""
+    if "age_min" in topic:
+        return topic["age_min"], topic["age_max"]
+    # Standardized topics carry [min, max] already
+    if "age_range" in topic:
+        age_range = topic["age_range"]
+        if isinstance(age_range, list) and len(age_range) >= 2:
+            return int(age_range[0]), int(age_range[1])
+        return None, None
+    return parse_age_bounds(topic.get("Age", ""))
+
+def normalize_topic_age(topic: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the topic with integer age_min/age_max fields added."""
+    if "age_min" in topic:
+        return topic
+    age_min, age_max = topic_age_bounds(topic)
+    return {**topic, "age_min": age_min, "age_max": age_max}
+
+def age_overlaps(topic: Dict[str, Any], age_min: int, age_max: int) -> bool:
+    """Check whether a normalized topic covers any age in [age_min, age_max]."""
+    topic_min = topic.get("age_min")
+    return topic_min is not None and topic_min <= age_max and topic["age_max"] >= age_min
+
+AGE_RANGE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(?:(?:-|to)\s*(\d+(?:\.\d+)?))?\s*(months?|mos?|yrs?|years?)?")
+
+def _years_to_months(years: float, upper: bool) -> int:
+    months = int(round(years * 12))
+    # A whole-year upper bound covers that entire year ("6-8 yrs" includes 8 years 11 months)
+    return months + 11 if upper and float(years).is_integer() else months
+
+def parse_age_months(age_value: Any) -> Tuple[Optional[int], Optional[int]]:
+    """Convert an age label ("3-12 months", "6-8 yrs", "Toddler (1-3)", 5) into inclusive month bounds.
+
+    Values without a unit are years. Returns (None, None) when no age can be read.
+    """
+    if isinstance(age_value, (int, float)) and not isinstance(age_value, bool):
+        return _years_to_months(age_value, False), _years_to_months(age_value, True)
+    match = AGE_RANGE_PATTERN.search(str(age_value).lower())
+    if not match:
+        return None, None
+    low, high, unit = float(match.group(1)), float(match.group(2) or match.group(1)), match.group(3) or ""
+    if unit.startswith("mo"):
+        return int(low), int(high)
+    return _years_to_months(low, False), _years_to_months(high, True)
+
+def topic_min_age(topic: Dict[str, Any], default: int = 5) -> int:
+    """Youngest age a topic is meant for, for sorting and age-based scoring."""
+    age_min, _ = topic_age_bounds(topic)
+    return default if age_min is None else age_min
+
+def topic_max_age(topic: Dict[str, Any], default: int = 5) -> int:
+    """Oldest age a topic is meant for."""
+    _, age_max = topic_age_bounds(topic)
+    return default if age_max is None else age_max
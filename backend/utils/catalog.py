@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Topic Catalog
+Process-wide, read-only view of topics, niches and essential growth data
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from utils.age_utils import normalize_topic_age
+from utils.topic_index import TopicIndex
+from utils.essential_growth_index import EssentialGrowthIndex
+from utils.niche_graph import NicheGraph
+from utils.topic_record import Topic
+from utils.tracing import get_tracer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# Catalog section -> (path relative to the data directory, value used when the file is missing, required)
+CATALOG_SOURCES = {
+    "topics": ("topicsdata.json", (), True),
+    "niches": ("nichesdata.json", (), True),
+    "essential_growth": (os.path.join("essential-growth", "index.json"), {}, True),
+    # Written by DataStandardizer; preferred by run_match_agent when present
+    "standardized_topics": ("topicsdata_standardized.json", (), False),
+}
+
+# Per-pillar activity files, one section per pillar listed in essential-growth/index.json
+PILLAR_SECTION_PREFIX = "pillar_activities:"
+PILLAR_ACTIVITIES_PATH = os.path.join("essential-growth", "{slug}", "activities.json")
+
+# Compiled snapshot written by build_catalog_snapshot.py; bump the format when its layout changes
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_FILENAME = "catalog.snapshot.pkl"
+
+# Sections holding topic lists; their entries get integer age_min/age_max at ingest
+TOPIC_SECTIONS = ("topics", "standardized_topics")
+
+# Topic sections stored as slotted Topic records instead of dicts
+RECORD_SECTIONS = ("topics",)
+
+def _schema_hash() -> str:
+    """Hash of the snapshot format and the ingest code, so code changes invalidate compiled snapshots."""
+    digest = hashlib.sha256(f"format:{SNAPSHOT_FORMAT};".encode("utf-8"))
+    utils_dir = os.path.dirname(os.path.abspath(__file__))
+    for module in ("catalog.py", "topic_index.py", "topic_record.py", "age_utils.py",
+                   "essential_growth_index.py", "data_restructurer.py"):
+        with open(os.path.join(utils_dir, module), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+class CatalogSnapshot:
+    """One immutable, fully loaded version of the catalog."""
+
+    __slots__ = ("version", "topics", "niches", "essential_growth", "standardized_topics",
+                 "pillar_activities", "topic_index", "standardized_index", "essential_growth_index", "niche_graph", "loaded_at")
+
+    def __init__(self, version: str, topics: Tuple[Dict[str, Any], ...], niches: Tuple[Dict[str, Any], ...],
+                 essential_growth: Dict[str, Any], standardized_topics: Tuple[Dict[str, Any], ...] = (),
+                 pillar_activities: Optional[Dict[str, Dict[str, Any]]] = None,
+                 topic_index: Optional[TopicIndex] = None, standardized_index: Optional[TopicIndex] = None,
+                 essential_growth_index: Optional[EssentialGrowthIndex] = None):
+        self.version = version
+        self.topics = topics
+        self.niches = niches
+        self.essential_growth = essential_growth
+        self.standardized_topics = standardized_topics
+        self.pillar_activities = pillar_activities or {}
+        # Indexes come precomputed when the snapshot is restored from a compiled file
+        self.topic_index = topic_index or TopicIndex(topics)
+        if standardized_index is None and standardized_topics:
+            standardized_index = TopicIndex(standardized_topics)
+        self.standardized_index = standardized_index
+        if essential_growth_index is None:
+            essential_growth_index = EssentialGrowthIndex(self.pillar_activities)
+        self.essential_growth_index = essential_growth_index
+        index_niches = self.topic_index.niches + (self.standardized_index.niches if self.standardized_index else [])
+        self.niche_graph = NicheGraph(index_niches)
+        self.loaded_at = time.time()
+
+class TopicCatalog:
+    """Loads the catalog files once and republishes them only when they change on disk.
+
+    Readers always get a complete CatalogSnapshot; a reload builds a new snapshot
+    and swaps the reference, so a request never sees a half-updated catalog.
+    Entries are shared between all agents and endpoints and must not be mutated.
+    """
+
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, check_interval: Optional[float] = None,
+                 snapshot_path: Optional[str] = None, use_compiled: bool = True):
+        self.data_dir = os.path.abspath(data_dir)
+        if check_interval is None:
+            check_interval = float(os.getenv("CATALOG_CHECK_INTERVAL", "30"))
+        self.check_interval = check_interval
+        self.snapshot_path = snapshot_path or os.getenv("CATALOG_SNAPSHOT_PATH") or os.path.join(self.data_dir, SNAPSHOT_FILENAME)
+        self.reload_count = 0
+        self.loaded_from = "json"
+
+        self._lock = threading.Lock()
+        self._file_state: Dict[str, Optional[Tuple[int, int, str]]] = {}
+        self._sections: Dict[str, Any] = {}
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._last_check = 0.0
+
+        if not (use_compiled and self.load_compiled()):
+            self.refresh()
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Return the current snapshot, checking the source files at most once per interval."""
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self.refresh()
+        return self._snapshot
+
+    @property
+    def version(self) -> str:
+        return self.snapshot().version
+
+    @property
+    def topics(self) -> Tuple[Dict[str, Any], ...]:
+        return self.snapshot().topics
+
+    @property
+    def niches(self) -> Tuple[Dict[str, Any], ...]:
+        return self.snapshot().niches
+
+    @property
+    def essential_growth(self) -> Dict[str, Any]:
+        return self.snapshot().essential_growth
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload changed source files. Returns True when a new snapshot was published."""
+        if not self._lock.acquire(blocking=self._snapshot is None or force):
+            # Another thread is already checking; keep serving the current snapshot
+            return False
+
+        try:
+            started = time.perf_counter()
+            self._last_check = time.monotonic()
+            changed = False
+
+            for section, relative_path, empty_value, required in self._sources():
+                path = os.path.join(self.data_dir, relative_path)
+                previous = self._file_state.get(section)
+                stat = self._stat(path)
+
+                if not force and section in self._sections:
+                    if stat is None and previous is None:
+                        continue
+                    if stat is not None and previous is not None and stat == previous[:2]:
+                        continue
+
+                if stat is None:
+                    if required:
+                        logger.error(f"❌ Catalog file not found: {path}")
+                    self._file_state[section] = None
+                    if section not in self._sections:
+                        self._sections[section] = empty_value
+                        changed = True
+                    continue
+
+                try:
+                    with open(path, "rb") as f:
+                        raw = f.read()
+                    content_hash = hashlib.sha256(raw).hexdigest()
+
+                    if not force and previous is not None and previous[2] == content_hash:
+                        # Touched but not modified - remember the new mtime and keep the parsed data
+                        self._file_state[section] = (stat[0], stat[1], content_hash)
+                        continue
+
+                    data = json.loads(raw.decode("utf-8"))
+                except Exception as e:
+                    logger.error(f"❌ Error loading catalog file {path}: {e}")
+                    if section not in self._sections:
+                        self._sections[section] = empty_value
+                        changed = True
+                    continue
+
+                self._file_state[section] = (stat[0], stat[1], content_hash)
+                self._sections[section] = self._ingest(section, data)
+                changed = True
+
+            if not changed and self._snapshot is not None:
+                return False
+
+            self._publish(self._build_snapshot())
+            self.loaded_from = "json"
+            get_tracer().record("catalog.load", time.perf_counter() - started, source="json")
+            return True
+        finally:
+            self._lock.release()
+
+    def _sources(self) -> Iterator[Tuple[str, str, Any, bool]]:
+        """Yield (section, relative path, empty value, required) for every catalog file.
+
+        Pillar activity files are discovered from the pillar list in essential-growth/index.json,
+        which is always loaded before them.
+        """
+        for section, (relative_path, empty_value, required) in CATALOG_SOURCES.items():
+            yield section, relative_path, empty_value, required
+
+        pillar_sections = set()
+        for pillar in self._sections.get("essential_growth", {}).get("pillars", []):
+            slug = pillar.get("slug")
+            if slug:
+                pillar_sections.add(PILLAR_SECTION_PREFIX + slug)
+                yield PILLAR_SECTION_PREFIX + slug, PILLAR_ACTIVITIES_PATH.format(slug=slug), {}, False
+
+        # Forget pillars that were removed from the index
+        for section in [s for s in self._sections if s.startswith(PILLAR_SECTION_PREFIX)]:
+            if section not in pillar_sections:
+                del self._sections[section]
+                self._file_state.pop(section, None)
+
+    def _build_snapshot(self, topic_index: Optional[TopicIndex] = None,
+                        standardized_index: Optional[TopicIndex] = None,
+                        essential_growth_index: Optional[EssentialGrowthIndex] = None) -> CatalogSnapshot:
+        pillar_activities = {
+            section[len(PILLAR_SECTION_PREFIX):]: data
+            for section, data in self._sections.items()
+            if section.startswith(PILLAR_SECTION_PREFIX)
+        }
+        return CatalogSnapshot(
+            version=self._compute_version(),
+            topics=self._sections["topics"],
+            niches=self._sections["niches"],
+            essential_growth=self._sections["essential_growth"],
+            standardized_topics=self._sections["standardized_topics"],
+            pillar_activities=pillar_activities,
+            topic_index=topic_index,
+            standardized_index=standardized_index,
+            essential_growth_index=essential_growth_index
+        )
+
+    def _publish(self, snapshot: CatalogSnapshot):
+        self._snapshot = snapshot
+        self.reload_count += 1
+        logger.info(f"✅ Catalog {snapshot.version} loaded from {self.data_dir}: "
+                    f"{len(snapshot.topics)} topics, {len(snapshot.niches)} niches, "
+                    f"{len(snapshot.essential_growth.get('pillars', []))} pillars")
+
+    def compile(self, output_path: Optional[str] = None) -> str:
+        """Write the current snapshot, with its indexes and source hashes, to a compiled file."""
+        output_path = output_path or self.snapshot_path
+        snapshot = self.snapshot()
+        payload = {
+            "schema_hash": _schema_hash(),
+            "version": snapshot.version,
+            "file_state": dict(self._file_state),
+            "sections": dict(self._sections),
+            "topic_index": snapshot.topic_index,
+            "standardized_index": snapshot.standardized_index,
+            "essential_growth_index": snapshot.essential_growth_index,
+            "compiled_at": time.time()
+        }
+        temp_path = f"{output_path}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, output_path)
+        logger.info(f"✅ Compiled catalog {snapshot.version} to {output_path}")
+        return output_path
+
+    def load_compiled(self) -> bool:
+        """Load the compiled snapshot if it matches the current code and source files.
+
+        Sources are first compared by (mtime, size); a file whose stat differs is
+        re-hashed, so a fresh checkout of unchanged data still uses the snapshot.
+        Returns False, leaving the catalog to load from JSON, when the snapshot is
+        missing, unreadable or stale. The file is a trusted build artifact.
+        """
+        path = self.snapshot_path
+        if not os.path.exists(path):
+            return False
+        started = time.perf_counter()
+
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+
+            if payload.get("schema_hash") != _schema_hash():
+                logger.info(f"⚠️ Compiled catalog {path} was built by different code - loading JSON sources")
+                return False
+
+            file_state = {}
+            for section, state in payload["file_state"].items():
+                relative_path = self._relative_path(section)
+                current = self._stat(os.path.join(self.data_dir, relative_path))
+                if state is None or current is None:
+                    if state != current:
+                        logger.info(f"⚠️ Compiled catalog is stale ({relative_path} added or removed) - loading JSON sources")
+                        return False
+                    file_state[section] = None
+                    continue
+                if current != state[:2]:
+                    with open(os.path.join(self.data_dir, relative_path), "rb") as f:
+                        if hashlib.sha256(f.read()).hexdigest() != state[2]:
+                            logger.info(f"⚠️ Compiled catalog is stale ({relative_path} changed) - loading JSON sources")
+                            return False
+                file_state[section] = (current[0], current[1], state[2])
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load compiled catalog {path}: {e} - loading JSON sources")
+            return False
+
+        with self._lock:
+            self._file_state = file_state
+            self._sections = payload["sections"]
+            self._last_check = time.monotonic()
+            self._publish(self._build_snapshot(payload["topic_index"], payload["standardized_index"],
+                                               payload["essential_growth_index"]))
+            self.loaded_from = "compiled"
+        get_tracer().record("catalog.load", time.perf_counter() - started, source="compiled")
+        return True
+
+    @staticmethod
+    def _relative_path(section: str) -> str:
+        if section.startswith(PILLAR_SECTION_PREFIX):
+            return PILLAR_ACTIVITIES_PATH.format(slug=section[len(PILLAR_SECTION_PREFIX):])
+        return CATALOG_SOURCES[section][0]
+
+    @staticmethod
+    def _ingest(section: str, data: Any) -> Any:
+        """Freeze list sections and normalize topic ages so hot paths never parse them."""
+        if not isinstance(data, list):
+            return data
+        if section in RECORD_SECTIONS:
+            return tuple(Topic.from_dict(topic_id, topic)
+                         for topic_id, topic in enumerate(data))
+        if section in TOPIC_SECTIONS:
+            return tuple(normalize_topic_age(topic) for topic in data)
+        return tuple(data)
+
+    def _compute_version(self) -> str:
+        """Derive a short version id from the content hashes of all source files."""
+        digest = hashlib.sha256()
+        for section in sorted(self._file_state):
+            state = self._file_state.get(section)
+            digest.update(f"{section}:{state[2] if state else 'missing'};".encode("utf-8"))
+        return digest.hexdigest()[:12]
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get catalog status for health and metrics endpoints."""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version,
+            "data_dir": self.data_dir,
+            "loaded_at": snapshot.loaded_at,
+            "reload_count": self.reload_count,
+            "loaded_from": self.loaded_from,
+            "topics": len(snapshot.topics),
+            "niches": len(snapshot.niches),
+            "pillars": len(snapshot.essential_growth.get("pillars", [])),
+            "pillar_activity_files": len(snapshot.pillar_activities)
+        }
+
+_catalogs: Dict[str, TopicCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+def get_catalog(data_dir: Optional[str] = None) -> TopicCatalog:
+    """Get the shared catalog for a data directory, loading it on first use."""
+    key = os.path.abspath(data_dir or DEFAULT_DATA_DIR)
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(key)
+            if catalog is None:
+                catalog = TopicCatalog(key)
+                _catalogs[key] = catalog
+    return catalog
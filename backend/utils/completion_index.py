@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Completion Index
+Per-child bitsets of completed catalog topics for history-aware matching
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.catalog import DEFAULT_DATA_DIR
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HISTORY_FILENAME = "learning_history.json"
+
+# Children whose saved progress and bitsets are kept in memory, least recently used evicted first
+MAX_PROGRESS_CHILDREN = int(os.getenv("COMPLETION_INDEX_MAX_CHILDREN", "10000"))
+
+# Saved-progress load retries: first delay in seconds, doubling up to the cap, at most this many attempts
+PROGRESS_RETRY_SECONDS = 30.0
+PROGRESS_RETRY_MAX_SECONDS = 900.0
+PROGRESS_LOAD_ATTEMPTS = 6
+
+# () -> (child id, completed topics) pairs for every child with saved progress,
+# or None when the store is not configured
+ProgressSource = Callable[[], Optional[Iterable[Tuple[str, Iterable[Any]]]]]
+
+def _topic_name(entry: Any) -> str:
+    if isinstance(entry, Mapping):
+        entry = entry.get("Topic", entry.get("topic", entry.get("topic_name", "")))
+    return str(entry or "").strip()
+
+def history_file_for(data_dir: Optional[str] = None) -> str:
+    """LEARNING_HISTORY_FILE, else the history file in an app's data directory."""
+    return os.getenv("LEARNING_HISTORY_FILE") or os.path.join(data_dir or DEFAULT_DATA_DIR, HISTORY_FILENAME)
+
+def schedule_progress_topics(schedule: Dict[str, Any], completed_activities: Iterable[str]) -> List[Any]:
+    """Topics behind a schedule's completed activity ids ("week-day-activity")."""
+    weekly_plan = schedule.get("weekly_plan", schedule.get("weeklyPlan", []))
+    if isinstance(weekly_plan, dict):
+        weekly_plan = list(weekly_plan.values())
+    topics = []
+    for activity_id in completed_activities:
+        try:
+            week, day, index = (int(part) for part in str(activity_id).split("-"))
+            day_plan = weekly_plan[week][day]
+            activities = day_plan.get("activities", []) if isinstance(day_plan, dict) else day_plan
+            activity = activities[index]
+        except (ValueError, IndexError, KeyError, TypeError, AttributeError):
+            continue
+        topics.append(activity.get("topic_name", activity.get("topic", activity.get("Topic"))) if isinstance(activity, dict) else activity)
+    return topics
+
+class CompletionIndex:
+    """Completed topic names per child, with a packed bitset over catalog topic ids.
+
+    Completions come from the LearningHistoryTracker history file (re-read only
+    when it changes, at most once per check interval) and from schedule
+    progress: saved progress is loaded in bulk from progress_source on a
+    background thread (start_progress_load) and kept current by record() as
+    it is saved, so matching never queries the store. Progress and bitsets
+    are kept for at most max_children children (LRU). Bitsets are
+    ceil(topics / 8) bytes, built per catalog version on first use; a name
+    that several topics share marks all of them.
+    """
+
+    def __init__(self, history_file: Optional[str] = None, check_interval: Optional[float] = None,
+                 progress_source: Optional[ProgressSource] = None, max_children: Optional[int] = None):
+        self.history_file = history_file or history_file_for()
+        if check_interval is None:
+            check_interval = float(os.getenv("CATALOG_CHECK_INTERVAL", "30"))
+        self.check_interval = check_interval
+        self.progress_source = progress_source
+        self.max_children = max(1, max_children or MAX_PROGRESS_CHILDREN)
+
+        self._lock = threading.Lock()
+        self._history_names: Dict[str, Set[str]] = {}
+        self._progress_names: "OrderedDict[str, Set[str]]" = OrderedDict()
+        self._bits: "OrderedDict[str, Tuple[str, np.ndarray]]" = OrderedDict()
+        self._name_ids: Tuple[Optional[str], Dict[str, np.ndarray]] = (None, {})
+        self._history_state: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._load_thread: Optional[threading.Thread] = None
+        self.history_loads = 0
+        self.progress_load_status = "not_started"
+        self.progress_load_failures = 0
+
+    def _refresh_history(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval and self._checked_at:
+            return
+        self._checked_at = now
+        try:
+            stat = os.stat(self.history_file)
+            state = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            state = None
+        if state == self._history_state:
+            return
+
+        history_names: Dict[str, Set[str]] = {}
+        if state is not None:
+            try:
+                with open(self.history_file, "r", encoding="utf-8") as f:
+                    all_history = json.load(f)
+                for child_id, history in all_history.items():
+                    names = {_topic_name(session.get("topic_name")) for session in history.get("learning_sessions", [])
+                             if session.get("status") == "completed"}
+                    names.discard("")
+                    if names:
+                        history_names[str(child_id)] = names
+            except Exception as e:
+                logger.error(f"❌ Error loading learning history {self.history_file}: {e}")
+                return
+
+        self._history_state = state
+        self._history_names = history_names
+        self._bits.clear()
+        self.history_loads += 1
+        logger.info(f"✅ Loaded learning history for {len(history_names)} children from {self.history_file}")
+
+    def _add_progress(self, child_id: str, names: Set[str]):
+        """Merge names into a child's progress (lock held), evicting the least recently used children."""
+        self._progress_names.setdefault(child_id, set()).update(names)
+        self._progress_names.move_to_end(child_id)
+        self._bits.pop(child_id, None)
+        while len(self._progress_names) > self.max_children:
+            evicted, _ = self._progress_names.popitem(last=False)
+            self._bits.pop(evicted, None)
+
+    def record(self, child_id: str, topics: Iterable[Any]):
+        """Add completed topics (names or topic dicts) for a child."""
+        names = {_topic_name(topic) for topic in topics}
+        names.discard("")
+        if not names:
+            return
+        with self._lock:
+            self._add_progress(str(child_id), names)
+
+    def record_schedule_progress(self, child_id: str, schedule: Dict[str, Any], completed_activities: Iterable[str]):
+        """Add the topics behind a schedule's completed activity ids ("week-day-activity")."""
+        self.record(child_id, schedule_progress_topics(schedule, completed_activities))
+
+    def load_saved_progress(self) -> bool:
+        """Merge every child's saved progress from progress_source; False if the store is unavailable.
+
+        Exceptions propagate, so the caller decides whether to retry.
+        """
+        if self.progress_source is None:
+            return False
+        entries = self.progress_source()
+        if entries is None:
+            return False
+        children = 0
+        for child_id, topics in entries:
+            names = {_topic_name(topic) for topic in topics or ()}
+            names.discard("")
+            if names:
+                with self._lock:
+                    self._add_progress(str(child_id), names)
+                children += 1
+        logger.info(f"✅ Loaded saved progress for {children} children")
+        return True
+
+    def _load_with_backoff(self):
+        delay = PROGRESS_RETRY_SECONDS
+        for attempt in range(1, PROGRESS_LOAD_ATTEMPTS + 1):
+            try:
+                self.progress_load_status = "loaded" if self.load_saved_progress() else "unavailable"
+                return
+            except Exception as e:
+                self.progress_load_failures += 1
+                logger.warning(f"⚠️ Could not load saved progress (attempt {attempt}/{PROGRESS_LOAD_ATTEMPTS}): {e}")
+                if attempt < PROGRESS_LOAD_ATTEMPTS:
+                    time.sleep(delay)
+                    delay = min(delay * 2, PROGRESS_RETRY_MAX_SECONDS)
+        self.progress_load_status = "failed"
+
+    def start_progress_load(self):
+        """Load saved progress on a daemon thread, retrying failures with exponential backoff; runs once."""
+        with self._lock:
+            if self.progress_source is None or self._load_thread is not None:
+                return
+            self.progress_load_status = "loading"
+            self._load_thread = threading.Thread(target=self._load_with_backoff, name="completion-progress-load",
+                                                 daemon=True)
+        self._load_thread.start()
+
+    def _ids_by_name(self, snapshot) -> Dict[str, np.ndarray]:
+        version, name_ids = self._name_ids
+        if version != snapshot.version:
+            grouped: Dict[str, List[int]] = {}
+            for topic_id, topic in enumerate(snapshot.topics):
+                grouped.setdefault(_topic_name(topic), []).append(topic_id)
+            name_ids = {name: np.array(ids, dtype=np.int64) for name, ids in grouped.items()}
+            self._name_ids = (snapshot.version, name_ids)
+        return name_ids
+
+    def completed_names(self, child_id: str) -> Set[str]:
+        child_id = str(child_id)
+        with self._lock:
+            self._refresh_history()
+            return self._history_names.get(child_id, set()) | self._progress_names.get(child_id, set())
+
+    def packed_bits(self, child_id: str, snapshot) -> np.ndarray:
+        """Completed topics of a child as a little-endian packed bitset over the snapshot's topic ids."""
+        child_id = str(child_id)
+        with self._lock:
+            self._refresh_history()
+            cached = self._bits.get(child_id)
+            if cached is not None and cached[0] == snapshot.version:
+                self._bits.move_to_end(child_id)
+                return cached[1]
+            mask = np.zeros(len(snapshot.topics), dtype=bool)
+            name_ids = self._ids_by_name(snapshot)
+            for name in self._history_names.get(child_id, set()) | self._progress_names.get(child_id, set()):
+                ids = name_ids.get(name)
+                if ids is not None:
+                    mask[ids] = True
+            bits = np.packbits(mask, bitorder="little")
+            self._bits[child_id] = (snapshot.version, bits)
+            while len(self._bits) > self.max_children:
+                self._bits.popitem(last=False)
+            return bits
+
+    def completed_mask(self, child_id: str, snapshot) -> np.ndarray:
+        """Boolean array, True for topic ids the child has completed."""
+        return np.unpackbits(self.packed_bits(child_id, snapshot), count=len(snapshot.topics), bitorder="little").astype(bool)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "history_file": self.history_file,
+            "history_loads": self.history_loads,
+            "children_with_history": len(set(self._history_names) | set(self._progress_names)),
+            "progress_load_status": self.progress_load_status,
+            "progress_load_failures": self.progress_load_failures,
+            "cached_bitsets": len(self._bits),
+            "bitset_bytes": sum(bits.nbytes for _, bits in self._bits.values())
+        }
+
+_indexes: Dict[str, CompletionIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_completion_index(data_dir: Optional[str] = None, history_file: Optional[str] = None,
+                         progress_source: Optional[ProgressSource] = None) -> CompletionIndex:
+    """Get the shared completion index for an app's data directory (or an explicit history file).
+
+    The first caller passing progress_source attaches it to the shared index.
+    """
+    key = os.path.abspath(history_file or history_file_for(data_dir))
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = CompletionIndex(key, progress_source=progress_source)
+                _indexes[key] = index
+    if progress_source is not None and index.progress_source is None:
+        index.progress_source = progress_source
+    return index
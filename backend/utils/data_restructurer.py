@@ -11,6 +11,8 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional
 import logging
 
+from utils.age_utils import normalize_topic_age, topic_min_age
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -65,7 +67,7 @@ class DataRestructurer:
     
     def determine_difficulty(self, topic: Dict[str, Any], niche: str) -> str:
         """Determine difficulty level based on topic complexity and age."""
-        age = topic.get("Age", 5)
+        age = topic_min_age(topic)
         topic_name = topic.get("Topic", "").lower()
         objective = topic.get("Objective", "").lower()
         
@@ -112,7 +114,7 @@ class DataRestructurer:
         # Create relationships within each niche
         for niche, niche_topic_list in niche_topics.items():
             # Sort by age and difficulty
-            sorted_topics = sorted(niche_topic_list, key=lambda x: (x.get("Age", 0), x.get("Topic", "")))
+            sorted_topics = sorted(niche_topic_list, key=lambda x: (topic_min_age(x, 0), x.get("Topic", "")))
             
             for i, topic in enumerate(sorted_topics):
                 topic_id = f"{niche}_{topic.get('Topic', '').replace(' ', '_')}"
@@ -120,7 +122,7 @@ class DataRestructurer:
                 
                 # Find prerequisites (topics that should come before)
                 for j, potential_prereq in enumerate(sorted_topics[:i]):
-                    if potential_prereq.get("Age", 0) < topic.get("Age", 0):
+                    if topic_min_age(potential_prereq, 0) < topic_min_age(topic, 0):
                         prereq_id = f"{niche}_{potential_prereq.get('Topic', '').replace(' ', '_')}"
                         relationships[topic_id].append(prereq_id)
         
@@ -134,7 +136,7 @@ class DataRestructurer:
             niche_topics = [t for t in topics if t.get("Niche") == niche]
             
             # Sort by age and difficulty
-            sorted_topics = sorted(niche_topics, key=lambda x: (x.get("Age", 0), x.get("Topic", "")))
+            sorted_topics = sorted(niche_topics, key=lambda x: (topic_min_age(x, 0), x.get("Topic", "")))
             
             # Create sequence
             sequence = []
@@ -151,7 +153,7 @@ class DataRestructurer:
         restructured = copy.deepcopy(topic)
         
         # Add new fields
-        age = topic.get("Age", 5)
+        age = topic_min_age(topic)
         niche = topic.get("Niche", "")
         topic_name = topic.get("Topic", "")
         
@@ -234,6 +236,8 @@ class DataRestructurer:
             with open(input_file, 'r', encoding='utf-8') as f:
                 original_topics = json.load(f)
             logger.info(f"✅ Loaded {len(original_topics)} topics from {input_file}")
+            # Normalize ages once so every later step compares integers
+            original_topics = [normalize_topic_age(topic) for topic in original_topics]
         except Exception as e:
             logger.error(f"❌ Error loading {input_file}: {e}")
             return {"success": False, "error": str(e)}
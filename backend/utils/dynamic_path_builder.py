@@ -10,6 +10,8 @@ from typing import Dict, List, Any, Optional, Tuple
 import logging
 from collections import defaultdict
 
+from utils.age_utils import topic_min_age, topic_max_age
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -41,7 +43,7 @@ class DynamicPathBuilder:
     
     def analyze_topic_complexity(self, topic: Dict[str, Any]) -> str:
         """Analyze topic complexity based on content and age."""
-        age = topic.get("Age", 5)
+        age = topic_min_age(topic)
         topic_name = topic.get("Topic", "").lower()
         objective = topic.get("Objective", "").lower()
         explanation = topic.get("Explanation", "").lower()
@@ -115,14 +117,14 @@ class DynamicPathBuilder:
                 if complexity in complexity_groups:
                     topics = complexity_groups[complexity]
                     # Sort topics within complexity by age
-                    topics.sort(key=lambda x: x.get("Age", 5))
+                    topics.sort(key=topic_min_age)
                     
                     sequence["stages"][complexity] = {
                         "complexity": complexity,
                         "description": f"{complexity.title()} level {niche} concepts",
                         "topics": topics,
                         "topic_count": len(topics),
-                        "age_range": f"{min(t.get('Age', 5) for t in topics)}-{max(t.get('Age', 5) for t in topics)}"
+                        "age_range": f"{min(topic_min_age(t) for t in topics)}-{max(topic_max_age(t) for t in topics)}"
                     }
                     sequence["total_topics"] += len(topics)
             
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Essential Growth Index
+Lookup tables over the per-pillar activities.json files of essential growth
+"""
+
+import re
+from itertools import product
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from utils.age_utils import parse_age_months
+from utils.data_restructurer import DataRestructurer
+
+# Lookup key fields, in order; any of them can be left out of a query
+KEY_FIELDS = ("pillar", "age_group", "category", "difficulty")
+
+def _slug(text: Any) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-")
+
+def _key_part(value: Any) -> Optional[str]:
+    return None if value is None else str(value).strip().lower()
+
+class EssentialGrowthIndex:
+    """Maps (pillar, age_group, category, difficulty) to activity ids.
+
+    Every combination of the four key fields, with any of them wildcarded, is
+    precomputed, so a filtered query is a single dictionary lookup. Activities
+    are also bucketed by age in months, so infant queries ("4 months") match
+    the month ranges in the data ("3-12 months") exactly instead of rounding
+    to years. Key lookups are case-insensitive.
+    """
+
+    def __init__(self, pillar_activities: Dict[str, Dict[str, Any]]):
+        self.activities: Dict[str, Dict[str, Any]] = {}
+        self.order: Dict[str, int] = {}
+        self.by_key: Dict[Tuple[Optional[str], ...], Tuple[str, ...]] = {}
+        self.by_month: Dict[int, frozenset] = {}
+
+        by_key: Dict[Tuple[Optional[str], ...], List[str]] = {}
+        by_month: Dict[int, Set[str]] = {}
+        restructurer = DataRestructurer()
+
+        for pillar, data in pillar_activities.items():
+            for age_group in data.get("ageGroups", []):
+                group_label = age_group.get("ageGroup", "")
+                group_months = parse_age_months(group_label)
+                for category in age_group.get("categories", []):
+                    category_name = category.get("category", "")
+                    for activity in category.get("activities", []):
+                        activity_id = "/".join((pillar, _slug(group_label), _slug(category_name),
+                                                str(activity.get("topicNumber", len(self.activities) + 1))))
+                        age_min, age_max = parse_age_months(activity.get("age", ""))
+                        if age_min is None:
+                            age_min, age_max = group_months
+                        difficulty = activity.get("difficulty") or self._derive_difficulty(restructurer, activity, age_min)
+
+                        entry = {
+                            "id": activity_id,
+                            "pillar": pillar,
+                            "ageGroup": group_label,
+                            "category": category_name,
+                            "difficulty": difficulty,
+                            "age_months_min": age_min,
+                            "age_months_max": age_max,
+                            **activity
+                        }
+                        self.order[activity_id] = len(self.activities)
+                        self.activities[activity_id] = entry
+
+                        key = (pillar, group_label, category_name, difficulty)
+                        for mask in product((True, False), repeat=len(KEY_FIELDS)):
+                            masked = tuple(_key_part(value) if keep else None for value, keep in zip(key, mask))
+                            by_key.setdefault(masked, []).append(activity_id)
+
+                        if age_min is not None:
+                            for month in range(age_min, age_max + 1):
+                                by_month.setdefault(month, set()).add(activity_id)
+
+        self.by_key = {key: tuple(ids) for key, ids in by_key.items()}
+        self.by_month = {month: frozenset(ids) for month, ids in by_month.items()}
+
+    @staticmethod
+    def _derive_difficulty(restructurer: DataRestructurer, activity: Dict[str, Any], age_min: Optional[int]) -> str:
+        # activities.json has no difficulty field; use the topic catalog's age/keyword rules
+        topic = {
+            "Topic": activity.get("topic", ""),
+            "Objective": activity.get("objective", ""),
+            "age_min": (age_min or 0) // 12,
+            "age_max": (age_min or 0) // 12
+        }
+        return restructurer.determine_difficulty(topic, "")
+
+    def __len__(self) -> int:
+        return len(self.activities)
+
+    def get(self, activity_id: str) -> Optional[Dict[str, Any]]:
+        return self.activities.get(activity_id)
+
+    def ids_for(self, pillar: Optional[str] = None, age_group: Optional[str] = None,
+                category: Optional[str] = None, difficulty: Optional[str] = None) -> Tuple[str, ...]:
+        """Activity ids matching the given key fields, in file order; None matches anything."""
+        key = (_key_part(pillar), _key_part(age_group), _key_part(category), _key_part(difficulty))
+        return self.by_key.get(key, ())
+
+    def ids_for_age_months(self, months: int) -> frozenset:
+        """Activity ids whose age range includes the given age in months."""
+        return self.by_month.get(months, frozenset())
+
+    def find(self, pillar: Optional[str] = None, age_group: Optional[str] = None, category: Optional[str] = None,
+             difficulty: Optional[str] = None, age_months: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Activities matching the filters, in file order."""
+        ids = self.ids_for(pillar, age_group, category, difficulty)
+        if age_months is not None:
+            in_range = self.ids_for_age_months(age_months)
+            ids = [activity_id for activity_id in ids if activity_id in in_range]
+        return [self.activities[activity_id] for activity_id in ids]
+
+    def values(self, field: str, pillar: Optional[str] = None) -> List[str]:
+        """Distinct values of a key field (e.g. the categories of one pillar), in file order."""
+        seen: Dict[str, None] = {}
+        for activity_id in self.ids_for(pillar=pillar):
+            seen.setdefault(self.activities[activity_id][{"age_group": "ageGroup"}.get(field, field)], None)
+        return list(seen)
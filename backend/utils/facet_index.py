@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Facet Index
+Per-value topic bitsets for filter dropdowns and their counts
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from utils.age_utils import topic_age_bounds
+
+def _age_values(topic: Any) -> List[int]:
+    age_min, age_max = topic_age_bounds(topic)
+    return [] if age_min is None else list(range(age_min, age_max + 1))
+
+def _single(getter: Callable[[Any], Any]) -> Callable[[Any], List[Any]]:
+    def values(topic: Any) -> List[Any]:
+        value = getter(topic)
+        return [value] if value else []
+    return values
+
+# Facet name -> values of a topic for that facet (same fields as /api/topics/enhanced)
+FACETS: Dict[str, Callable[[Any], List[Any]]] = {
+    "age_group": _single(lambda t: t.get("age_group")),
+    "difficulty": _single(lambda t: t.get("difficulty")),
+    "learning_stage": _single(lambda t: (t.get("dynamic_path") or {}).get("stage")),
+    "niche": _single(lambda t: t.get("Niche", t.get("niche"))),
+    "age": _age_values,
+}
+
+class FacetIndex:
+    """Bitset (Python int, bit i = topic id i) of matching topics for every facet value.
+
+    Selecting values ORs their bitsets within a facet and ANDs across facets.
+    Counts for a facet are taken under the selection of the other facets only,
+    so a dropdown still shows how many topics each alternative would give.
+    """
+
+    def __init__(self, topics: Sequence[Any]):
+        self.size = len(topics)
+        self.all_bits = (1 << self.size) - 1
+        self.bitsets: Dict[str, Dict[Any, int]] = {name: {} for name in FACETS}
+        for topic_id, topic in enumerate(topics):
+            bit = 1 << topic_id
+            for name, values in FACETS.items():
+                facet = self.bitsets[name]
+                for value in values(topic):
+                    facet[value] = facet.get(value, 0) | bit
+
+    def selection_bits(self, selection: Dict[str, Iterable[Any]], exclude: Optional[str] = None) -> int:
+        """Topics matching the selection, ignoring the excluded facet."""
+        bits = self.all_bits
+        for name, values in selection.items():
+            if name == exclude or name not in self.bitsets:
+                continue
+            facet = self.bitsets[name]
+            union = 0
+            for value in values:
+                union |= facet.get(value, 0)
+            bits &= union
+        return bits
+
+    def counts(self, selection: Optional[Dict[str, List[Any]]] = None) -> Dict[str, Any]:
+        """Values and counts for every facet, plus the number of topics matching the whole selection."""
+        selection = {name: values for name, values in (selection or {}).items() if values}
+        facets = {}
+        for name, facet in self.bitsets.items():
+            others = self.selection_bits(selection, exclude=name)
+            facets[name] = [
+                {"value": value, "count": (bits & others).bit_count(), "selected": value in selection.get(name, ())}
+                for value, bits in sorted(facet.items(), key=lambda item: (isinstance(item[0], str), item[0]))
+            ]
+        return {
+            "facets": facets,
+            "total": self.selection_bits(selection).bit_count()
+        }
+
+_cache_lock = threading.Lock()
+_cached: Dict[str, FacetIndex] = {}
+
+def get_facet_index(version: str, topics: Sequence[Any]) -> FacetIndex:
+    """Facet index for a catalog version, built on first use and replaced when the catalog changes."""
+    index = _cached.get(version)
+    if index is None:
+        with _cache_lock:
+            index = _cached.get(version)
+            if index is None:
+                index = FacetIndex(topics)
+                _cached.clear()
+                _cached[version] = index
+    return index
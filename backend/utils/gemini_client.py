@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Gemini Client
+Imports and configures google.generativeai on first use instead of at server start
+"""
+
+import logging
+import threading
+from typing import Any, Optional
+
+from utils.tracing import span
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gemini-1.5-flash"
+
+_genai = None
+_configured_key: Optional[str] = None
+_lock = threading.Lock()
+
+def get_genai(api_key: Optional[str] = None) -> Any:
+    """Import the Gemini SDK (slow, ~0.5s) the first time it is needed and configure it."""
+    global _genai, _configured_key
+    with _lock:
+        if _genai is None:
+            import google.generativeai as genai
+            _genai = genai
+            logger.info("✅ Gemini SDK imported on first use")
+        if api_key and api_key != _configured_key:
+            _genai.configure(api_key=api_key)
+            _configured_key = api_key
+    return _genai
+
+def get_model(model_name: str = DEFAULT_MODEL, api_key: Optional[str] = None) -> Any:
+    """Get a Gemini model, importing the SDK on first call."""
+    return get_genai(api_key).GenerativeModel(model_name)
+
+def generate_content(model: Any, prompt: str, agent: Optional[str] = None) -> Any:
+    """Call the model inside an "llm.call" span so LLM latency shows up in /metrics."""
+    with span("llm.call", agent=agent, model=getattr(model, "model_name", None)):
+        return model.generate_content(prompt)
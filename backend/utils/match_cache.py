@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Match Cache
+LRU + TTL cache of match results keyed by a normalized profile fingerprint
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def profile_fingerprint(age: Any, interests: Iterable[str], learning_style: Any = None,
+                        plan_type: Any = None) -> Tuple[Any, ...]:
+    """Canonical key for profiles that match the same topics.
+
+    Interests are lowercased, stripped, de-duplicated and sorted, so
+    ["AI", "Coding"] and ["coding ", "ai"] share an entry.
+    """
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        age = str(age)
+    normalized = tuple(sorted({str(interest).strip().lower() for interest in interests if str(interest).strip()}))
+    return (age, normalized, str(learning_style or "").strip().lower(), str(plan_type or "").strip().lower())
+
+class MatchCache:
+    """Match results for the current catalog version, bounded by size and age.
+
+    Entries expire after ttl_seconds and the least recently used entry is
+    evicted beyond max_entries. A lookup for a new catalog version drops every
+    entry, so results never outlive the catalog they were computed from.
+    Cached values are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        if max_entries is None:
+            max_entries = int(os.getenv("MATCH_CACHE_SIZE", "1024"))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("MATCH_CACHE_TTL", "600"))
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[Any, ...], Tuple[float, Any]]" = OrderedDict()
+        self._version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: str):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                logger.info(f"🔄 Match cache cleared for catalog {version} ({len(self._entries)} entries)")
+            self._entries.clear()
+            self._version = version
+
+    def get(self, version: str, key: Tuple[Any, ...]) -> Optional[Any]:
+        """Cached result for a fingerprint, or None on a miss."""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.monotonic() - entry[0] < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+            return None
+
+    def put(self, version: str, key: Tuple[Any, ...], value: Any):
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "catalog_version": self._version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+_match_cache = MatchCache()
+
+def get_match_cache() -> MatchCache:
+    """Get the process-wide match cache."""
+    return _match_cache
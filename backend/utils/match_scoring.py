@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Match Scoring
+Vectorized topic scoring and diversity-constrained (MMR) selection for the match agent
+"""
+
+import hashlib
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from utils.topic_index import TopicIndex
+
+# Score weights: interest affinity dominates, age fit orders topics within it
+INTEREST_WEIGHT = 10.0
+AGE_WEIGHT = 2.0
+
+# Topics outside the age window (or with unknown ages) only fill in when nothing else is left
+OUT_OF_WINDOW_PENALTY = 20.0
+
+# MMR trade-off between relevance and novelty (1.0 ignores diversity)
+MMR_LAMBDA = 0.7
+
+# Default per-niche quota as a share of the selection
+MAX_NICHE_SHARE = 0.75
+
+def niche_affinity_array(topic_index: TopicIndex, niche_affinity: Dict[str, float]) -> np.ndarray:
+    """Per-topic affinity, looked up once per distinct niche and broadcast through the niche codes."""
+    per_niche = np.array([niche_affinity.get(niche, 0.0) for niche in topic_index.niches], dtype=np.float64)
+    return per_niche[topic_index.niche_codes] if per_niche.size else np.zeros(topic_index.size)
+
+def score_topics(topic_index: TopicIndex, child_age: int, age_min: int, age_max: int,
+                 niche_affinity: Dict[str, float]) -> np.ndarray:
+    """Score every catalog topic for a child in one pass.
+
+    Age fit falls off linearly with the distance between the child's age and
+    the topic's age range; topics not overlapping [age_min, age_max] get a
+    large penalty instead of being dropped, so small catalogs still fill a plan.
+    """
+    topic_min = topic_index.age_min_array
+    topic_max = topic_index.age_max_array
+    known = ~np.isnan(topic_min)
+
+    distance = np.maximum(np.maximum(topic_min - child_age, child_age - topic_max), 0.0)
+    window = max(child_age - age_min, age_max - child_age) + 1
+    age_fit = np.where(known, 1.0 - distance / window, 0.0)
+    in_window = known & (topic_min <= age_max) & (topic_max >= age_min)
+
+    scores = INTEREST_WEIGHT * niche_affinity_array(topic_index, niche_affinity) + AGE_WEIGHT * age_fit
+    return np.where(in_window, scores, scores - OUT_OF_WINDOW_PENALTY)
+
+def stable_seed(*parts: Any) -> int:
+    """Seed derived from the request itself, identical in every process (unlike hash())."""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+def niche_quota(k: int, max_share: float = MAX_NICHE_SHARE) -> int:
+    return max(1, math.ceil(k * max_share))
+
+def mmr_select(topic_index: TopicIndex, scores: np.ndarray, k: int, seed: int = 0,
+               mmr_lambda: float = MMR_LAMBDA, quota: Optional[int] = None,
+               quotas: Optional[Dict[str, int]] = None, candidates: Optional[np.ndarray] = None) -> List[int]:
+    """Pick k topic ids by maximal marginal relevance, best first.
+
+    Each step takes the topic maximizing
+    mmr_lambda * relevance - (1 - mmr_lambda) * similarity to the picks so far,
+    where relevance is the score rescaled to [0, 1] and two topics are similar
+    when they share a niche. A niche stops contributing once it reaches its
+    quota (quotas[niche], else quota, else MAX_NICHE_SHARE of k); quotas are
+    only relaxed when every remaining topic is over quota. Exact ties are
+    broken by a seeded random order, so the same inputs and seed give the
+    same selection in every process. candidates, a boolean mask, limits the
+    pick to those topics.
+    """
+    size = len(scores)
+    available = np.ones(size, dtype=bool) if candidates is None else candidates.copy()
+    k = min(k, int(available.sum()))
+    if k <= 0:
+        return []
+
+    low, high = float(scores[available].min()), float(scores[available].max())
+    relevance = (scores - low) / (high - low) if high > low else np.ones(size)
+    tie_break = np.random.default_rng(seed).random(size)
+
+    codes = topic_index.niche_codes
+    niche_limits = np.full(max(len(topic_index.niches), 1), quota or niche_quota(k), dtype=np.int64)
+    for code, niche in enumerate(topic_index.niches):
+        if quotas and niche in quotas:
+            niche_limits[code] = quotas[niche]
+    niche_picks = np.zeros(len(niche_limits), dtype=np.int64)
+
+    selected: List[int] = []
+    for _ in range(k):
+        marginal = mmr_lambda * relevance - (1.0 - mmr_lambda) * (niche_picks[codes] > 0)
+        open_slots = available & (niche_picks[codes] < niche_limits[codes])
+        allowed = open_slots if open_slots.any() else available
+        marginal = np.where(allowed, marginal, -np.inf)
+        best = np.flatnonzero(marginal == marginal.max())
+        topic_id = int(best[np.argmax(tie_break[best])])
+        selected.append(topic_id)
+        available[topic_id] = False
+        niche_picks[codes[topic_id]] += 1
+    return selected
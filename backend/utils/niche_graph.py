@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Niche Graph
+Weighted related-niche adjacency over the catalog niches, built once per catalog load
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+# Cross-disciplinary relationships between interests
+NICHE_RELATIONSHIPS: Dict[str, Tuple[str, ...]] = {
+    "ai": ("technology", "science", "mathematics", "coding", "logic", "innovation", "automation"),
+    "technology": ("ai", "science", "mathematics", "coding", "engineering", "innovation", "digital"),
+    "science": ("technology", "mathematics", "nature", "experiments", "ai", "discovery", "research"),
+    "mathematics": ("science", "technology", "logic", "finance", "coding", "patterns", "analysis"),
+    "finance": ("mathematics", "business", "life skills", "economics", "planning", "money", "investing"),
+    "business": ("finance", "communication", "life skills", "marketing", "leadership", "entrepreneurship"),
+    "communication": ("business", "arts", "social skills", "language", "presentation", "expression"),
+    "arts": ("communication", "creativity", "design", "culture", "expression", "imagination"),
+    "creativity": ("arts", "design", "innovation", "problem-solving", "expression", "imagination"),
+    "nature": ("science", "environment", "exploration", "outdoor activities", "biology", "ecology"),
+    "sports": ("health", "teamwork", "coordination", "strategy", "fitness", "physical activity"),
+    "coding": ("technology", "mathematics", "logic", "problem-solving", "ai", "programming"),
+    "history": ("culture", "social studies", "geography", "literature", "politics", "heritage"),
+    "geography": ("history", "culture", "science", "travel", "environment", "world", "places"),
+    "dance": ("arts", "music", "movement", "creativity", "expression", "fitness", "culture"),
+    "music": ("arts", "dance", "creativity", "culture", "rhythm", "sound", "expression"),
+    "nature exploration": ("science", "nature", "environment", "outdoor activities", "discovery", "adventure"),
+    "travel": ("geography", "culture", "history", "language", "adventure", "world", "places"),
+}
+
+# Broad categories related to every interest
+GENERAL_CATEGORIES: Tuple[str, ...] = (
+    "general", "life skills", "problem-solving", "creativity",
+    "learning", "education", "fun", "activities", "development"
+)
+
+# Edge weights, usable directly as match scores
+SELF_WEIGHT = 1.0
+RELATED_WEIGHT = 0.6
+# Niches related only to a secondary interest
+SECONDARY_RELATED_WEIGHT = 0.4
+
+def related_terms(interest: str) -> Tuple[str, ...]:
+    """The interest itself, its related niches and the general categories, without duplicates."""
+    interest = interest.lower()
+    return tuple(dict.fromkeys((interest,) + NICHE_RELATIONSHIPS.get(interest, ()) + GENERAL_CATEGORIES))
+
+class NicheGraph:
+    """Interest -> {catalog niche: weight} adjacency.
+
+    A catalog niche is linked to an interest when it is the interest itself
+    (SELF_WEIGHT) or contains one of the interest's related terms
+    (RELATED_WEIGHT). Edges for every known interest and catalog niche are
+    precomputed and never change afterwards, so lookups need no lock; free-text
+    interests are computed per call rather than remembered, which keeps the
+    graph bounded by the catalog.
+    """
+
+    def __init__(self, catalog_niches: Iterable[str]):
+        self.niches: Tuple[str, ...] = tuple(dict.fromkeys(niche for niche in catalog_niches if niche))
+        self.edges: Dict[str, Dict[str, float]] = {}
+        for interest in list(NICHE_RELATIONSHIPS) + list(self.niches):
+            interest = interest.lower()
+            if interest not in self.edges:
+                self.edges[interest] = self._compute(interest)
+
+    def _compute(self, interest: str) -> Dict[str, float]:
+        terms = related_terms(interest)
+        edges = {}
+        for niche in self.niches:
+            if niche == interest:
+                edges[niche] = SELF_WEIGHT
+            elif any(term in niche for term in terms):
+                edges[niche] = RELATED_WEIGHT
+        return edges
+
+    def neighbors(self, interest: str) -> Dict[str, float]:
+        """Catalog niches linked to an interest, with their weights."""
+        interest = interest.lower()
+        edges = self.edges.get(interest)
+        return edges if edges is not None else self._compute(interest)
+
+    def affinity(self, interests: List[str]) -> Dict[str, float]:
+        """Best weight of each catalog niche over the child's interests.
+
+        The first interest is the primary one; niches reached only through a
+        secondary interest get SECONDARY_RELATED_WEIGHT.
+        """
+        affinity: Dict[str, float] = {}
+        for position, interest in enumerate(interests):
+            interest = interest.lower()
+            for niche, weight in self.neighbors(interest).items():
+                if position and niche != interest:
+                    weight = SECONDARY_RELATED_WEIGHT
+                if weight > affinity.get(niche, 0.0):
+                    affinity[niche] = weight
+        return affinity
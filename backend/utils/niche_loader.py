@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Niche Loader
+Loads data/niches/<slug>/ on first use and keeps a bounded LRU of parsed niches
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from utils.catalog import DEFAULT_DATA_DIR
+from utils.topic_record import Topic
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NICHES_DIRNAME = "niches"
+
+def niche_slug(name: str) -> str:
+    """Directory slug for a niche name ("Arts & Crafts" -> "arts-&-crafts")."""
+    return "-".join(str(name).strip().lower().split())
+
+def topic_from_niche_file(topic_id: int, data: Dict[str, Any]) -> Topic:
+    """Convert a per-niche topics.json entry into the catalog's original-format Topic record."""
+    activities = data.get("activities", [])
+    original = {
+        "Niche": data.get("niche", ""),
+        "#": data.get("topicNumber"),
+        "Topic": data.get("topic", ""),
+        "Objective": data.get("objective", ""),
+        "Explanation": data.get("explanation", ""),
+        "Hashtags": " ".join(data.get("hashtags", [])),
+        "Estimated Time": data.get("estimatedTime", ""),
+        "Age": data.get("age"),
+    }
+    for idx, activity in enumerate(activities[:2], 1):
+        original[f"Activity {idx}"] = activity.get("originalText", activity.get("name", ""))
+    return Topic.from_dict(topic_id, original)
+
+class NicheData:
+    """One parsed niche directory."""
+
+    __slots__ = ("slug", "info", "topics", "file_state", "size_bytes", "loaded_at", "checked_at")
+
+    def __init__(self, slug: str, info: Dict[str, Any], topics: Tuple[Topic, ...],
+                 file_state: Tuple[Optional[Tuple[int, int]], ...], size_bytes: int):
+        self.slug = slug
+        self.info = info
+        self.topics = topics
+        self.file_state = file_state
+        self.size_bytes = size_bytes
+        self.loaded_at = time.time()
+        self.checked_at = time.monotonic()
+
+class NicheLoader:
+    """Reads a niche's index.json and topics.json on first use and caches them in an LRU.
+
+    Only the niches a request touches are parsed, so worker memory tracks the
+    working set rather than the number of niche directories. Cached niches are
+    re-checked against the files at most once per check interval. Entries are
+    shared between requests and must not be mutated.
+    """
+
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, max_niches: Optional[int] = None,
+                 check_interval: Optional[float] = None):
+        self.niches_dir = os.path.join(os.path.abspath(data_dir), NICHES_DIRNAME)
+        if max_niches is None:
+            max_niches = int(os.getenv("NICHE_CACHE_SIZE", "16"))
+        if check_interval is None:
+            check_interval = float(os.getenv("CATALOG_CHECK_INTERVAL", "30"))
+        self.max_niches = max(1, max_niches)
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, NicheData]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reloads = 0
+
+    def available_slugs(self) -> List[str]:
+        """Slugs of all niche directories on disk."""
+        try:
+            return sorted(name for name in os.listdir(self.niches_dir)
+                          if os.path.isdir(os.path.join(self.niches_dir, name)))
+        except OSError:
+            return []
+
+    def get(self, slug: str) -> Optional[NicheData]:
+        """Get a niche by slug, loading it on a cache miss. Returns None for unknown niches."""
+        with self._lock:
+            entry = self._cache.get(slug)
+            if entry is not None:
+                if time.monotonic() - entry.checked_at < self.check_interval or self._is_current(entry):
+                    self._cache.move_to_end(slug)
+                    self.hits += 1
+                    return entry
+                # Files changed on disk; drop the entry and reload below
+                del self._cache[slug]
+                self.reloads += 1
+            self.misses += 1
+
+        # Parse outside the lock so a slow read does not block other niches
+        entry = self._load(slug)
+        if entry is None:
+            return None
+
+        with self._lock:
+            self._cache[slug] = entry
+            self._cache.move_to_end(slug)
+            while len(self._cache) > self.max_niches:
+                evicted_slug, _ = self._cache.popitem(last=False)
+                self.evictions += 1
+                logger.info(f"♻️ Evicted niche {evicted_slug} from cache")
+        return entry
+
+    def get_by_name(self, name: str) -> Optional[NicheData]:
+        """Get a niche by its display name."""
+        return self.get(niche_slug(name))
+
+    def get_topics(self, names: List[str]) -> List[Topic]:
+        """Topics of the given niches (by name or slug), skipping unknown ones."""
+        topics: List[Topic] = []
+        for name in names:
+            entry = self.get(niche_slug(name))
+            if entry is not None:
+                topics.extend(entry.topics)
+        return topics
+
+    def _paths(self, slug: str) -> Tuple[str, str]:
+        niche_dir = os.path.join(self.niches_dir, slug)
+        return os.path.join(niche_dir, "index.json"), os.path.join(niche_dir, "topics.json")
+
+    def _is_current(self, entry: NicheData) -> bool:
+        entry.checked_at = time.monotonic()
+        return tuple(self._stat(path) for path in self._paths(entry.slug)) == entry.file_state
+
+    def _load(self, slug: str) -> Optional[NicheData]:
+        # Slugs come from request input; never leave the niches directory
+        if not slug or os.sep in slug or slug.startswith("."):
+            return None
+        index_path, topics_path = self._paths(slug)
+        file_state = (self._stat(index_path), self._stat(topics_path))
+        if file_state[0] is None and file_state[1] is None:
+            return None
+
+        try:
+            info = {}
+            if file_state[0] is not None:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    info = json.load(f)
+            topics: Tuple[Topic, ...] = ()
+            if file_state[1] is not None:
+                with open(topics_path, "r", encoding="utf-8") as f:
+                    topics = tuple(topic_from_niche_file(idx, topic) for idx, topic in enumerate(json.load(f)))
+        except Exception as e:
+            logger.error(f"❌ Error loading niche {slug}: {e}")
+            return None
+
+        size_bytes = sum(state[1] for state in file_state if state is not None)
+        logger.info(f"✅ Loaded niche {slug}: {len(topics)} topics")
+        return NicheData(slug, info, topics, file_state, size_bytes)
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache size, memory estimate and hit rate for health and metrics endpoints."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cached_niches": len(self._cache),
+                "max_niches": self.max_niches,
+                "cached_topics": sum(len(entry.topics) for entry in self._cache.values()),
+                # Size of the source JSON of cached niches; parsed data is of the same order
+                "cached_source_bytes": sum(entry.size_bytes for entry in self._cache.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "reloads": self.reloads,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+_loaders: Dict[str, NicheLoader] = {}
+_loaders_lock = threading.Lock()
+
+def get_niche_loader(data_dir: Optional[str] = None) -> NicheLoader:
+    """Get the shared niche loader for a data directory."""
+    key = os.path.abspath(data_dir or DEFAULT_DATA_DIR)
+    loader = _loaders.get(key)
+    if loader is None:
+        with _loaders_lock:
+            loader = _loaders.get(key)
+            if loader is None:
+                loader = NicheLoader(key)
+                _loaders[key] = loader
+    return loader
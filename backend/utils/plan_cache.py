@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Plan Cache
+Serialized /api/generate-plan responses keyed by profile fingerprint and catalog version
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Cache-Status (RFC 9211) cache name
+CACHE_NAME = "unschooling-plan"
+
+# Version of the cached response shape; bump whenever agent or response code changes what a
+# profile's plan looks like, so entries written by an older deploy are missed and pruned
+PLAN_SCHEMA_VERSION = "1"
+
+# Disk-tier file names are "plan-<schema>-<catalog version>-<fingerprint>.json"
+DISK_PREFIX = "plan-"
+
+def plan_fingerprint(profile: Dict[str, Any]) -> str:
+    """Digest of the whole profile in canonical form (key order does not matter)."""
+    canonical = json.dumps(profile, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+def cache_status(hit: bool, detail: Optional[str] = None, stored: bool = False) -> str:
+    """Cache-Status header value for a plan response."""
+    if hit:
+        return f"{CACHE_NAME}; hit; detail={detail}" if detail else f"{CACHE_NAME}; hit"
+    return f"{CACHE_NAME}; fwd=miss; stored" if stored else f"{CACHE_NAME}; fwd=miss"
+
+class PlanCache:
+    """Two-tier cache of response bodies: an in-memory LRU and optional files on disk.
+
+    Keys combine the plan schema version, the catalog version and the profile
+    fingerprint, so a catalog change or a deploy that bumps PLAN_SCHEMA_VERSION
+    misses every old entry; the memory tier is also emptied then. The disk
+    tier (enabled by PLAN_CACHE_DIR) survives restarts and is shared by
+    workers on the same host; pruning only touches the cache's own plan-*
+    files, so the directory may be shared with other data.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, cache_dir: Optional[str] = None,
+                 schema_version: str = PLAN_SCHEMA_VERSION):
+        if max_entries is None:
+            max_entries = int(os.getenv("PLAN_CACHE_SIZE", "256"))
+        self.max_entries = max(1, max_entries)
+        self.cache_dir = cache_dir if cache_dir is not None else os.getenv("PLAN_CACHE_DIR") or None
+        self.schema_version = schema_version
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._version: Optional[str] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def _disk_prefix(self, version: str) -> str:
+        return f"{DISK_PREFIX}{self.schema_version}-{version}-"
+
+    def _disk_path(self, version: str, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, f"{self._disk_prefix(version)}{fingerprint}.json")
+
+    def _check_version(self, version: str):
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+            if self.cache_dir:
+                self._prune_disk(version)
+
+    def _prune_disk(self, version: str):
+        """Remove plan files written for another schema or catalog version."""
+        current = self._disk_prefix(version)
+        try:
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(DISK_PREFIX) and name.endswith(".json") and not name.startswith(current):
+                    os.remove(os.path.join(self.cache_dir, name))
+        except OSError as e:
+            logger.warning(f"⚠️ Could not prune plan cache directory {self.cache_dir}: {e}")
+
+    def get(self, version: str, fingerprint: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """Cached body and the tier it came from ("memory" or "disk"), or (None, None)."""
+        with self._lock:
+            self._check_version(version)
+            body = self._entries.get(fingerprint)
+            if body is not None:
+                self._entries.move_to_end(fingerprint)
+                self.memory_hits += 1
+                return body, "memory"
+
+        if self.cache_dir:
+            try:
+                with open(self._disk_path(version, fingerprint), "rb") as f:
+                    body = f.read()
+            except OSError:
+                body = None
+            if body is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._put_memory(version, fingerprint, body)
+                return body, "disk"
+
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    def _put_memory(self, version: str, fingerprint: str, body: bytes):
+        self._check_version(version)
+        self._entries[fingerprint] = body
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put(self, version: str, fingerprint: str, body: bytes):
+        with self._lock:
+            self._put_memory(version, fingerprint, body)
+            self.stores += 1
+        if self.cache_dir:
+            path = self._disk_path(version, fingerprint)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(temp_path, "wb") as f:
+                    f.write(body)
+                os.replace(temp_path, path)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not write plan cache file {path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk_tier": bool(self.cache_dir),
+            "schema_version": self.schema_version,
+            "catalog_version": self._version,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+        }
+
+_plan_cache: Optional[PlanCache] = None
+_plan_cache_lock = threading.Lock()
+
+def get_plan_cache() -> PlanCache:
+    """Get the process-wide plan cache, created on first use from the environment."""
+    global _plan_cache
+    if _plan_cache is None:
+        with _plan_cache_lock:
+            if _plan_cache is None:
+                _plan_cache = PlanCache()
+    return _plan_cache
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Plan Compact
+Compact generate-plan response shape: each topic sent once, days referencing topics by id
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional, Tuple
+
+# Day activity field -> topic field it is copied from; omitted from a compact day when equal
+DAY_TOPIC_FIELDS = {
+    "activity": "Activity 1",
+    "duration": "Estimated Time",
+    "topic": "Topic",
+    "niche": "Niche",
+    "objective": "Objective",
+    "age_appropriate": "Age"
+}
+
+# Agent timing and llm_integration entries holding full LLM prompts and responses
+LLM_TEXT_SUFFIXES = ("_prompt", "_response")
+
+# Per-agent copies folded into the top-level agent_timings / llm_integration
+DUPLICATE_DATA_KEYS = ("agent_timing", "llm_integration")
+
+def _topic_key(topic: Mapping, position: int) -> str:
+    topic_id = getattr(topic, "id", None)
+    return str(topic_id) if topic_id is not None else f"m{position}"
+
+def compact_day(day: Any, topics_by_name: Dict[Tuple[Any, Any], Tuple[str, Mapping]]) -> Any:
+    """A day referencing its topic by id, keeping only fields that differ from the topic's."""
+    if not isinstance(day, dict):
+        return day
+    match = topics_by_name.get((day.get("topic"), day.get("niche")))
+    if match is None:
+        # Practice days and anything not built from a matched topic stay inline
+        return day
+    key, topic = match
+    compact = {"topic_id": key}
+    for field, value in day.items():
+        topic_field = DAY_TOPIC_FIELDS.get(field)
+        if topic_field is None or topic.get(topic_field) != value:
+            compact[field] = value
+    return compact
+
+def strip_llm_text(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop LLM prompt and response text, keeping flags and token counts."""
+    return {key: value for key, value in values.items() if not key.endswith(LLM_TEXT_SUFFIXES)}
+
+def compact_plan_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact form of the reviewer result (the "data" of a plan response).
+
+    matched_topics becomes a "topics" dictionary keyed by catalog topic id
+    plus the ordered "matched_topic_ids"; each weekly_plan day built from a
+    matched topic becomes {"topic_id": ..., <fields that differ>}. A client
+    restores a day by copying day_topic_fields[field] from the topic for
+    every field the day lacks.
+    """
+    matched_topics: List[Mapping] = data.get("matched_topics", [])
+    topics: Dict[str, Dict[str, Any]] = {}
+    matched_ids: List[str] = []
+    topics_by_name: Dict[Tuple[Any, Any], Tuple[str, Mapping]] = {}
+    for position, topic in enumerate(matched_topics):
+        key = _topic_key(topic, position)
+        matched_ids.append(key)
+        if key not in topics:
+            topics[key] = topic.to_dict() if hasattr(topic, "to_dict") else dict(topic)
+        topics_by_name.setdefault((topic.get("Topic"), topic.get("Niche")), (key, topic))
+
+    weekly_plan = {
+        week: {day_name: compact_day(day, topics_by_name) for day_name, day in days.items()}
+        if isinstance(days, dict) else days
+        for week, days in data.get("weekly_plan", {}).items()
+    }
+
+    compact = {
+        key: value for key, value in data.items()
+        if key not in ("matched_topics", "weekly_plan") and key not in DUPLICATE_DATA_KEYS
+    }
+    compact.update({
+        "topics": topics,
+        "matched_topic_ids": matched_ids,
+        "weekly_plan": weekly_plan,
+        "day_topic_fields": DAY_TOPIC_FIELDS
+    })
+    return compact
+
+def compact_agent_timings(agent_timings: Dict[str, Any]) -> Dict[str, Any]:
+    return {agent: strip_llm_text(timing) if isinstance(timing, dict) else timing
+            for agent, timing in agent_timings.items()}
+
+def is_compact_requested(value: Optional[str]) -> bool:
+    """True for ?compact=1 (also true/yes)."""
+    return (value or "").strip().lower() in ("1", "true", "yes")
@@ -6,10 +6,10 @@ Manages AI-generated learning plans, customization, and progress tracking
 
 import json
 import os
+from collections.abc import Mapping
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Iterable, Optional, Sequence, Set
 import logging
-from copy import deepcopy
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -34,6 +34,13 @@ class PlanManager:
             "activity_addition": "Add new activities",
             "activity_removal": "Remove activities"
         }
+        
+        # Incremental edits (edit_plan): replacements drawn from the profile's match pool
+        self.edit_types = {
+            "replace_day": "Swap one day's topic",
+            "replace_week": "Swap every topic in a week",
+            "replace_difficulty_band": "Swap topics in an age band for topics in another band"
+        }
     
     def create_ai_plan(self, child_id: str, ai_generated_plan: Dict[str, Any], 
                        child_profile: Dict[str, Any]) -> Dict[str, Any]:
@@ -98,6 +105,7 @@ class PlanManager:
         
         # Initialize progress tracking
         plan["progress"] = self._initialize_progress_tracking(plan)
+        plan["quality_index"] = self._build_quality_index(plan)
         
         return plan
     
@@ -128,30 +136,185 @@ class PlanManager:
             # Initialize topic progress
             topics = week_data.get("topics", [])
             for topic in topics:
-                topic_id = topic.get("topic_id", f"topic_{topic.get('Topic', '').replace(' ', '_')}")
-                progress["topic_progress"][topic_id] = {
-                    "status": "not_started",
-                    "started_at": None,
-                    "completed_at": None,
-                    "time_spent": 0,
-                    "activities_completed": [],
-                    "parent_rating": None,
-                    "child_engagement": None,
-                    "notes": ""
-                }
+                progress["topic_progress"][self._topic_id(topic)] = self._new_topic_progress()
         
         return progress
     
+    @staticmethod
+    def _topic_id(topic: Mapping) -> str:
+        return topic.get("topic_id") or f"topic_{str(topic.get('Topic', '')).replace(' ', '_')}"
+    
+    @staticmethod
+    def _new_topic_progress() -> Dict[str, Any]:
+        return {
+            "status": "not_started",
+            "started_at": None,
+            "completed_at": None,
+            "time_spent": 0,
+            "activities_completed": [],
+            "parent_rating": None,
+            "child_engagement": None,
+            "notes": ""
+        }
+    
+    @staticmethod
+    def validate_plan(plan: Any):
+        """Check that a client-supplied plan has the structure edits rely on; raises ValueError."""
+        if not isinstance(plan, dict):
+            raise ValueError("plan must be an object")
+        version = plan.get("version")
+        if not isinstance(version, int) or isinstance(version, bool):
+            raise ValueError("plan.version must be an integer")
+        weekly_plans = plan.get("weekly_plans")
+        if not isinstance(weekly_plans, dict):
+            raise ValueError("plan.weekly_plans must be an object")
+        for week_key, week_data in weekly_plans.items():
+            if not isinstance(week_data, dict):
+                raise ValueError(f"plan.weekly_plans.{week_key} must be an object")
+            topics = week_data.get("topics", [])
+            if not isinstance(topics, list):
+                raise ValueError(f"plan.weekly_plans.{week_key}.topics must be a list")
+            for position, topic in enumerate(topics):
+                if not isinstance(topic, Mapping):
+                    raise ValueError(f"plan.weekly_plans.{week_key}.topics[{position}] must be an object")
+        profile = plan.get("child_profile")
+        if profile is not None and not isinstance(profile, dict):
+            raise ValueError("plan.child_profile must be an object")
+    
+    @staticmethod
+    def is_generated_plan(plan: Any) -> bool:
+        """True for generate-plan data ({"weekly_plan": {week: {day name: activity}}, ...})."""
+        return isinstance(plan, dict) and "weekly_plan" in plan and "weekly_plans" not in plan
+    
+    def from_generated_plan(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """PlanManager plan (version 1) for generate-plan data; raises ValueError for a malformed plan.
+        
+        Each week's days become its topics in day order, so day_index counts
+        from the week's first day; the day names are kept in the week's
+        "days". A day's topic is its matched topic record (full or compact
+        response), else rebuilt from the day's own fields.
+        """
+        weekly_plan = data.get("weekly_plan")
+        if not isinstance(weekly_plan, dict):
+            raise ValueError("plan.weekly_plan must be an object")
+        profile = data.get("profile_analysis") or data.get("child_profile") or {}
+        if not isinstance(profile, dict):
+            raise ValueError("plan.profile_analysis must be an object")
+        
+        records: Dict[Any, Mapping] = {}
+        for topic in data.get("matched_topics") or []:
+            if isinstance(topic, Mapping):
+                records.setdefault((topic.get("Topic"), topic.get("Niche")), topic)
+        compact_topics = data.get("topics") if isinstance(data.get("topics"), dict) else {}
+        
+        weekly_plans = {}
+        for week_key, days in weekly_plan.items():
+            if not isinstance(days, dict):
+                raise ValueError(f"plan.weekly_plan.{week_key} must be an object")
+            topics = []
+            for day_name, day in days.items():
+                if not isinstance(day, dict):
+                    raise ValueError(f"plan.weekly_plan.{week_key}.{day_name} must be an object")
+                topic = compact_topics.get(day.get("topic_id")) or records.get((day.get("topic"), day.get("niche")))
+                if not isinstance(topic, Mapping):
+                    topic = {"Topic": day.get("topic", ""), "Niche": day.get("niche", "General"),
+                             "Objective": day.get("objective", ""), "Age": day.get("age_appropriate"),
+                             "Estimated Time": day.get("duration"), "Activity 1": day.get("activity", "")}
+                topic = dict(topic)
+                topic["topic_id"] = self._topic_id(topic)
+                topics.append(topic)
+            weekly_plans[week_key] = {"topics": topics, "days": list(days)}
+        
+        total_topics = sum(len(week_data["topics"]) for week_data in weekly_plans.values())
+        plan = self.create_ai_plan(str(profile.get("child_name", "child")), {
+            "weekly_plans": weekly_plans,
+            "total_weeks": len(weekly_plans),
+            "topics_per_week": max((len(week_data["topics"]) for week_data in weekly_plans.values()), default=0),
+            "total_topics": total_topics
+        }, profile)
+        # The weeks already live in plan["weekly_plans"]
+        plan["ai_generated_plan"] = {key: value for key, value in plan["ai_generated_plan"].items() if key != "weekly_plans"}
+        return plan
+    
+    def apply_to_generated_plan(self, data: Dict[str, Any], edited: Dict[str, Any],
+                                make_day: Callable[[Mapping], Dict[str, Any]]) -> Dict[str, Any]:
+        """generate-plan data with the last edit's replacements; make_day builds a day from a topic.
+        
+        Only the replaced days (and their weeks) are new; the rest is shared
+        with data. Review insights and analysis are carried over as they are:
+        a swap keeps the plan's weeks and topic count, which is all they
+        depend on, and the plan-dependent measures live in the edited plan's
+        quality_metrics.
+        """
+        weekly_plan = dict(data["weekly_plan"])
+        copied: Set[str] = set()
+        for replacement in edited["modification_history"][-1]["details"]["replacements"]:
+            week_key, position = replacement["week_key"], replacement["day_index"]
+            week_data = edited["weekly_plans"][week_key]
+            if week_key not in copied:
+                weekly_plan[week_key] = dict(weekly_plan[week_key])
+                copied.add(week_key)
+            weekly_plan[week_key][week_data["days"][position]] = make_day(week_data["topics"][position])
+        return {**data, "weekly_plan": weekly_plan}
+    
+    @staticmethod
+    def _valid_quality_index(quality_index: Any) -> bool:
+        if not isinstance(quality_index, dict) or "child_age" not in quality_index:
+            return False
+        weeks = quality_index.get("weeks")
+        if not isinstance(weeks, dict):
+            return False
+        for stats in weeks.values():
+            if not isinstance(stats, dict) or not isinstance(stats.get("niches"), dict):
+                return False
+            if not all(isinstance(stats.get(key), (int, float)) for key in ("topics", "age_total", "age_counted", "age_fit")):
+                return False
+        return True
+    
+    def _fork(self, plan: Dict[str, Any], week_keys: Iterable[str] = ()) -> Dict[str, Any]:
+        """Next version of a plan, copying only what an edit of week_keys can change.
+        
+        The weeks being edited, their topic lists, topic progress, history and
+        quality index are copied; everything else is shared with the previous
+        version, so plans must be treated as immutable once handed out.
+        Progress or a quality index that is missing or malformed (plans come
+        back from clients) is rebuilt from the weeks instead.
+        """
+        forked = dict(plan)
+        forked["weekly_plans"] = dict(plan.get("weekly_plans", {}))
+        for week_key in week_keys:
+            week_data = dict(forked["weekly_plans"][week_key])
+            week_data["topics"] = list(week_data.get("topics", []))
+            forked["weekly_plans"][week_key] = week_data
+        
+        progress = plan.get("progress")
+        if isinstance(progress, dict) and isinstance(progress.get("topic_progress"), dict):
+            forked["progress"] = dict(progress)
+            forked["progress"]["topic_progress"] = dict(progress["topic_progress"])
+        else:
+            forked["progress"] = self._initialize_progress_tracking(plan)
+        forked["modification_history"] = list(plan.get("modification_history") or [])
+        forked["customizations"] = list(plan.get("customizations") or [])
+        
+        quality_index = plan.get("quality_index")
+        if not self._valid_quality_index(quality_index):
+            quality_index = self._build_quality_index(plan)
+        forked["quality_index"] = {**quality_index, "weeks": dict(quality_index["weeks"])}
+        for week_key in week_keys:
+            week_stats = forked["quality_index"]["weeks"].get(week_key) or self._empty_week_stats()
+            forked["quality_index"]["weeks"][week_key] = {**week_stats, "niches": dict(week_stats["niches"])}
+        
+        forked["version"] = plan["version"] + 1
+        forked["last_modified"] = datetime.now().isoformat()
+        forked["status"] = "draft"  # Reset to draft for review
+        return forked
+    
     def customize_plan(self, plan: Dict[str, Any], customization: Dict[str, Any]) -> Dict[str, Any]:
         """Apply customization to a learning plan."""
-        # Create new version
-        new_version = plan["version"] + 1
-        customized_plan = deepcopy(plan)
-        
-        # Update version info
-        customized_plan["version"] = new_version
-        customized_plan["last_modified"] = datetime.now().isoformat()
-        customized_plan["status"] = "draft"  # Reset to draft for review
+        # Create new version, copying only the parts this customization touches
+        week_key = customization.get("week_key")
+        touched_weeks = [week_key] if customization.get("type") == "topic_replacement" and week_key in plan["weekly_plans"] else []
+        customized_plan = self._fork(plan, touched_weeks)
         
         # Apply customization
         modification = {
@@ -192,6 +355,7 @@ class PlanManager:
             for i, topic in enumerate(topics):
                 if topic.get("Topic") == old_topic:
                     topics[i] = new_topic
+                    self._update_week_stats(plan, week_key, removed=[topic], added=[new_topic])
                     
                     # Update progress tracking
                     old_topic_id = f"topic_{old_topic.replace(' ', '_')}"
@@ -239,7 +403,7 @@ class PlanManager:
         
         # Update child profile
         if "child_profile" in plan:
-            plan["child_profile"]["preferred_learning_style"] = new_learning_style
+            plan["child_profile"] = {**plan["child_profile"], "preferred_learning_style": new_learning_style}
         
         # Adjust activities based on new learning style
         # This would integrate with your activity database
@@ -248,19 +412,211 @@ class PlanManager:
         return plan
     
     def _recalculate_quality_metrics(self, plan: Dict[str, Any]) -> Dict[str, Any]:
-        """Recalculate quality metrics after customization."""
-        # This would implement complex quality assessment logic
-        # For now, return basic metrics
+        """Recalculate quality metrics after customization.
+        
+        Works from the per-week aggregates in plan["quality_index"], which
+        edits keep up to date, so the cost is per week rather than per topic.
+        """
+        quality_index = plan.get("quality_index") or self._build_quality_index(plan)
+        weeks = quality_index["weeks"]
+        
+        age_counted = sum(stats["age_counted"] for stats in weeks.values())
+        age_fit = sum(stats["age_fit"] for stats in weeks.values())
+        fit_ratio = age_fit / age_counted if age_counted else 1.0
+        niches: Set[str] = set()
+        for stats in weeks.values():
+            niches.update(niche for niche, count in stats["niches"].items() if count)
+        
+        # Weeks should not get easier as the plan goes on
+        week_ages = [stats["age_total"] / stats["age_counted"] for stats in weeks.values() if stats["age_counted"]]
+        progressive = all(earlier <= later for earlier, later in zip(week_ages, week_ages[1:]))
+        
         return {
             "prerequisites_checked": True,
-            "difficulty_progression": "optimal",
-            "age_appropriateness": "perfect",
+            "difficulty_progression": "optimal" if progressive else "uneven",
+            "age_appropriateness": "perfect" if fit_ratio == 1.0 else "good" if fit_ratio >= 0.8 else "needs_review",
+            "age_fit_ratio": round(fit_ratio, 3),
+            "niche_diversity": len(niches),
             "learning_stage_alignment": "excellent",
             "content_richness_score": 8.0,
             "ai_confidence_score": 0.90,
-            "customization_impact": "minimal"
+            "customization_impact": "minimal" if len(plan.get("modification_history", [])) <= 3 else "moderate",
+            "weekly_quality": {week_key: self._week_quality(stats) for week_key, stats in weeks.items()}
+        }
+    
+    @staticmethod
+    def _child_age(plan: Dict[str, Any]) -> Optional[float]:
+        profile = plan.get("child_profile") or {}
+        age = profile.get("child_age", profile.get("age"))
+        try:
+            return float(age)
+        except (TypeError, ValueError):
+            return None
+    
+    @staticmethod
+    def _topic_age_range(topic: Mapping) -> Optional[tuple]:
+        age_min, age_max = topic.get("age_min"), topic.get("age_max")
+        if not isinstance(age_min, (int, float)) or not isinstance(age_max, (int, float)):
+            age = topic.get("Age")
+            if not isinstance(age, (int, float)):
+                return None
+            age_min = age_max = age
+        return (age_min, age_max)
+    
+    @staticmethod
+    def _empty_week_stats() -> Dict[str, Any]:
+        return {"topics": 0, "age_total": 0.0, "age_counted": 0, "age_fit": 0, "niches": {}}
+    
+    def _add_topic_stats(self, stats: Dict[str, Any], topic: Mapping, child_age: Optional[float], sign: int):
+        """Add (sign=1) or remove (sign=-1) one topic's contribution to a week's aggregates."""
+        stats["topics"] += sign
+        niche = str(topic.get("Niche", "General"))
+        stats["niches"][niche] = stats["niches"].get(niche, 0) + sign
+        if not stats["niches"][niche]:
+            del stats["niches"][niche]
+        age_range = self._topic_age_range(topic)
+        if age_range is not None:
+            stats["age_total"] += sign * (age_range[0] + age_range[1]) / 2
+            stats["age_counted"] += sign
+            # Same window as the match agent: within 2 years of the child's age
+            if child_age is None or (age_range[0] <= child_age + 2 and age_range[1] >= child_age - 2):
+                stats["age_fit"] += sign
+    
+    def _build_quality_index(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-week aggregates behind the quality metrics, built with one full scan."""
+        child_age = self._child_age(plan)
+        weeks = {}
+        for week_key, week_data in plan.get("weekly_plans", {}).items():
+            stats = self._empty_week_stats()
+            for topic in week_data.get("topics", []):
+                self._add_topic_stats(stats, topic, child_age, 1)
+            weeks[week_key] = stats
+        return {"child_age": child_age, "weeks": weeks}
+    
+    def _update_week_stats(self, plan: Dict[str, Any], week_key: str, removed: Sequence[Mapping], added: Sequence[Mapping]):
+        """Apply a replacement to one week's aggregates (the week must already be forked)."""
+        quality_index = plan["quality_index"]
+        stats = quality_index["weeks"].setdefault(week_key, self._empty_week_stats())
+        for topic in removed:
+            self._add_topic_stats(stats, topic, quality_index["child_age"], -1)
+        for topic in added:
+            self._add_topic_stats(stats, topic, quality_index["child_age"], 1)
+    
+    @staticmethod
+    def _week_quality(stats: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "topics": stats["topics"],
+            "average_topic_age": round(stats["age_total"] / stats["age_counted"], 2) if stats["age_counted"] else None,
+            "age_fit_ratio": round(stats["age_fit"] / stats["age_counted"], 3) if stats["age_counted"] else 1.0,
+            "niches": len(stats["niches"])
         }
     
+    def edit_plan(self, plan: Dict[str, Any], edit: Dict[str, Any], candidates: Sequence[Mapping]) -> Dict[str, Any]:
+        """Apply an incremental edit and return the next plan version.
+        
+        Unlike customize_plan's full regeneration path, only the edited weeks,
+        topic progress entries and quality aggregates are copied and updated.
+        Edit types (see edit_types):
+        - replace_day: {"week_key", "day_index"} - one topic
+        - replace_week: {"week_key"} - every topic in the week
+        - replace_difficulty_band: {"age_min", "age_max", "target_age_min",
+          "target_age_max", "week_keys" (optional)} - topics overlapping the
+          band, replaced by topics overlapping the target band
+        Replacements come from candidates (the profile's match pool, best
+        first), skipping topics already in the plan and preferring the
+        replaced topic's niche. Raises ValueError for an invalid edit or when
+        the pool has no replacement left, and for a plan validate_plan rejects.
+        """
+        self.validate_plan(plan)
+        edit_type = edit.get("type")
+        weekly_plans = plan.get("weekly_plans", {})
+        if edit_type not in self.edit_types:
+            raise ValueError(f"Unknown edit type: {edit_type}")
+        
+        if edit_type == "replace_difficulty_band":
+            try:
+                band = (float(edit["age_min"]), float(edit["age_max"]))
+                target_band = (float(edit["target_age_min"]), float(edit["target_age_max"]))
+            except (KeyError, TypeError, ValueError):
+                raise ValueError("replace_difficulty_band needs numeric age_min, age_max, target_age_min and target_age_max")
+            week_keys = edit.get("week_keys") or list(weekly_plans)
+            positions = {}
+            for week_key in week_keys:
+                if week_key not in weekly_plans:
+                    raise ValueError(f"Unknown week: {week_key}")
+                positions[week_key] = [i for i, topic in enumerate(weekly_plans[week_key].get("topics", []))
+                                       if self._in_band(topic, band)]
+        else:
+            week_key = edit.get("week_key")
+            if week_key not in weekly_plans:
+                raise ValueError(f"Unknown week: {week_key}")
+            topics = weekly_plans[week_key].get("topics", [])
+            if edit_type == "replace_day":
+                day_index = edit.get("day_index")
+                if not isinstance(day_index, int) or not 0 <= day_index < len(topics):
+                    raise ValueError(f"day_index must be between 0 and {len(topics) - 1}")
+                positions = {week_key: [day_index]}
+            else:
+                positions = {week_key: list(range(len(topics)))}
+            target_band = None
+        
+        touched_weeks = [week_key for week_key, week_positions in positions.items() if week_positions]
+        edited = self._fork(plan, touched_weeks)
+        used = {str(topic.get("Topic", "")) for week_data in weekly_plans.values() for topic in week_data.get("topics", [])}
+        replacements = []
+        
+        for week_key in touched_weeks:
+            topics = edited["weekly_plans"][week_key]["topics"]
+            for position in positions[week_key]:
+                old_topic = topics[position]
+                new_topic = self._pick_replacement(old_topic, candidates, used, target_band)
+                if new_topic is None:
+                    raise ValueError("No replacement topics left in the match pool")
+                used.add(new_topic["Topic"])
+                topics[position] = new_topic
+                self._update_week_stats(edited, week_key, removed=[old_topic], added=[new_topic])
+                
+                # Progress restarts for the new topic
+                topic_progress = edited["progress"]["topic_progress"]
+                topic_progress.pop(self._topic_id(old_topic), None)
+                topic_progress[self._topic_id(new_topic)] = self._new_topic_progress()
+                replacements.append({"week_key": week_key, "day_index": position,
+                                     "old_topic": old_topic.get("Topic"), "new_topic": new_topic["Topic"]})
+        
+        edited["modification_history"].append({
+            "modification_id": f"mod_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            "type": edit_type,
+            "description": edit.get("description", self.edit_types[edit_type]),
+            "applied_at": datetime.now().isoformat(),
+            "details": {**edit, "replacements": replacements}
+        })
+        edited["customizations"].append(edit)
+        edited["quality_metrics"] = self._recalculate_quality_metrics(edited)
+        return edited
+    
+    def _in_band(self, topic: Mapping, band: tuple) -> bool:
+        age_range = self._topic_age_range(topic)
+        return age_range is not None and age_range[0] <= band[1] and age_range[1] >= band[0]
+    
+    def _pick_replacement(self, old_topic: Mapping, candidates: Sequence[Mapping], used: Set[str],
+                          band: Optional[tuple]) -> Optional[Dict[str, Any]]:
+        """Best unused candidate, preferring the replaced topic's niche; None when the pool is exhausted."""
+        niche = old_topic.get("Niche")
+        fallback = None
+        for candidate in candidates:
+            if str(candidate.get("Topic", "")) in used or (band is not None and not self._in_band(candidate, band)):
+                continue
+            if candidate.get("Niche") == niche:
+                fallback = candidate
+                break
+            if fallback is None:
+                fallback = candidate
+        if fallback is None:
+            return None
+        new_topic = fallback.to_dict() if hasattr(fallback, "to_dict") else dict(fallback)
+        new_topic["topic_id"] = self._topic_id(new_topic)
+        return new_topic
+    
     def update_plan_progress(self, plan: Dict[str, Any], progress_update: Dict[str, Any]) -> Dict[str, Any]:
         """Update plan progress based on learning session completion."""
         topic_id = progress_update.get("topic_id")
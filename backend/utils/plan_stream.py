@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Plan Stream
+Server-sent events for plan generation, sent as each agent stage completes
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+from utils.response_cache import serialize_json
+
+# Proxies must not buffer or cache the stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+Emit = Callable[[str, Any], None]
+
+def sse_frame(event: str, payload: bytes, event_id: Optional[int] = None) -> bytes:
+    """One SSE frame around an already serialized compact JSON payload (a single line)."""
+    frame = f"event: {event}\ndata: ".encode("utf-8") + payload + b"\n\n"
+    if event_id is not None:
+        frame = f"id: {event_id}\n".encode("utf-8") + frame
+    return frame
+
+def sse_event(event: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    """One SSE frame; data is compact JSON, so it always fits on a single data line."""
+    return sse_frame(event, serialize_json(data), event_id)
+
+def stream_done(payload: bytes, headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """A stream holding only a "done" event with an already serialized result, e.g. a cached plan."""
+    async def generate() -> Iterator[bytes]:
+        yield sse_frame("done", payload, 0)
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers={**SSE_HEADERS, **(headers or {})})
+
+def stream_pipeline(run: Callable[[Emit], Dict[str, Any]], executor: Executor,
+                    done: Callable[[Dict[str, Any]], Any],
+                    headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """Run a blocking pipeline in the executor and stream each emit(event, data) it makes.
+
+    The pipeline's return value is passed to done() and sent as the final
+    "done" event; an exception becomes an "error" event. A client that
+    disconnects stops the stream, but the pipeline finishes in the pool.
+    done() runs on the event loop, so heavy work belongs in run.
+    """
+    async def generate() -> Iterator[bytes]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def emit(event: str, data: Any):
+            loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+
+        future = loop.run_in_executor(executor, run, emit)
+        event_id = 0
+        while True:
+            next_event = asyncio.ensure_future(queue.get())
+            await asyncio.wait({next_event, future}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_event.done():
+                next_event.cancel()
+                break
+            event, data = next_event.result()
+            yield sse_event(event, data, event_id)
+            event_id += 1
+
+        # Emits made just before the pipeline returned
+        while not queue.empty():
+            event, data = queue.get_nowait()
+            yield sse_event(event, data, event_id)
+            event_id += 1
+
+        if future.exception() is not None:
+            yield sse_event("error", {"success": False, "error": str(future.exception()),
+                                      "message": "Failed to generate plan"}, event_id)
+        else:
+            yield sse_event("done", done(future.result()), event_id)
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers={**SSE_HEADERS, **(headers or {})})
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Response Cache
+Serializes and compresses catalog responses once per catalog version, with ETag revalidation
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it responses are offered as gzip or identity only
+    brotli = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Revalidate on every use; the ETag makes that a 304 with no body
+CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+def serialize_json(content: Any) -> bytes:
+    """Serialize exactly as FastAPI's JSONResponse does."""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+class CachedPayload:
+    """One response body in every supported encoding, with its ETags."""
+
+    __slots__ = ("bodies", "etags", "media_type")
+
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        self.media_type = media_type
+        self.bodies: Dict[str, bytes] = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=11)
+        # Strong ETags differ per content encoding, as each is a different byte sequence
+        self.etags: Dict[str, str] = {
+            encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+            for encoding in self.bodies
+        }
+
+    def matches(self, if_none_match: str) -> bool:
+        """Check an If-None-Match header against this payload in any encoding."""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        # If-None-Match uses weak comparison
+        candidates |= {tag[2:] for tag in candidates if tag.startswith("W/")}
+        return any(etag in candidates for etag in self.etags.values())
+
+    def choose_encoding(self, accept_encoding: str) -> str:
+        """Pick the smallest encoding the client accepts."""
+        accepted = _parse_accept_encoding(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.bodies and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+        return "identity"
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        fields = part.strip().split(";")
+        name = fields[0].strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in fields[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+class ResponseCache:
+    """Keeps one CachedPayload per endpoint key for the current catalog version only."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, ...], Tuple[str, CachedPayload]] = {}
+        self.builds = 0
+        self.hits = 0
+        self.not_modified = 0
+
+    def get(self, key: Tuple[str, ...], version: str, build: Callable[[], Any]) -> CachedPayload:
+        """Return the payload for key at this version, building it on first use."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            payload = CachedPayload(serialize_json(build()))
+            self._entries[key] = (version, payload)
+            self.builds += 1
+            logger.info(f"✅ Cached response {'/'.join(key)} for catalog {version} "
+                        f"({', '.join(f'{enc}={len(body)}B' for enc, body in payload.bodies.items())})")
+            return payload
+
+    def respond(self, request: Request, key: Tuple[str, ...], version: str, build: Callable[[], Any]) -> Response:
+        """Serve a cached payload, answering a matching If-None-Match with 304."""
+        payload = self.get(key, version, build)
+        encoding = payload.choose_encoding(request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": payload.etags[encoding],
+            "Cache-Control": CACHE_CONTROL,
+            "Vary": "Accept-Encoding"
+        }
+        if payload.matches(request.headers.get("if-none-match", "")):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=payload.bodies[encoding], media_type=payload.media_type, headers=headers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "builds": self.builds,
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+            "brotli_available": brotli is not None
+        }
+
+_response_cache = ResponseCache()
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache."""
+    return _response_cache
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Schedule Allocator
+One-pass, constraint-based assignment of matched topics to plan weeks and days
+"""
+
+import heapq
+import math
+from collections import deque
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from utils.age_utils import parse_age_bounds
+
+DAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+# Session length in minutes for a profile's attention_span label
+ATTENTION_SPAN_MINUTES = {"short": 15, "medium": 30, "long": 45}
+
+# Session length when no attention span is known, by the child's age (upper bound inclusive)
+AGE_SESSION_MINUTES = ((5, 20), (8, 30), (200, 45))
+
+# Week-over-week session growth: introductions stay short, project work runs longest
+WEEK_INTENSITY = (1.0, 1.25, 1.25, 1.5)
+
+MIN_SESSION_MINUTES = 10
+MAX_SESSION_MINUTES = 60
+
+# Default cap on one niche's days within a week, as a share of the week
+MAX_NICHE_SHARE_PER_WEEK = 0.5
+
+def topic_key(topic: Mapping, niche: Any = None) -> Tuple[Any, ...]:
+    """Identity used for the no-repeat constraint: the catalog id when the topic has one.
+
+    niche, when the caller has already read it, saves reading it again.
+    """
+    topic_id = getattr(topic, "id", None)
+    if topic_id is not None:
+        return ("id", topic_id)
+    name = topic.get("Topic")
+    return (name if name is not None else topic.get("topic"), _niche(topic) if niche is None else niche)
+
+def _niche(topic: Mapping) -> Any:
+    niche = topic.get("Niche")
+    return niche if niche is not None else topic.get("niche", "General")
+
+@lru_cache(maxsize=256)
+def _age_field_bounds(age: Any) -> Tuple[float, float]:
+    age_min, age_max = parse_age_bounds(age)
+    return (math.inf, math.inf) if age_min is None else (age_min, age_max)
+
+def _difficulty(topic: Mapping) -> Tuple[float, float]:
+    """(age_min, age_max) of a topic: the normalized bounds when present, else its Age field; unknown sorts last."""
+    age_min = topic.get("age_min")
+    if isinstance(age_min, (int, float)):
+        age_max = topic.get("age_max")
+        return age_min, age_max if isinstance(age_max, (int, float)) else age_min
+    # Match agent output only carries the Age text ("5-7", "6 and 7"); the few distinct values are cached
+    age = topic.get("Age", topic.get("age"))
+    if isinstance(age, (str, int)) and not isinstance(age, bool):
+        return _age_field_bounds(age)
+    return math.inf, math.inf
+
+def interest_week_niches(topics: Iterable[Mapping], niche_affinity: Dict[str, float],
+                         weeks: int = 4) -> Optional[List[Set[Any]]]:
+    """Week themes from a child's interests: the matched topics' niches that the interests
+    reach (niche_affinity keys are lower-case catalog niches), strongest first, one per
+    week in rotation. None when no matched niche is related to the interests.
+    """
+    niches: Dict[Any, float] = {}
+    for topic in topics:
+        niche = _niche(topic)
+        if niche not in niches:
+            niches[niche] = niche_affinity.get(str(niche).lower(), 0.0)
+    themes = sorted((niche for niche, weight in niches.items() if weight > 0), key=lambda niche: -niches[niche])
+    if not themes:
+        return None
+    return [{themes[week % len(themes)]} for week in range(weeks)]
+
+def session_minutes(attention_span: Any = None, child_age: Optional[int] = None) -> int:
+    """Base session length from the profile's attention span.
+
+    Accepts the ProfileAgent estimate (a dict with recommended_session_length),
+    a short/medium/long label or minutes; falls back to the child's age.
+    """
+    minutes = None
+    if isinstance(attention_span, Mapping):
+        minutes = attention_span.get("recommended_session_length", attention_span.get("adjusted_span_minutes"))
+    elif isinstance(attention_span, str):
+        minutes = ATTENTION_SPAN_MINUTES.get(attention_span.strip().lower())
+    elif isinstance(attention_span, (int, float)) and not isinstance(attention_span, bool):
+        minutes = attention_span
+    if not isinstance(minutes, (int, float)) or minutes <= 0:
+        age = child_age if isinstance(child_age, (int, float)) else 7
+        minutes = next(session for max_age, session in AGE_SESSION_MINUTES if age <= max_age)
+    return int(minutes)
+
+def week_minutes(base_minutes: int, week_index: int) -> int:
+    """Session length for a week, rounded to 5 minutes and clamped."""
+    intensity = WEEK_INTENSITY[min(week_index, len(WEEK_INTENSITY) - 1)]
+    minutes = 5 * round(base_minutes * intensity / 5)
+    return max(MIN_SESSION_MINUTES, min(MAX_SESSION_MINUTES, minutes))
+
+class ScheduleSlot:
+    """One day of the plan and the topic assigned to it."""
+
+    __slots__ = ("week", "day", "topic", "repeat", "duration_minutes")
+
+    def __init__(self, week: int, day: int, topic: Mapping, repeat: bool, duration_minutes: int):
+        self.week = week
+        self.day = day
+        self.topic = topic
+        self.repeat = repeat
+        self.duration_minutes = duration_minutes
+
+    @property
+    def day_name(self) -> str:
+        return DAY_NAMES[self.day % len(DAY_NAMES)]
+
+class ScheduleAllocation:
+    """Result of allocate_schedule: slots in week/day order plus constraint statistics."""
+
+    def __init__(self, slots: List[ScheduleSlot], weeks: int, days_per_week: int, stats: Dict[str, Any]):
+        self.slots = slots
+        self.weeks = weeks
+        self.days_per_week = days_per_week
+        self.stats = stats
+
+    def by_week(self) -> Iterator[Tuple[int, List[ScheduleSlot]]]:
+        """(week index, that week's slots) for each week, in order."""
+        for week in range(self.weeks):
+            yield week, self.slots[week * self.days_per_week:(week + 1) * self.days_per_week]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+def allocate_schedule(topics: Sequence[Mapping], weeks: int = 4, days_per_week: int = 7,
+                      week_niches: Optional[Sequence[Set[str]]] = None, max_niche_per_week: Optional[int] = None,
+                      attention_span: Any = None, child_age: Optional[int] = None) -> ScheduleAllocation:
+    """Assign topics to weeks × days in one pass.
+
+    Constraints, in priority order:
+    - no repeats: each distinct topic (by catalog id) appears at most once
+      until every distinct topic has been used; any remaining slots are
+      explicit review repeats (slot.repeat), never silent duplicates. A
+      review only revisits a topic introduced in an earlier week, least
+      recently shown first, so repeats are a full cycle apart. The first
+      week therefore takes a full week of new topics and the rest are
+      split evenly over the later weeks; a plan with fewer topics than
+      days can only review within its first week;
+    - per-week theme: a week listed in week_niches first takes its niches'
+      topics; otherwise weeks progress from the easiest topics (lowest age
+      range) to the most advanced, so the project week gets the hardest;
+    - niche spread: at most max_niche_per_week days per niche in a week
+      (default half the week), relaxed only when nothing else is left,
+      and days within a week interleave niches;
+    - durations: session length from the attention span (session_minutes),
+      growing over the weeks (WEEK_INTENSITY).
+
+    Topics are taken in match order, so when there are more than enough the
+    best-matched ones are used. Runs in O(n log n) for n topics.
+    """
+    total_slots = weeks * days_per_week
+    cap = max_niche_per_week or max(1, math.ceil(days_per_week * MAX_NICHE_SHARE_PER_WEEK))
+
+    # Distinct topics in match order, best first; stop once every slot has one
+    # Each topic's fields are read once here; everything below works on positions in chosen
+    seen: Set[Tuple[Any, ...]] = set()
+    chosen: List[Mapping] = []
+    niches: List[Any] = []
+    for topic in topics:
+        niche = _niche(topic)
+        key = topic_key(topic, niche)
+        if key not in seen:
+            seen.add(key)
+            chosen.append(topic)
+            niches.append(niche)
+            if len(chosen) == total_slots:
+                break
+    difficulty = [_difficulty(topic) for topic in chosen]
+
+    # Easiest first; match rank breaks ties so the order is deterministic (sorted is stable)
+    pending = deque(sorted(range(len(chosen)), key=difficulty.__getitem__))
+
+    # New topics per week: the first week has nothing to review yet, so it takes a full week;
+    # the rest are split evenly over the later weeks (earlier weeks take the remainder)
+    quotas = [min(days_per_week, len(chosen))] + [0] * (weeks - 1)
+    if weeks > 1:
+        base, extra = divmod(len(chosen) - quotas[0], weeks - 1)
+        quotas[1:] = [base + (1 if week < extra else 0) for week in range(weeks - 1)]
+
+    # Themed weeks claim their niches' topics before the difficulty fill
+    themed: List[List[int]] = [[] for _ in range(weeks)]
+    if week_niches:
+        claimed: Set[int] = set()
+        for week in range(min(weeks, len(week_niches))):
+            wanted = week_niches[week] or set()
+            counts: Dict[Any, int] = {}
+            open_niches = len(wanted)
+            for position in pending:
+                if len(themed[week]) >= quotas[week] or not open_niches:
+                    break
+                niche = niches[position]
+                if position not in claimed and niche in wanted and counts.get(niche, 0) < cap:
+                    themed[week].append(position)
+                    claimed.add(position)
+                    counts[niche] = counts.get(niche, 0) + 1
+                    if counts[niche] == cap:
+                        # Every theme niche at its cap: nothing further in pending can be claimed
+                        open_niches -= 1
+        pending = deque(position for position in pending if position not in claimed)
+
+    week_positions: List[List[int]] = []
+    relaxed = 0
+    for week in range(weeks):
+        assigned = list(themed[week])
+        counts = {}
+        for position in assigned:
+            counts[niches[position]] = counts.get(niches[position], 0) + 1
+
+        skipped: deque = deque()
+        while pending and len(assigned) < quotas[week]:
+            position = pending.popleft()
+            niche = niches[position]
+            if counts.get(niche, 0) >= cap:
+                skipped.append(position)
+                continue
+            assigned.append(position)
+            counts[niche] = counts.get(niche, 0) + 1
+        # Only capped niches are left: relax the cap rather than leave days empty
+        while skipped and len(assigned) < quotas[week]:
+            assigned.append(skipped.popleft())
+            relaxed += 1
+        # Topics skipped for the cap go first in the next week
+        pending.extendleft(reversed(skipped))
+        week_positions.append(_interleave_niches(assigned, niches))
+
+    # Remaining slots become explicit review repeats of earlier weeks' topics, least recently shown first;
+    # the heap holds (slot index last shown, position)
+    base_minutes = session_minutes(attention_span, child_age)
+    slots: List[ScheduleSlot] = []
+    reviewable: List[Tuple[int, int]] = []
+    queued: Set[int] = set()
+    repeats = 0
+    for week in range(weeks):
+        minutes = week_minutes(base_minutes, week)
+        days = week_positions[week]
+        if week:
+            for day, position in enumerate(week_positions[week - 1]):
+                if position not in queued:
+                    queued.add(position)
+                    heapq.heappush(reviewable, ((week - 1) * days_per_week + day, position))
+        for day in range(days_per_week):
+            if day < len(days):
+                slots.append(ScheduleSlot(week, day, chosen[days[day]], False, minutes))
+                continue
+            if not reviewable and not week:
+                # Fewer topics than days: the first week reviews its own, once all are introduced
+                reviewable = [(shown, position) for shown, position in enumerate(days)]
+                queued.update(days)
+            if reviewable:
+                _, position = heapq.heappop(reviewable)
+                heapq.heappush(reviewable, (week * days_per_week + day, position))
+                repeats += 1
+                slots.append(ScheduleSlot(week, day, chosen[position], True, minutes))
+
+    stats = {
+        "slots": total_slots,
+        "filled_slots": len(slots),
+        "topics_used": len(chosen),
+        "review_repeats": repeats,
+        "niche_cap": cap,
+        "niche_cap_relaxed": relaxed,
+        "base_session_minutes": base_minutes
+    }
+    return ScheduleAllocation(slots, weeks, days_per_week, stats)
+
+def _interleave_niches(positions: List[int], niches: List[Any]) -> List[int]:
+    """Order a week's topics so consecutive days differ in niche where possible.
+
+    Round-robin over niches, largest group first, keeping each niche's
+    topics in their given (difficulty) order.
+    """
+    groups: Dict[Any, deque] = {}
+    for position in positions:
+        groups.setdefault(niches[position], deque()).append(position)
+    queues = sorted(groups.values(), key=len, reverse=True)
+    ordered: List[int] = []
+    while queues:
+        for queue in queues:
+            ordered.append(queue.popleft())
+        queues = [queue for queue in queues if queue]
+    return ordered
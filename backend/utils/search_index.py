@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Search Index
+BM25 full-text search over catalog topics and essential-growth activities
+"""
+
+import heapq
+import math
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.essential_growth_index import EssentialGrowthIndex
+from utils.topic_index import tokenize
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Field weights: a term in a title counts as much as three in body text
+TOPIC_FIELDS = (("Topic", 3), ("Hashtags", 2), ("Objective", 1), ("Explanation", 1), ("Activity 1", 1), ("Activity 2", 1))
+STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "into", "is", "it", "its",
+    "of", "on", "or", "that", "the", "their", "them", "they", "this", "to", "with", "you", "your"
+))
+
+def normalize_token(token: str) -> str:
+    """Fold simple plurals so "rockets" finds "rocket"."""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        if token.endswith("ies") and len(token) > 4:
+            return token[:-3] + "y"
+        return token[:-1]
+    return token
+
+def analyze(text: Any) -> List[str]:
+    return [normalize_token(token) for token in tokenize(text) if token not in STOPWORDS]
+
+class SearchIndex:
+    """Inverted index with BM25 term weights precomputed per posting.
+
+    Documents are catalog topics ("topic", topic id) and essential-growth
+    activities ("activity", activity id). Because document lengths are fixed
+    per catalog version, each posting stores its full BM25 contribution and a
+    query only sums postings of its terms and keeps the top k.
+    """
+
+    def __init__(self, topics: Sequence[Any], essential_growth_index: Optional[EssentialGrowthIndex] = None):
+        self.docs: List[Tuple[str, Any]] = []
+        term_freqs: List[Dict[str, int]] = []
+        lengths: List[int] = []
+
+        for topic_id, topic in enumerate(topics):
+            self._add(("topic", topic_id), [(topic.get(field, ""), weight) for field, weight in TOPIC_FIELDS],
+                      term_freqs, lengths)
+
+        if essential_growth_index is not None:
+            for activity_id, activity in essential_growth_index.activities.items():
+                details = activity.get("activity", {})
+                fields = [
+                    (activity.get("topic", ""), 3),
+                    (details.get("name", ""), 3),
+                    (activity.get("hashtags", []), 2),
+                    (activity.get("category", ""), 2),
+                    (activity.get("objective", ""), 1),
+                    (activity.get("explanation", ""), 1),
+                    (details.get("steps", []), 1),
+                    (details.get("materials", []), 1),
+                ]
+                self._add(("activity", activity_id), fields, term_freqs, lengths)
+
+        self.size = len(self.docs)
+        avg_length = (sum(lengths) / self.size) if self.size else 0.0
+
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for doc, freqs in enumerate(term_freqs):
+            norm = K1 * (1 - B + B * lengths[doc] / avg_length) if avg_length else K1
+            for term, tf in freqs.items():
+                postings.setdefault(term, []).append((doc, tf * (K1 + 1) / (tf + norm)))
+
+        # Fold idf into the stored weights
+        self.postings: Dict[str, Tuple[Tuple[int, float], ...]] = {}
+        for term, entries in postings.items():
+            idf = math.log(1 + (self.size - len(entries) + 0.5) / (len(entries) + 0.5))
+            self.postings[term] = tuple((doc, weight * idf) for doc, weight in entries)
+
+    def _add(self, doc_key: Tuple[str, Any], fields: List[Tuple[Any, int]],
+             term_freqs: List[Dict[str, int]], lengths: List[int]):
+        freqs: Dict[str, int] = {}
+        length = 0
+        for text, weight in fields:
+            for term in analyze(text):
+                freqs[term] = freqs.get(term, 0) + weight
+                length += weight
+        self.docs.append(doc_key)
+        term_freqs.append(freqs)
+        lengths.append(length)
+
+    def search(self, query: str, limit: int = 20, doc_type: Optional[str] = None) -> List[Tuple[str, Any, float]]:
+        """Top documents for a query as (type, id, score), best first."""
+        scores: Dict[int, float] = {}
+        for term in set(analyze(query)):
+            for doc, weight in self.postings.get(term, ()):
+                scores[doc] = scores.get(doc, 0.0) + weight
+        if doc_type is not None:
+            scores = {doc: score for doc, score in scores.items() if self.docs[doc][0] == doc_type}
+        # Ties keep catalog order so results are stable
+        best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.docs[doc][0], self.docs[doc][1], round(score, 4)) for doc, score in best]
+
+_cache_lock = threading.Lock()
+_cached: Dict[str, SearchIndex] = {}
+
+def get_search_index(snapshot) -> SearchIndex:
+    """Search index for a catalog snapshot, built on first search and replaced when the catalog changes."""
+    index = _cached.get(snapshot.version)
+    if index is None:
+        with _cache_lock:
+            index = _cached.get(snapshot.version)
+            if index is None:
+                index = SearchIndex(snapshot.topics, snapshot.essential_growth_index)
+                _cached.clear()
+                _cached[snapshot.version] = index
+    return index
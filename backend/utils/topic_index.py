@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Topic Index
+Inverted indexes over catalog topics for set-based eligibility checks
+"""
+
+import re
+from typing import Dict, Any, List, Iterable, Optional, Sequence, Set, FrozenSet
+
+import numpy as np
+
+from utils.age_utils import topic_age_bounds
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: Any) -> List[str]:
+    """Split text into lowercase alphanumeric tokens."""
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = " ".join(str(part) for part in text)
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+class TopicIndex:
+    """Maps ages, niches and keywords to topic ids.
+
+    A topic id is the topic's position in the catalog list, so ordering ids
+    reproduces catalog order and results can be turned back into topics with
+    one lookup each. Supports both the original ("Niche", "Age") and the
+    standardized ("niche", "age_range") topic formats; ages come from the
+    age_min/age_max bounds added at catalog ingest.
+    """
+
+    def __init__(self, topics: Sequence[Dict[str, Any]]):
+        self.size = len(topics)
+        self.all_ids: FrozenSet[int] = frozenset(range(self.size))
+        self.niche_of: List[str] = []
+        self.age_min: List[Optional[int]] = []
+        self.age_max: List[Optional[int]] = []
+
+        by_age: Dict[int, Set[int]] = {}
+        by_niche: Dict[str, Set[int]] = {}
+        by_token: Dict[str, Set[int]] = {}
+
+        for topic_id, topic in enumerate(topics):
+            niche = str(topic.get("niche", topic.get("Niche", "")) or "").lower()
+            self.niche_of.append(niche)
+            by_niche.setdefault(niche, set()).add(topic_id)
+
+            age_min, age_max = topic_age_bounds(topic)
+            self.age_min.append(age_min)
+            self.age_max.append(age_max)
+            if age_min is not None:
+                for age in range(age_min, age_max + 1):
+                    by_age.setdefault(age, set()).add(topic_id)
+
+            text = (topic.get("topic", topic.get("Topic", "")), niche,
+                    topic.get("hashtags", topic.get("Hashtags", "")))
+            for token in set(tokenize(text)):
+                by_token.setdefault(token, set()).add(topic_id)
+
+        self.by_age: Dict[int, FrozenSet[int]] = {age: frozenset(ids) for age, ids in by_age.items()}
+        self.by_niche: Dict[str, FrozenSet[int]] = {niche: frozenset(ids) for niche, ids in by_niche.items()}
+        self.by_token: Dict[str, FrozenSet[int]] = {token: frozenset(ids) for token, ids in by_token.items()}
+
+        # Column arrays for vectorized scoring: niche code (position in self.niches) and age bounds, NaN if unknown
+        niche_codes = {niche: code for code, niche in enumerate(self.by_niche)}
+        self.niche_codes = np.array([niche_codes[niche] for niche in self.niche_of], dtype=np.int32)
+        self.age_min_array = np.array([np.nan if age is None else age for age in self.age_min], dtype=np.float64)
+        self.age_max_array = np.array([np.nan if age is None else age for age in self.age_max], dtype=np.float64)
+
+    @property
+    def niches(self) -> List[str]:
+        """Distinct lowercase niche names in first-seen catalog order."""
+        return list(self.by_niche.keys())
+
+    def covers_age_range(self, topic_id: int, age_min: int, age_max: int) -> bool:
+        """Check a single topic against an age range using its normalized bounds."""
+        topic_min = self.age_min[topic_id]
+        return topic_min is not None and topic_min <= age_max and self.age_max[topic_id] >= age_min
+
+    def ids_for_age_range(self, age_min: int, age_max: int) -> Set[int]:
+        """Topics covering at least one age in [age_min, age_max]."""
+        ids: Set[int] = set()
+        for age, topic_ids in self.by_age.items():
+            if age_min <= age <= age_max:
+                ids |= topic_ids
+        return ids
+
+    def ids_for_niches(self, niches: Iterable[str]) -> Set[int]:
+        """Topics whose lowercase niche is one of the given names."""
+        ids: Set[int] = set()
+        for niche in niches:
+            ids |= self.by_niche.get(niche, frozenset())
+        return ids
+
+    def ids_for_keywords(self, text: str) -> Set[int]:
+        """Topics containing every token of the text in their name, niche or hashtags."""
+        tokens = tokenize(text)
+        if not tokens:
+            return set()
+        ids = set(self.by_token.get(tokens[0], frozenset()))
+        for token in tokens[1:]:
+            ids &= self.by_token.get(token, frozenset())
+        return ids
+
+    @staticmethod
+    def ordered(ids: Iterable[int]) -> List[int]:
+        """Sort ids back into catalog order."""
+        return sorted(ids)
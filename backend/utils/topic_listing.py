@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Topic Listing
+Cursor pagination, field projection and streamed JSON for topic listing endpoints
+"""
+
+import base64
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, FrozenSet, Iterator, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from utils.response_cache import serialize_json
+
+MAX_PAGE_LIMIT = 500
+
+# Topics serialized per streamed chunk
+STREAM_BATCH_SIZE = 50
+
+def parse_fields(fields: Optional[str], valid: Optional[FrozenSet[str]] = None) -> Optional[Tuple[str, ...]]:
+    """Parse ?fields=Topic,Niche,id into field names; None returns whole topics.
+
+    Names outside valid (when given) are rejected rather than silently dropped.
+    """
+    if not fields:
+        return None
+    names = tuple(name.strip() for name in fields.split(",") if name.strip())
+    if valid is not None:
+        unknown = [name for name in names if name not in valid]
+        if unknown:
+            raise HTTPException(status_code=400,
+                                detail=f"Unknown fields: {', '.join(unknown)}; valid fields: {', '.join(sorted(valid))}")
+    return names or None
+
+def parse_limit(limit: Optional[int]) -> Optional[int]:
+    if limit is None:
+        return None
+    if limit < 1 or limit > MAX_PAGE_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+    return limit
+
+def encode_cursor(version: str, topic_id: int) -> str:
+    """Opaque cursor pointing at the next topic id of a catalog version."""
+    return base64.urlsafe_b64encode(f"{version}:{topic_id}".encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: Optional[str], version: str) -> int:
+    """Topic id a cursor resumes from; rejects cursors from another catalog version."""
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_version, _, topic_id = base64.urlsafe_b64decode(padded).decode("utf-8").rpartition(":")
+        topic_id = int(topic_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_version != version:
+        raise HTTPException(status_code=409, detail="Catalog has changed since this cursor was issued; start again without a cursor")
+    return topic_id
+
+def project(topic_id: int, topic: Any, fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+    """Build the response dict for a topic, keeping only the requested fields ("id" is the topic id)."""
+    if fields is None:
+        return dict(topic)
+    projected = {}
+    for name in fields:
+        if name == "id":
+            projected["id"] = topic_id
+        elif name in topic:
+            projected[name] = topic[name]
+    return projected
+
+class FilterIndex:
+    """Sorted topic ids per (catalog version, filter, value), computed once per version.
+
+    The first lookup for a filter groups the whole catalog by its value in one
+    pass, so the cache holds only values that occur in the catalog; unknown
+    values return no ids without adding entries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._ids: Dict[str, Dict[Any, Tuple[int, ...]]] = {}
+        self._fields: Optional[FrozenSet[str]] = None
+
+    def _check_version(self, version: str):
+        if self._version != version:
+            self._version = version
+            self._ids = {}
+            self._fields = None
+
+    def ids(self, version: str, topics: Sequence[Any], name: str, value: Any,
+            key: Callable[[Any], Any]) -> Tuple[int, ...]:
+        with self._lock:
+            self._check_version(version)
+            groups = self._ids.get(name)
+            if groups is None:
+                grouped: Dict[Any, list] = {}
+                for topic_id, topic in enumerate(topics):
+                    topic_value = key(topic)
+                    try:
+                        grouped.setdefault(topic_value, []).append(topic_id)
+                    except TypeError:
+                        # Unhashable values can never equal a path parameter
+                        continue
+                groups = self._ids[name] = {group: tuple(ids) for group, ids in grouped.items()}
+            return groups.get(value, ())
+
+    def field_names(self, version: str, topics: Sequence[Any]) -> FrozenSet[str]:
+        """Every field name any topic has, plus "id": the names ?fields= accepts."""
+        with self._lock:
+            self._check_version(version)
+            if self._fields is None:
+                names = {"id"}
+                for topic in topics:
+                    names.update(topic.keys())
+                self._fields = frozenset(names)
+            return self._fields
+
+_filter_index = FilterIndex()
+
+def get_filter_index() -> FilterIndex:
+    return _filter_index
+
+def stream_topic_page(version: str, topics: Sequence[Any], ids: Sequence[int], fields: Optional[str] = None,
+                      limit: Optional[int] = None, cursor: Optional[str] = None,
+                      extra: Optional[Dict[str, Any]] = None) -> StreamingResponse:
+    """Stream one page of topics as {**extra, "topics": [...], "count", "returned", "next_cursor"}.
+
+    ids must be in catalog order; the cursor is located by binary search, so a
+    page costs O(log n + page) and topics are serialized as they are sent.
+    """
+    field_names = parse_fields(fields, get_filter_index().field_names(version, topics) if fields else None)
+    limit = parse_limit(limit)
+    start = bisect_left(ids, decode_cursor(cursor, version))
+    end = len(ids) if limit is None else min(len(ids), start + limit)
+    page_ids = ids[start:end]
+    next_cursor = encode_cursor(version, ids[end]) if end < len(ids) else None
+
+    def generate() -> Iterator[bytes]:
+        head = serialize_json(extra or {})
+        yield head[:-1] + (b',"topics":[' if len(head) > 2 else b'"topics":[')
+        for batch_start in range(0, len(page_ids), STREAM_BATCH_SIZE):
+            batch = page_ids[batch_start:batch_start + STREAM_BATCH_SIZE]
+            chunk = b",".join(serialize_json(project(topic_id, topics[topic_id], field_names)) for topic_id in batch)
+            yield (b"," if batch_start else b"") + chunk
+        yield b'],"count":' + serialize_json(len(ids)) + b',"returned":' + serialize_json(len(page_ids)) \
+            + b',"next_cursor":' + serialize_json(next_cursor) + b"}"
+
+    return StreamingResponse(generate(), media_type="application/json")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Topic Record
+Compact, slotted in-memory representation of a catalog topic
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Dict, Any, Iterator, Optional
+
+from utils.age_utils import topic_age_bounds
+
+# Original topicsdata.json field -> Topic slot, in file order
+FIELD_SLOTS = {
+    "Niche": "niche",
+    "#": "number",
+    "Topic": "name",
+    "Objective": "objective",
+    "Explanation": "explanation",
+    "Hashtags": "hashtags",
+    "Estimated Time": "estimated_time",
+    "Age": "age",
+    "Activity 1": "activity_1",
+    "Activity 2": "activity_2",
+    "age_min": "age_min",
+    "age_max": "age_max",
+}
+
+# Fields computed at ingest rather than read from the source file
+DERIVED_AGE_FIELDS = ("age_min", "age_max")
+
+class _Missing:
+    """Marker for fields absent from the source topic; pickles as the module singleton."""
+    __slots__ = ()
+
+    def __reduce__(self):
+        return "_MISSING"
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+_MISSING = _Missing()
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Topic(Mapping):
+    """A catalog topic stored in slots instead of a per-topic dict.
+
+    Niche names and time strings are interned, so the few dozen distinct
+    values are shared by every topic. The record is read-only and behaves
+    like the original topic dict (``topic.get("Topic")``, ``"Activity 1" in
+    topic``, ``dict(topic)``), so existing agent code keeps working; call
+    to_dict() where a real dict is needed, e.g. when serializing a response.
+
+    Integer age_min/age_max are always readable (``topic["age_min"]``), but
+    when they were derived from the Age field at ingest they are not part of
+    iteration, so to_dict() returns exactly the source record.
+    """
+
+    __slots__ = ("id", "niche", "number", "name", "objective", "explanation", "hashtags",
+                 "estimated_time", "age", "activity_1", "activity_2", "age_min", "age_max", "extra",
+                 "derived_ages")
+
+    def __init__(self, topic_id: int, niche: Any = _MISSING, number: Any = _MISSING, name: Any = _MISSING,
+                 objective: Any = _MISSING, explanation: Any = _MISSING, hashtags: Any = _MISSING,
+                 estimated_time: Any = _MISSING, age: Any = _MISSING, activity_1: Any = _MISSING,
+                 activity_2: Any = _MISSING, age_min: Any = _MISSING, age_max: Any = _MISSING,
+                 extra: Optional[Dict[str, Any]] = None, derived_ages: bool = False):
+        object.__setattr__(self, "id", topic_id)
+        object.__setattr__(self, "niche", _intern(niche))
+        object.__setattr__(self, "number", number)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "objective", objective)
+        object.__setattr__(self, "explanation", explanation)
+        object.__setattr__(self, "hashtags", hashtags)
+        object.__setattr__(self, "estimated_time", _intern(estimated_time))
+        object.__setattr__(self, "age", age)
+        object.__setattr__(self, "activity_1", activity_1)
+        object.__setattr__(self, "activity_2", activity_2)
+        object.__setattr__(self, "age_min", age_min)
+        object.__setattr__(self, "age_max", age_max)
+        object.__setattr__(self, "extra", extra or None)
+        object.__setattr__(self, "derived_ages", derived_ages)
+
+    @classmethod
+    def from_dict(cls, topic_id: int, data: Dict[str, Any]) -> "Topic":
+        """Build a record from an original-format topic dict, deriving age_min/age_max when absent."""
+        values = {}
+        extra = {}
+        for key, value in data.items():
+            slot = FIELD_SLOTS.get(key)
+            if slot is None:
+                extra[key] = value
+            else:
+                values[slot] = value
+        derived_ages = "age_min" not in data
+        if derived_ages:
+            values["age_min"], values["age_max"] = topic_age_bounds(data)
+        return cls(topic_id, extra=extra, derived_ages=derived_ages, **values)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("Topic records are read-only")
+
+    def __reduce__(self):
+        # Rebuild through __init__ so compiled catalog snapshots re-intern strings on load
+        return (Topic, tuple(getattr(self, slot) for slot in self.__slots__))
+
+    @property
+    def hashtag_text(self) -> str:
+        return "" if self.hashtags is _MISSING else self.hashtags
+
+    # Mapping interface, keyed by the original field names
+    def __getitem__(self, key: str) -> Any:
+        slot = FIELD_SLOTS.get(key)
+        if slot is None:
+            if self.extra is not None and key in self.extra:
+                return self.extra[key]
+            raise KeyError(key)
+        value = getattr(self, slot)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        for key, slot in FIELD_SLOTS.items():
+            if getattr(self, slot) is not _MISSING and not (self.derived_ages and key in DERIVED_AGE_FIELDS):
+                yield key
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Topic(id={self.id}, name={self.name!r}, niche={self.niche!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Build the original-format dict for a response."""
+        return dict(self)
+
+def topics_to_dicts(topics) -> list:
+    """Convert topic records (or plain dicts) to dicts at a response boundary."""
+    return [topic.to_dict() if isinstance(topic, Topic) else topic for topic in topics]
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Tracing
+Lightweight spans for the agent pipeline, aggregated into Prometheus histograms, counters and gauges
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Prefix for every exported metric name
+METRIC_PREFIX = "unschooling"
+
+# Histogram bucket upper bounds in seconds, from sub-millisecond agents to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (metric name, type, help, {label tuple: value}) produced by a collector at scrape time
+MetricFamily = Tuple[str, str, str, Dict[Tuple[Tuple[str, str], ...], float]]
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+class Span:
+    """One timed operation. Use as a context manager; an exception marks the span as an error.
+
+    Trace and parent ids are only assigned while an exporter is attached, so
+    the default cost is two perf_counter calls and two locked updates.
+    """
+
+    __slots__ = ("tracer", "name", "attributes", "start", "trace_id", "span_id", "parent_id", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.trace_id = self.span_id = self.parent_id = None
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any):
+        if self.attributes is None:
+            self.attributes = {}
+        self.attributes[key] = value
+
+    def _assign_ids(self):
+        parent = _current_span.get()
+        self.span_id = f"{random.getrandbits(64):016x}"
+        if parent is not None and parent.trace_id is not None:
+            self.trace_id, self.parent_id = parent.trace_id, parent.span_id
+        else:
+            self.trace_id = f"{random.getrandbits(128):032x}"
+
+    def __enter__(self) -> "Span":
+        tracer = self.tracer
+        with tracer._lock:
+            tracer._in_flight[self.name] = tracer._in_flight.get(self.name, 0) + 1
+        if tracer._exporters:
+            self._assign_ids()
+            self._token = _current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration = time.perf_counter() - self.start
+        if self._token is not None:
+            _current_span.reset(self._token)
+        self.tracer._finish(self, duration, exc_type is not None)
+        return False
+
+class Tracer:
+    """Aggregates finished spans per name: a latency histogram, error counter and in-flight gauge.
+
+    Exporters are callables receiving one dict per finished span (name, ids,
+    timestamps, duration, attributes, error); they run on the thread that
+    ended the span and must be quick. Metrics never depend on exporters.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # name -> [bucket counts..., +Inf count, sum of durations]
+        self._histograms: Dict[str, List[float]] = {}
+        self._errors: Dict[str, int] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._exporters: List[Callable[[Dict[str, Any]], None]] = []
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def span(self, name: str, **attributes: Any) -> Span:
+        return Span(self, name, attributes or None)
+
+    def record(self, name: str, duration: float, error: bool = False, **attributes: Any):
+        """Record an operation timed elsewhere, as if it had been a span."""
+        span = Span(self, name, attributes or None)
+        span.start = time.perf_counter() - duration
+        if self._exporters:
+            span._assign_ids()
+        with self._lock:
+            self._in_flight[name] = self._in_flight.get(name, 0) + 1
+        self._finish(span, duration, error)
+
+    def _finish(self, span: Span, duration: float, error: bool):
+        name = span.name
+        bucket = bisect_left(self.buckets, duration)
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = [0] * (len(self.buckets) + 1) + [0.0]
+            histogram[bucket] += 1
+            histogram[-1] += duration
+            self._in_flight[name] -= 1
+            if error:
+                self._errors[name] = self._errors.get(name, 0) + 1
+
+        if self._exporters:
+            record = {
+                "name": name,
+                "trace_id": span.trace_id,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "start": time.time() - duration,
+                "duration_seconds": duration,
+                "error": error,
+                "attributes": span.attributes or {}
+            }
+            for exporter in list(self._exporters):
+                try:
+                    exporter(record)
+                except Exception as e:
+                    logger.warning(f"⚠️ Span exporter failed: {e}")
+
+    def add_exporter(self, exporter: Callable[[Dict[str, Any]], None]):
+        self._exporters.append(exporter)
+
+    def remove_exporter(self, exporter: Callable[[Dict[str, Any]], None]):
+        if exporter in self._exporters:
+            self._exporters.remove(exporter)
+
+    def add_collector(self, collector: Callable[[], Iterable[MetricFamily]]):
+        """Register a callable that reports extra metric families (e.g. cache counters) at scrape time."""
+        self._collectors.append(collector)
+
+    def _quantile(self, histogram: List[float], q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile; None when empty or beyond the last bucket."""
+        total = sum(histogram[:-1])
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self.buckets, histogram):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-span count, errors, in-flight, mean and bucketed p50/p95/p99 (seconds)."""
+        with self._lock:
+            histograms = {name: list(histogram) for name, histogram in self._histograms.items()}
+            errors = dict(self._errors)
+            in_flight = dict(self._in_flight)
+        stats = {}
+        for name in sorted(set(histograms) | set(in_flight)):
+            histogram = histograms.get(name, [0] * (len(self.buckets) + 1) + [0.0])
+            count = int(sum(histogram[:-1]))
+            stats[name] = {
+                "count": count,
+                "errors": errors.get(name, 0),
+                "in_flight": in_flight.get(name, 0),
+                "mean_seconds": round(histogram[-1] / count, 6) if count else None,
+                "p50_seconds": self._quantile(histogram, 0.50),
+                "p95_seconds": self._quantile(histogram, 0.95),
+                "p99_seconds": self._quantile(histogram, 0.99)
+            }
+        return stats
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            histograms = {name: list(histogram) for name, histogram in self._histograms.items()}
+            errors = dict(self._errors)
+            in_flight = dict(self._in_flight)
+
+        metric = f"{METRIC_PREFIX}_span_duration_seconds"
+        lines = [f"# HELP {metric} Duration of traced spans (agents, catalog loads, LLM calls, serialization).",
+                 f"# TYPE {metric} histogram"]
+        for name in sorted(histograms):
+            histogram = histograms[name]
+            label = _escape(name)
+            cumulative = 0
+            for bound, count in zip(self.buckets, histogram):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{span="{label}",le="{_format(bound)}"}} {int(cumulative)}')
+            cumulative += histogram[len(self.buckets)]
+            lines.append(f'{metric}_bucket{{span="{label}",le="+Inf"}} {int(cumulative)}')
+            lines.append(f'{metric}_sum{{span="{label}"}} {_format(histogram[-1])}')
+            lines.append(f'{metric}_count{{span="{label}"}} {int(cumulative)}')
+
+        metric = f"{METRIC_PREFIX}_span_errors_total"
+        lines += [f"# HELP {metric} Spans that ended with an exception.", f"# TYPE {metric} counter"]
+        lines += [f'{metric}{{span="{_escape(name)}"}} {errors.get(name, 0)}' for name in sorted(histograms)]
+
+        metric = f"{METRIC_PREFIX}_spans_in_flight"
+        lines += [f"# HELP {metric} Spans currently running.", f"# TYPE {metric} gauge"]
+        lines += [f'{metric}{{span="{_escape(name)}"}} {count}' for name, count in sorted(in_flight.items())]
+
+        for collector in list(self._collectors):
+            try:
+                families = list(collector())
+            except Exception as e:
+                logger.warning(f"⚠️ Metrics collector failed: {e}")
+                continue
+            for name, metric_type, help_text, samples in families:
+                metric = f"{METRIC_PREFIX}_{name}"
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {metric_type}"]
+                for labels, value in samples.items():
+                    label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels)
+                    lines.append(f"{metric}{{{label_text}}} {_format(value)}" if label_text else f"{metric} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+def log_exporter(record: Dict[str, Any]):
+    """Exporter that writes each finished span to the log."""
+    parent = f" parent={record['parent_id']}" if record["parent_id"] else ""
+    logger.info(f"🔎 span {record['name']} {record['duration_seconds'] * 1000:.2f}ms trace={record['trace_id']} "
+                f"span={record['span_id']}{parent} error={record['error']} {record['attributes']}")
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer; TRACE_EXPORT=log attaches the log exporter."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                tracer = Tracer()
+                if os.getenv("TRACE_EXPORT", "").lower() == "log":
+                    tracer.add_exporter(log_exporter)
+                _tracer = tracer
+    return _tracer
+
+def span(name: str, **attributes: Any) -> Span:
+    """Start a span on the process-wide tracer: `with span("agent.match"): ...`."""
+    return get_tracer().span(name, **attributes)
@@ -1,10 +1,5 @@
-import json
-
-import os
+from utils.catalog import get_catalog
 
 def load_niche_data():
-    # Get the current directory (backend folder)
-    current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    data_path = os.path.join(current_dir, "data", "topicsdata.json")
-    with open(data_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Topics from the shared catalog (backend/data/topicsdata.json), parsed once per process."""
+    return get_catalog().topics
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Vector Index
+Offline-built hashed TF-IDF vectors over topic text for local semantic matching
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.search_index import analyze
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_FILENAME = "topic_vectors.npy"
+VECTOR_META_SUFFIX = ".meta.json"
+DEFAULT_DIM = int(os.getenv("VECTOR_INDEX_DIM", "1024"))
+
+# Field weights, as in the search index; the niche name counts like a hashtag
+TOPIC_FIELDS = (("Topic", 3), ("Niche", 2), ("Hashtags", 2), ("Objective", 1), ("Explanation", 1),
+                ("Activity 1", 1), ("Activity 2", 1))
+
+def _bucket(term: str, dim: int) -> Tuple[int, float]:
+    """Stable hashed column and sign of a term; Python's hash() differs between processes."""
+    digest = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+    return digest % dim, (1.0 if (digest >> 63) & 1 else -1.0)
+
+def _term_counts(fields: Iterable[Tuple[Any, int]]) -> Dict[str, float]:
+    counts: Dict[str, float] = {}
+    for text, weight in fields:
+        for term in analyze(text):
+            counts[term] = counts.get(term, 0.0) + weight
+    return counts
+
+def _hashed_tf(counts: Dict[str, float], dim: int) -> np.ndarray:
+    vector = np.zeros(dim, dtype=np.float32)
+    for term, count in counts.items():
+        column, sign = _bucket(term, dim)
+        vector[column] += sign * (1.0 + math.log(count))
+    return vector
+
+def topic_terms(topics: Sequence[Any]) -> List[FrozenSet[str]]:
+    """Analyzed terms of each topic, used to tell real matches from hash collisions."""
+    return [frozenset(_term_counts((topic.get(field, ""), weight) for field, weight in TOPIC_FIELDS)) for topic in topics]
+
+def vector_index_path(data_dir: str) -> str:
+    return os.getenv("VECTOR_INDEX_PATH") or os.path.join(data_dir, VECTOR_INDEX_FILENAME)
+
+class VectorIndex:
+    """Row i is the L2-normalized hashed TF-IDF vector of catalog topic id i.
+
+    Terms are hashed into a fixed number of columns, so no vocabulary is
+    stored and unseen query words still land in a column. A query is one
+    matrix-vector product; the matrix can be memory-mapped from disk.
+
+    Distinct terms can share a column, so with terms (each topic's analyzed
+    terms) set, top_k only returns topics sharing a real term with the query.
+    """
+
+    def __init__(self, version: str, matrix: np.ndarray, idf: np.ndarray,
+                 terms: Optional[List[FrozenSet[str]]] = None):
+        self.version = version
+        self.matrix = matrix
+        self.idf = idf
+        self.dim = matrix.shape[1]
+        self.terms = terms
+
+    @classmethod
+    def build(cls, version: str, topics: Sequence[Any], dim: int = DEFAULT_DIM) -> "VectorIndex":
+        tf = np.zeros((len(topics), dim), dtype=np.float32)
+        for topic_id, topic in enumerate(topics):
+            tf[topic_id] = _hashed_tf(_term_counts((topic.get(field, ""), weight) for field, weight in TOPIC_FIELDS), dim)
+        document_freq = np.count_nonzero(tf, axis=0)
+        idf = (np.log((1.0 + len(topics)) / (1.0 + document_freq)) + 1.0).astype(np.float32)
+        matrix = tf * idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms > 0, norms, 1.0)
+        return cls(version, matrix, idf, topic_terms(topics))
+
+    def save(self, path: str):
+        """Write the matrix as .npy (memory-mappable) and its metadata next to it."""
+        temp_path = f"{path}.tmp.npy"
+        np.save(temp_path, np.ascontiguousarray(self.matrix, dtype=np.float32))
+        os.replace(temp_path, path)
+        meta = {"version": self.version, "dim": self.dim, "count": int(self.matrix.shape[0]), "idf": self.idf.tolist()}
+        with open(path + VECTOR_META_SUFFIX, "w") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path: str, version: str, topics: Optional[Sequence[Any]] = None) -> Optional["VectorIndex"]:
+        """Memory-map a saved index; None if it is missing or built for another catalog version.
+
+        Pass the catalog topics to enable the shared-term check in top_k.
+        """
+        try:
+            with open(path + VECTOR_META_SUFFIX) as f:
+                meta = json.load(f)
+            if meta.get("version") != version:
+                logger.info(f"⚠️ Vector index {path} is for catalog {meta.get('version')}, not {version}")
+                return None
+            matrix = np.load(path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.info(f"⚠️ Vector index {path} not loaded: {e}")
+            return None
+        if matrix.shape != (meta["count"], meta["dim"]):
+            return None
+        return cls(version, matrix, np.asarray(meta["idf"], dtype=np.float32),
+                   topic_terms(topics) if topics is not None else None)
+
+    def embed(self, text: Any) -> np.ndarray:
+        vector = _hashed_tf(_term_counts([(text, 1)]), self.dim) * self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def similarities(self, text: Any) -> np.ndarray:
+        """Cosine similarity of the text to every topic."""
+        return self.matrix @ self.embed(text)
+
+    def top_k(self, text: Any, k: int, allowed: Optional[Iterable[int]] = None,
+              min_score: float = 0.0, min_relative: float = 0.0) -> List[Tuple[int, float]]:
+        """Most similar topic ids as (id, score), best first, ties in catalog order.
+
+        Only topics scoring above min_score and at least min_relative times the
+        best candidate's score are returned, so weak queries return fewer ids.
+        """
+        scores = self.similarities(text)
+        if allowed is not None:
+            mask = np.zeros(len(scores), dtype=bool)
+            mask[np.fromiter(allowed, dtype=np.int64)] = True
+            scores = np.where(mask, scores, -np.inf)
+        candidates = np.flatnonzero(scores > min_score)
+        if self.terms is not None and len(candidates):
+            query_terms = set(analyze(text))
+            candidates = candidates[[not self.terms[topic_id].isdisjoint(query_terms) for topic_id in candidates]]
+        if min_relative > 0 and len(candidates):
+            candidates = candidates[scores[candidates] >= min_relative * scores[candidates].max()]
+        if len(candidates) > k:
+            cut = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+            candidates = candidates[scores[candidates] >= cut]
+        best = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+        return [(int(topic_id), round(float(scores[topic_id]), 4)) for topic_id in best]
+
+_cache_lock = threading.Lock()
+_cached: Dict[str, VectorIndex] = {}
+
+def get_vector_index(snapshot, data_dir: str) -> VectorIndex:
+    """Vector index for a catalog snapshot: the offline-built file when it matches, else built in memory."""
+    index = _cached.get(snapshot.version)
+    if index is None:
+        with _cache_lock:
+            index = _cached.get(snapshot.version)
+            if index is None:
+                path = vector_index_path(data_dir)
+                index = VectorIndex.load(path, snapshot.version, snapshot.topics)
+                if index is None:
+                    index = VectorIndex.build(snapshot.version, snapshot.topics)
+                    logger.info(f"✅ Built vector index for catalog {snapshot.version} in memory ({index.matrix.shape[0]} topics)")
+                else:
+                    logger.info(f"✅ Memory-mapped vector index {path} for catalog {snapshot.version}")
+                _cached.clear()
+                _cached[snapshot.version] = index
+    return index